@@ -0,0 +1,160 @@
+# Versioned JSON API (/api/v1) over the learning content and catalog tables.
+#
+# Every response body is serialized once per content version and then
+# served as bytes with an ETag, so repeat requests cost a dictionary lookup
+# (or a 304). Static content also carries a Last-Modified from its source
+# file; the catalog tables record no modification time, so their pages are
+# validated by ETag alone. Static content from the registry is
+# serialized at import; database collections are paginated by id (keyset,
+# never OFFSET) and their pages are cached until catalog.py invalidates the
+# collection on a write.
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, request
+
+import learning_content
+from catalog import catalog_cache
+from content_registry import registry
+from models import db, JobSkill, Resource, ResourceCategory
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Serialized pages kept per collection version
+MAX_CACHED_PAGES = 256
+
+api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+
+def dumps(value):
+    """Serialize `value` to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class Payload:
+    """A serialized response body with its validators."""
+
+    __slots__ = ('body', 'etag', 'last_modified')
+
+    def __init__(self, value, last_modified=None):
+        self.body = dumps(value)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified = last_modified
+
+
+def _respond(payload):
+    response = Response(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    if payload.last_modified is not None:
+        response.last_modified = payload.last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+# Static content only changes with a deploy, so its version is the source file
+_content_modified = datetime.fromtimestamp(
+    int(os.path.getmtime(learning_content.__file__)), timezone.utc)
+
+_static_payloads = {
+    'learning_paths': Payload([asdict(path) for path in registry.learning_paths], _content_modified),
+    'projects': Payload([asdict(project) for project in registry.projects], _content_modified),
+    'exercises': Payload([asdict(exercise) for exercise in registry.exercises], _content_modified),
+}
+
+
+class PageCache:
+    """Serialized pages of one collection version, keyed by (after, limit)."""
+
+    def __init__(self):
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        with self._lock:
+            payload = self._pages.get(key)
+            if payload is not None:
+                self._pages.move_to_end(key)
+                return payload
+        payload = Payload(loader())
+        with self._lock:
+            self._pages[key] = payload
+            while len(self._pages) > MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        return payload
+
+
+# A new PageCache (a new version) is created whenever the tables are written
+@catalog_cache('api_v1_resources', [Resource, ResourceCategory])
+def _resource_pages():
+    return PageCache()
+
+
+@catalog_cache('api_v1_job_skills', [JobSkill])
+def _job_skill_pages():
+    return PageCache()
+
+
+def _page_args():
+    after = max(request.args.get('after', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    return after, limit
+
+
+def _keyset_page(statement, id_column, after, limit):
+    # One row past the page tells us whether there is a next page
+    rows = db.session.execute(
+        statement.where(id_column > after).order_by(id_column).limit(limit + 1)
+    ).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    next_after = items[-1]['id'] if len(rows) > limit else None
+    return {'items': items, 'next_after': next_after}
+
+
+@api_v1.route('/learning_paths')
+def learning_paths():
+    return _respond(_static_payloads['learning_paths'])
+
+
+@api_v1.route('/projects')
+def projects():
+    return _respond(_static_payloads['projects'])
+
+
+@api_v1.route('/exercises')
+def exercises():
+    return _respond(_static_payloads['exercises'])
+
+
+@api_v1.route('/resources')
+def resources():
+    after, limit = _page_args()
+    statement = (db.select(Resource.id, Resource.title, Resource.url, Resource.description,
+                           Resource.resource_type.label('type'), Resource.is_free,
+                           ResourceCategory.name.label('category'))
+                 .join(ResourceCategory, Resource.category_id == ResourceCategory.id))
+    payload = _resource_pages().get(
+        (after, limit), lambda: _keyset_page(statement, Resource.id, after, limit))
+    return _respond(payload)
+
+
+@api_v1.route('/job_skills')
+def job_skills():
+    after, limit = _page_args()
+    statement = db.select(JobSkill.id, JobSkill.name, JobSkill.category, JobSkill.description,
+                          JobSkill.importance_level.label('importance'))
+    payload = _job_skill_pages().get(
+        (after, limit), lambda: _keyset_page(statement, JobSkill.id, after, limit))
+    return _respond(payload)
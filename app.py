@@ -1,18 +1,55 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import (Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response,
+                   stream_with_context)
 import os
+import click
 import hashlib
+import json
+from datetime import datetime
+from functools import partial
 from flask_migrate import Migrate
-from models import db, User, UserProgress, UserProject, UserNote, JobSkill, ResourceCategory, Resource
-from learning_content import (
-    learning_paths, 
-    projects, 
-    exercises, 
-    resources, 
-    job_skills
-)
+from sqlalchemy import or_
+from models import (db, User, UserProgress, UserProject, UserProgressSummary, ExerciseSubmission,
+                    InterviewQuestion, UserRecommendation)
+from catalog import get_resource_catalog, get_job_skill_catalog, get_job_skills_json
+from page_cache import cached_page
+from query_plans import check_query_plans
+from progress import rebuild_summaries, total_topics_by_level
+from search import get_search_index
+from note_search import search_notes
+from content_registry import registry
+from startup import ensure_schema, preload, compile_templates, template_bytecode_cache
+from assets import init_assets, build_assets
+from database import init_database, engine_options, DEFAULT_MAX_CONNECTIONS
+import gunicorn_config
+from metrics import init_metrics, render_prometheus
+from seed import seed_sample_data, seed_scale, SYNTHETIC_PASSWORD
+from api import api_v1
+from sessions import load_secret_key, ServerSideSessionInterface, SQLiteSessionStore
+from grading import get_grading_pool, GradingQueueFull, Limits
+from grade_cache import cache_key, get_cached_result, store_result
+from jobs import enqueue, run_worker
+from recommendations import rebuild_recommendations, BATCH_SIZE, TOP_K
+from progress_sync import decode_rows, sync_progress, ProgressSyncError, MAX_ROWS, MAX_ROW_BYTES
+from exports import export_chunks, gzip_chunks, EXPORTS, FORMATS
+from interviews import review_queue, record_review, MIN_QUALITY, MAX_QUALITY
+from learning_content import resources, exercise_tests
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# SECRET_KEY from the environment, else a key generated once and kept in the
+# instance folder, so every worker and restart signs with the same key
+app.secret_key = os.environ.get('SECRET_KEY') or load_secret_key(os.path.join(app.instance_path, 'secret_key'))
+
+# Sessions live server-side in a SQLite file shared by all workers on the
+# host; the cookie only holds the session id
+app.session_interface = ServerSideSessionInterface(
+    SQLiteSessionStore(os.environ.get('SESSION_FILE') or os.path.join(app.instance_path, 'sessions.db'))
+)
+
+# Compiled templates are cached on disk and shared by every worker and
+# restart; `flask compile-templates` fills the cache ahead of time
+app.config['TEMPLATE_CACHE_DIR'] = (os.environ.get('TEMPLATE_CACHE_DIR')
+                                    or os.path.join(app.instance_path, 'jinja_cache'))
+app.jinja_env.bytecode_cache = template_bytecode_cache(app.config['TEMPLATE_CACHE_DIR'])
 
 # Configure database
 db_url = os.environ.get('DATABASE_URL')
@@ -23,18 +60,77 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pythonlearning.db'
     
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+# One pooled connection per gunicorn thread, within the server's connection
+# limit; set DB_POOL_PRE_PING=1 if something drops idle connections sooner
+# than the pool recycles them
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    workers=gunicorn_config.workers,
+    threads=gunicorn_config.threads,
+    max_connections=int(os.environ.get('DB_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+    pre_ping=os.environ.get('DB_POOL_PRE_PING', '0') == '1',
+)
+
+# SQLite: 'concurrent' (WAL, synchronous=NORMAL, busy timeout, mmap) or 'default'
+app.config['SQLITE_MODE'] = os.environ.get('SQLITE_MODE', 'concurrent')
+
+# How the schema is handled on startup: 'upgrade' applies pending migrations
+# (local SQLite default), 'check' only verifies the migration revision
+# (default with DATABASE_URL) and 'skip' does nothing. No mode runs DDL at import.
+app.config['SCHEMA_STARTUP'] = os.environ.get('SCHEMA_STARTUP', 'check' if db_url else 'upgrade')
 
 # Initialize extensions
 db.init_app(app)
-migrate = Migrate(app, db)
+init_database(app)
+migrate = Migrate(app, db, directory=os.path.join(app.root_path, 'migrations'))
+
+# Verify the schema once per process, before the first request is handled
+@app.before_request
+def check_schema_once():
+    ensure_schema(app)
+
+# Count SQL per request; endpoints over their budget are logged (raise under testing)
+app.config['SQL_QUERY_BUDGETS'] = {
+    'resource_page': 1,
+    'job_skills_page': 1,
+    'job_skills_api': 1,
+    'api_v1.resources': 1,
+    'api_v1.job_skills': 1,
+    'dashboard': 6,
+    'submit_exercise': 5,
+    'exercise_submission': 1,
+    'interview_queue': 2,
+    'interview_review': 5,
+    'register': 3,
+    'progress_batch': 7,
+}
+init_metrics(app)
+
+# Exercise grading: sandbox pool size, queue bound and per-submission limits
+app.config['GRADING_WORKERS'] = int(os.environ.get('GRADING_WORKERS', 2))
+app.config['GRADING_QUEUE_SIZE'] = int(os.environ.get('GRADING_QUEUE_SIZE', 64))
+app.config['GRADING_CPU_SECONDS'] = 2
+app.config['GRADING_MEMORY_MB'] = 256
+app.config['GRADING_WALL_SECONDS'] = 5
+app.config['MAX_SUBMISSION_CHARS'] = 20000
+
+# Rows listed on the dashboard; its counts come from the summary row
+app.config['DASHBOARD_RECENT_TOPICS'] = 5
+app.config['DASHBOARD_NEXT_TOPICS'] = 3
+app.config['DASHBOARD_PROJECTS'] = 10
+
+# Most progress rows accepted by one POST /api/progress/batch
+app.config['PROGRESS_BATCH_MAX_ROWS'] = int(os.environ.get('PROGRESS_BATCH_MAX_ROWS', MAX_ROWS))
 
-# Create all tables
-with app.app_context():
-    db.create_all()
+# Usernames allowed to use the /admin endpoints, comma-separated
+app.config['ADMIN_USERNAMES'] = frozenset(
+    name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip())
+
+# Static files are served under fingerprinted, immutable URLs once built
+init_assets(app)
+
+# JSON content API for the mobile client
+app.register_blueprint(api_v1)
 
 @app.route('/')
 def index():
@@ -42,7 +138,7 @@ def index():
 
 @app.route('/learning_path')
 def learning_path():
-    return render_template('learning_path.html', paths=learning_paths)
+    return render_template('learning_path.html', paths=registry.learning_paths)
 
 @app.route('/lesson')
 def lesson():
@@ -51,32 +147,38 @@ def lesson():
     return render_template('lesson.html')
 
 @app.route('/python_basics')
+@cached_page()
 def python_basics():
     # This is a specific lesson with hardcoded content for teaching Python
     return render_template('python_basics.html')
 
 @app.route('/object_oriented')
+@cached_page()
 def object_oriented():
     # Lesson for object-oriented programming in Python
     return render_template('object_oriented.html')
 
 @app.route('/error_handling')
+@cached_page()
 def error_handling():
     # Lesson for error handling in Python
     return render_template('error_handling.html')
 
 # Intermediate level lessons
 @app.route('/advanced_python')
+@cached_page()
 def advanced_python():
     # Lesson for advanced Python features
     return render_template('advanced_python.html')
 
 @app.route('/data_analysis')
+@cached_page()
 def data_analysis():
     # Lesson for data analysis with Python
     return render_template('data_analysis.html')
 
 @app.route('/web_development')
+@cached_page()
 def web_development():
     # Lesson for web development basics
     return render_template('web_development.html')
@@ -88,32 +190,124 @@ def technical_interviews():
 
 @app.route('/projects')
 def project_page():
-    return render_template('projects.html', projects=projects)
+    return render_template('projects.html', projects=registry.projects)
 
 @app.route('/exercises')
 def exercise_page():
-    return render_template('exercises.html', exercises=exercises)
+    return render_template('exercises.html', exercises=registry.exercises, exercise_tests=exercise_tests)
+
+def grading_pool():
+    return get_grading_pool(
+        workers=app.config['GRADING_WORKERS'],
+        queue_size=app.config['GRADING_QUEUE_SIZE'],
+        limits=Limits(app.config['GRADING_CPU_SECONDS'], app.config['GRADING_MEMORY_MB'],
+                      app.config['GRADING_WALL_SECONDS'])
+    )
+
+def submission_json(submission):
+    return {
+        'id': submission.id,
+        'exercise_id': submission.exercise_id,
+        'status': submission.status,
+        'tests_passed': submission.tests_passed,
+        'tests_total': submission.tests_total,
+        'result': submission.result,
+        'created_at': str(submission.created_at) if submission.created_at else None,
+        'graded_at': str(submission.graded_at) if submission.graded_at else None
+    }
+
+def apply_grade(submission, result):
+    submission.status = result['status']
+    submission.tests_passed = sum(1 for test in result['tests'] if test['passed'])
+    submission.tests_total = len(result['tests'])
+    submission.result = result
+    submission.graded_at = datetime.utcnow()
+
+def record_grade(submission_id, exercise_id, key, future):
+    # Runs on a grading pool thread once the sandbox has finished
+    try:
+        result = future.result()
+        graded = True
+    except Exception as error:
+        result = {'status': 'error', 'tests': [], 'output': '', 'error': str(error)}
+        graded = False
+    
+    with app.app_context():
+        if graded:
+            store_result(key, exercise_id, result)
+        submission = db.session.get(ExerciseSubmission, submission_id)
+        if submission is None:
+            return
+        apply_grade(submission, result)
+        db.session.commit()
+
+@app.route('/exercises/<exercise_id>/submissions', methods=['POST'])
+def submit_exercise(exercise_id):
+    # Queue code for grading; the client polls the submission for the result
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+    
+    checks = exercise_tests.get(exercise_id)
+    if registry.exercise(exercise_id) is None or checks is None:
+        return jsonify({'error': 'unknown exercise'}), 404
+    
+    code = request.form.get('code')
+    if code is None:
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify({'error': 'expected a JSON object with a "code" string'}), 400
+        code = body.get('code', '')
+        if not isinstance(code, str):
+            return jsonify({'error': 'code must be a string'}), 400
+    if not code.strip():
+        return jsonify({'error': 'no code submitted', 'interface': checks['interface']}), 400
+    if len(code) > app.config['MAX_SUBMISSION_CHARS']:
+        return jsonify({'error': 'submission too large'}), 413
+    
+    # Identical code (up to layout and comments) reuses an earlier verdict without running
+    key = cache_key(exercise_id, code)
+    cached = get_cached_result(key)
+    
+    submission = ExerciseSubmission(user_id=session['user_id'], exercise_id=exercise_id, code=code)
+    db.session.add(submission)
+    if cached is not None:
+        apply_grade(submission, dict(cached, cached=True))
+        db.session.commit()
+        return jsonify(submission_json(submission)), 201
+    db.session.commit()
+    
+    try:
+        future = grading_pool().submit(code, checks['tests'])
+    except GradingQueueFull:
+        db.session.delete(submission)
+        db.session.commit()
+        response = jsonify({'error': 'grading queue is full, try again shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    future.add_done_callback(partial(record_grade, submission.id, exercise_id, key))
+    
+    response = jsonify(submission_json(submission))
+    response.headers['Location'] = url_for('exercise_submission', exercise_id=exercise_id,
+                                           submission_id=submission.id)
+    return response, 202
+
+@app.route('/exercises/<exercise_id>/submissions/<int:submission_id>')
+def exercise_submission(exercise_id, submission_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+    
+    submission = ExerciseSubmission.query.filter_by(
+        id=submission_id, exercise_id=exercise_id, user_id=session['user_id']).first()
+    if submission is None:
+        return jsonify({'error': 'submission not found'}), 404
+    return jsonify(submission_json(submission))
 
 @app.route('/resources')
 def resource_page():
-    # Get resources and categories from database
-    db_resources = Resource.query.all()
-    categories = ResourceCategory.query.all()
-    
-    # Organize resources by category
-    resources_by_category = {}
-    for category in categories:
-        resources_by_category[category.name] = []
-        
-    for resource in db_resources:
-        category_name = ResourceCategory.query.get(resource.category_id).name
-        resources_by_category[category_name].append({
-            'title': resource.title,
-            'url': resource.url,
-            'description': resource.description,
-            'type': resource.resource_type,
-            'is_free': resource.is_free
-        })
+    # Resources grouped by category, loaded in one query and cached per process
+    resources_by_category, categories = get_resource_catalog()
     
     return render_template('resources.html', 
                           resources=resources_by_category, 
@@ -122,28 +316,76 @@ def resource_page():
 
 @app.route('/job_skills')
 def job_skills_page():
-    # Get skills from database
-    all_skills = JobSkill.query.all()
+    # Skills grouped by category, cached until a JobSkill is written
+    skills_by_category, categories = get_job_skill_catalog()
+    return render_template('job_skills.html', 
+                          job_skills=skills_by_category,
+                          categories=categories)
+
+@app.route('/api/job_skills')
+def job_skills_api():
+    # Pre-serialized JSON; pollers holding the current ETag get a 304
+    body, etag = get_job_skills_json()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/search')
+def search():
+    # Search learning paths, projects, exercises, resources and job skills
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    kind = request.args.get('type') or None
     
-    # Group skills by category
-    skills_by_category = {}
-    categories = []
+    results = get_search_index().search(query, limit=limit, kind=kind) if query else []
+    return jsonify({'query': query, 'results': results})
+
+@app.route('/notes/search')
+def note_search():
+    # Full-text search over the logged-in user's notes
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
     
-    for skill in all_skills:
-        if skill.category not in skills_by_category:
-            skills_by_category[skill.category] = []
-            categories.append(skill.category)
-            
-        skills_by_category[skill.category].append({
-            'name': skill.name,
-            'description': skill.description,
-            'importance': skill.importance_level
-        })
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    results, next_cursor = search_notes(session['user_id'], query, limit=limit,
+                                        cursor=request.args.get('cursor'))
+    return jsonify({'query': query, 'results': results, 'next_cursor': next_cursor})
+
+@app.route('/api/interviews/queue')
+def interview_queue():
+    # Questions due for review, then unseen ones, for the logged-in user
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
     
-    return render_template('job_skills.html', 
-                          job_skills=skills_by_category,
-                          categories=categories,
-                          static_job_skills=job_skills)  # Keep original data as fallback
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return jsonify({'questions': review_queue(session['user_id'], limit=limit)})
+
+@app.route('/api/interviews/questions/<int:question_id>/review', methods=['POST'])
+def interview_review(question_id):
+    # Grade a practice answer from 0 (forgot) to 5 (perfect) and reschedule it
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+    
+    quality = request.form.get('quality', type=int)
+    if quality is None:
+        body = request.get_json(silent=True)
+        quality = body.get('quality') if isinstance(body, dict) else None
+    if not isinstance(quality, int) or isinstance(quality, bool) or not MIN_QUALITY <= quality <= MAX_QUALITY:
+        return jsonify({'error': f'quality must be an integer from {MIN_QUALITY} to {MAX_QUALITY}'}), 400
+    if db.session.get(InterviewQuestion, question_id) is None:
+        return jsonify({'error': 'unknown question'}), 404
+    
+    review = record_review(session['user_id'], question_id, quality)
+    return jsonify({
+        'question_id': question_id,
+        'ease': round(review.ease, 3),
+        'interval_days': review.interval_days,
+        'repetitions': review.repetitions,
+        'lapses': review.lapses,
+        'due_at': str(review.due_at)
+    })
 
 # User Authentication Routes
 @app.route('/register', methods=['GET', 'POST'])
@@ -163,14 +405,13 @@ def register():
             flash('Passwords do not match', 'danger')
             return render_template('register.html')
             
-        # Check if user already exists
-        existing_user = User.query.filter_by(username=username).first()
-        if existing_user:
+        # Check if user already exists (username and email in one lookup)
+        existing_users = User.query.filter(or_(User.username == username, User.email == email)).all()
+        if any(user.username == username for user in existing_users):
             flash('Username already exists', 'danger')
             return render_template('register.html')
             
-        existing_email = User.query.filter_by(email=email).first()
-        if existing_email:
+        if existing_users:
             flash('Email already registered', 'danger')
             return render_template('register.html')
         
@@ -210,7 +451,8 @@ def login():
         user = User.query.filter_by(username=username, password_hash=password_hash).first()
         
         if user:
-            # Set session
+            # Set session, under a new session id so a planted one is useless
+            session.regenerate()
             session['user_id'] = user.id
             session['username'] = user.username
             flash('Login successful!', 'success')
@@ -238,24 +480,63 @@ def dashboard():
     user_id = session['user_id']
     user = User.query.get(user_id)
     
-    # Get user progress data
-    user_progress = UserProgress.query.filter_by(user_id=user_id).all()
-    user_projects = UserProject.query.filter_by(user_id=user_id).all()
+    # Completion counts come from the precomputed summary row
+    summary = UserProgressSummary.query.get(user_id)
+    
+    total_topics = total_topics_by_level()
+    completed_topics = summary.completed_topics if summary else 0
+    completion_percent = min(100, round(completed_topics * 100 / max(1, sum(total_topics.values()))))
+    
+    # Only the handful of rows the dashboard lists are loaded
+    recent_progress = (UserProgress.query
+                       .filter_by(user_id=user_id, completed=True)
+                       .order_by(UserProgress.completed_at.desc())
+                       .limit(app.config['DASHBOARD_RECENT_TOPICS']).all())
+    in_progress = (UserProgress.query
+                   .filter_by(user_id=user_id, completed=False)
+                   .order_by(UserProgress.path_id)
+                   .limit(app.config['DASHBOARD_NEXT_TOPICS']).all())
+    user_projects = (UserProject.query
+                     .filter_by(user_id=user_id)
+                     .order_by(UserProject.completed_at.desc())
+                     .limit(app.config['DASHBOARD_PROJECTS']).all())
+    
+    # Next topics and skills are precomputed by `flask rebuild-recommendations`
+    recommendations = UserRecommendation.query.get(user_id)
+    recommended_topics, recommended_skills = [], []
+    if recommendations:
+        # Routes dropped from the content since the last rebuild are skipped
+        recommended_topics = [registry.topic(route) for route, score in recommendations.topics
+                              if registry.topic(route)]
+        recommended_skills = [name for name, score in recommendations.skills]
     
     return render_template('dashboard.html', 
                           user=user, 
-                          progress=user_progress, 
-                          completed_projects=user_projects)
+                          summary=summary,
+                          total_topics=total_topics,
+                          completion_percent=completion_percent,
+                          recent_progress=recent_progress,
+                          in_progress=in_progress,
+                          completed_projects=user_projects,
+                          recommended_topics=recommended_topics,
+                          recommended_skills=recommended_skills)
+
+@app.route('/metrics')
+def metrics():
+    # Per-endpoint SQL metrics for Prometheus
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 # Helper function to check if user is logged in
 def is_logged_in():
+    # A lookup in the server-side session loaded for this request
     return 'user_id' in session
 
 # Make is_logged_in function available to templates
 @app.context_processor
 def utility_processor():
     return {
-        'is_logged_in': is_logged_in
+        'is_logged_in': is_logged_in,
+        'content': registry
     }
 
 # Custom filter for slicing lists in templates
@@ -265,169 +546,193 @@ def slice_filter(iterable, start, end=None):
         return iterable[start:]
     return iterable[start:end]
 
-# CLI command to initialize database with sample data
-@app.cli.command('init-db')
-def init_db_command():
-    """Initialize the database with sample data."""
-    # Add job skills categories
-    categories = [
-        "Programming Fundamentals", 
-        "Web Development", 
-        "Data Analysis", 
-        "Machine Learning",
-        "DevOps",
-        "Database"
-    ]
+@app.route('/api/progress/batch', methods=['POST'])
+def progress_batch():
+    # Apply the progress rows an offline client recorded, as a JSON array or
+    # NDJSON of {path_id, topic_id, completed, completed_at}, in one transaction
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
     
-    skills = [
-        # Programming Fundamentals
-        {"name": "Python Syntax", "category": "Programming Fundamentals", "importance_level": 5, 
-         "description": "Core Python syntax including variables, data types, control flow, and functions."},
-        {"name": "Object-Oriented Programming", "category": "Programming Fundamentals", "importance_level": 4, 
-         "description": "Understanding classes, inheritance, encapsulation, and polymorphism in Python."},
-        {"name": "Data Structures", "category": "Programming Fundamentals", "importance_level": 5, 
-         "description": "Working with lists, dictionaries, sets, tuples and understanding their performance characteristics."},
-        {"name": "Algorithms", "category": "Programming Fundamentals", "importance_level": 4, 
-         "description": "Implementing and analyzing common algorithms for searching, sorting, and problem-solving."},
-        
-        # Web Development  
-        {"name": "Flask", "category": "Web Development", "importance_level": 4, 
-         "description": "Building web applications with Flask framework."},
-        {"name": "Django", "category": "Web Development", "importance_level": 4, 
-         "description": "Developing robust web applications with Django framework."},
-        {"name": "REST APIs", "category": "Web Development", "importance_level": 5, 
-         "description": "Designing and implementing RESTful APIs for web services."},
-        {"name": "HTML/CSS/JavaScript", "category": "Web Development", "importance_level": 3, 
-         "description": "Frontend web development basics to complement Python backend skills."},
-        
-        # Data Analysis
-        {"name": "Pandas", "category": "Data Analysis", "importance_level": 5, 
-         "description": "Data manipulation and analysis with Pandas library."},
-        {"name": "NumPy", "category": "Data Analysis", "importance_level": 4, 
-         "description": "Numerical computing with NumPy arrays and functions."},
-        {"name": "Data Visualization", "category": "Data Analysis", "importance_level": 4, 
-         "description": "Creating visualizations with Matplotlib, Seaborn, or Plotly."},
-        {"name": "SQL", "category": "Data Analysis", "importance_level": 5, 
-         "description": "Writing efficient SQL queries for data extraction and analysis."},
-        
-        # Machine Learning
-        {"name": "Scikit-learn", "category": "Machine Learning", "importance_level": 4, 
-         "description": "Implementing machine learning algorithms with Scikit-learn."},
-        {"name": "TensorFlow/PyTorch", "category": "Machine Learning", "importance_level": 3, 
-         "description": "Building and training deep learning models."},
-        {"name": "Machine Learning Concepts", "category": "Machine Learning", "importance_level": 4, 
-         "description": "Understanding classification, regression, clustering, and model evaluation."},
-        
-        # DevOps
-        {"name": "Git Version Control", "category": "DevOps", "importance_level": 5, 
-         "description": "Using Git for source code management and collaboration."},
-        {"name": "Docker", "category": "DevOps", "importance_level": 3, 
-         "description": "Containerizing applications for consistent deployment."},
-        {"name": "CI/CD", "category": "DevOps", "importance_level": 3, 
-         "description": "Setting up continuous integration and deployment pipelines."},
-        
-        # Database
-        {"name": "PostgreSQL", "category": "Database", "importance_level": 4, 
-         "description": "Working with PostgreSQL databases in Python applications."},
-        {"name": "SQLAlchemy", "category": "Database", "importance_level": 4, 
-         "description": "Using SQLAlchemy ORM for database operations in Python."},
-        {"name": "Database Design", "category": "Database", "importance_level": 4, 
-         "description": "Designing efficient database schemas and relationships."}
-    ]
+    max_rows = app.config['PROGRESS_BATCH_MAX_ROWS']
+    too_many = {'error': f'at most {max_rows} rows per request'}
+    if (request.content_length or 0) > max_rows * MAX_ROW_BYTES:
+        return jsonify(too_many), 413
+    try:
+        items = decode_rows(request.get_data(), request.mimetype)
+        if len(items) > max_rows:
+            return jsonify(too_many), 413
+        written, summary = sync_progress(session['user_id'], items)
+    except ProgressSyncError as error:
+        return jsonify({'error': str(error)}), 400
     
-    # Create resource categories
-    resource_categories = [
-        {"name": "Tutorials", "description": "Step-by-step guides for learning Python concepts and tools."},
-        {"name": "Documentation", "description": "Official documentation and reference materials."},
-        {"name": "Online Courses", "description": "Structured learning experiences for developing Python skills."},
-        {"name": "Books", "description": "In-depth resources for comprehensive learning."},
-        {"name": "Community Resources", "description": "Forums, blogs, and discussion boards for Python developers."},
-        {"name": "Practice Sites", "description": "Websites for practicing coding challenges and improving skills."}
-    ]
+    return jsonify({
+        'received': len(items),
+        'written': written,
+        'summary': {
+            'completed_topics': summary['completed_topics'],
+            'completed_by_path': summary['completed_by_path'],
+            'completed_by_level': summary['completed_by_level'],
+            'completed_projects': summary['completed_projects'],
+            'last_activity_at': str(summary['last_activity_at']) if summary['last_activity_at'] else None
+        }
+    })
+
+@app.route('/admin/export/<table>')
+def admin_export(table):
+    # Stream a whole table as CSV or NDJSON; gzipped when the client accepts it
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+    if session.get('username') not in app.config['ADMIN_USERNAMES']:
+        return jsonify({'error': 'admin only'}), 403
     
-    # Create resources
-    resources_data = [
-        {"title": "Python.org Official Documentation", "url": "https://docs.python.org/3/", 
-         "description": "The official Python documentation with tutorials, library references and more.",
-         "resource_type": "documentation", "category": "Documentation", "is_free": True},
-        
-        {"title": "Real Python", "url": "https://realpython.com/", 
-         "description": "Tutorials, articles, and courses for all levels of Python developers.",
-         "resource_type": "tutorial", "category": "Tutorials", "is_free": True},
-        
-        {"title": "Python Crash Course (Book)", "url": "https://nostarch.com/pythoncrashcourse2e", 
-         "description": "A hands-on, project-based introduction to Python programming.",
-         "resource_type": "book", "category": "Books", "is_free": False},
-        
-        {"title": "Automate the Boring Stuff with Python", "url": "https://automatetheboringstuff.com/", 
-         "description": "Practical programming for total beginners, available both as a book and free online.",
-         "resource_type": "book", "category": "Books", "is_free": True},
-        
-        {"title": "Codecademy Python Course", "url": "https://www.codecademy.com/learn/learn-python-3", 
-         "description": "Interactive Python course with hands-on exercises.",
-         "resource_type": "course", "category": "Online Courses", "is_free": False},
-        
-        {"title": "LeetCode", "url": "https://leetcode.com/", 
-         "description": "Platform to practice coding problems often used in technical interviews.",
-         "resource_type": "practice", "category": "Practice Sites", "is_free": True},
-        
-        {"title": "Flask Documentation", "url": "https://flask.palletsprojects.com/", 
-         "description": "Official documentation for the Flask web framework.",
-         "resource_type": "documentation", "category": "Documentation", "is_free": True},
-        
-        {"title": "PythonAnywhere", "url": "https://www.pythonanywhere.com/", 
-         "description": "Hosting platform for Python web applications with free tier.",
-         "resource_type": "tool", "category": "Community Resources", "is_free": True},
-        
-        {"title": "SQLAlchemy Documentation", "url": "https://docs.sqlalchemy.org/", 
-         "description": "Comprehensive documentation for the SQLAlchemy ORM.",
-         "resource_type": "documentation", "category": "Documentation", "is_free": True},
-        
-        {"title": "Stack Overflow Python Tag", "url": "https://stackoverflow.com/questions/tagged/python", 
-         "description": "Community Q&A for Python programming problems.",
-         "resource_type": "community", "category": "Community Resources", "is_free": True}
-    ]
+    fmt = request.args.get('format', 'csv')
+    if table not in EXPORTS or fmt not in FORMATS:
+        return jsonify({'error': f"export one of {sorted(EXPORTS)} as {' or '.join(FORMATS)}"}), 404
     
-    print("Starting database initialization...")
+    chunks = export_chunks(table, fmt)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{table}.{fmt}"',
+        'Cache-Control': 'no-store',
+        'Vary': 'Accept-Encoding',
+        # Ask proxies such as nginx not to buffer the stream
+        'X-Accel-Buffering': 'no',
+    }
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt], headers=headers)
+
+# CLI command to initialize database with sample data
+@app.cli.command('init-db')
+def init_db_command():
+    """Initialize the database with sample data (safe to re-run)."""
+    ensure_schema(app, mode='upgrade', force=True)
     
-    # Add resource categories
-    for cat_data in resource_categories:
-        category = ResourceCategory(
-            name=cat_data["name"],
-            description=cat_data["description"]
-        )
-        db.session.add(category)
+    print("Starting database initialization...")
+    counts = seed_sample_data()
+    for table, count in counts.items():
+        print(f"{table}: {count} rows upserted.")
+    print("Database initialized with sample data.")
+
+# CLI command to generate production-scale synthetic learner data
+@app.cli.command('seed-scale')
+@click.option('--users', type=int, required=True, help='Number of synthetic learners to add.')
+@click.option('--progress-per-user', type=int, default=20, show_default=True)
+@click.option('--projects-per-user', type=int, default=2, show_default=True)
+@click.option('--notes-per-user', type=int, default=5, show_default=True)
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def seed_scale_command(users, progress_per_user, projects_per_user, notes_per_user, batch_size):
+    """Stream synthetic users, progress, projects and notes into the database."""
+    ensure_schema(app, mode='upgrade', force=True)
     
-    # Commit to get category IDs
+    first_id, counts = seed_scale(users, progress_per_user=progress_per_user,
+                                  projects_per_user=projects_per_user,
+                                  notes_per_user=notes_per_user, batch_size=batch_size)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows written.")
+    print(f"Synthetic learners start at user id {first_id} (password '{SYNTHETIC_PASSWORD}').")
+
+# CLI command to run background jobs
+@app.cli.command('worker')
+@click.option('--processes', type=int, default=1, show_default=True, help='Worker processes to fork.')
+@click.option('--threads', type=int, default=4, show_default=True, help='Job threads per process.')
+@click.option('--poll-interval', type=float, default=1.0, show_default=True,
+              help='Seconds to wait when the queue is empty.')
+def worker_command(processes, threads, poll_interval):
+    """Claim and run queued jobs until interrupted."""
+    ensure_schema(app)
+    print(f"Running jobs with {processes} process(es) x {threads} thread(s).")
+    run_worker(app, processes=processes, threads=threads, poll_interval=poll_interval)
+
+# CLI command to queue a job by name, e.g. from cron
+@app.cli.command('enqueue')
+@click.argument('name')
+@click.option('--payload', default='{}', help='Task keyword arguments as JSON.')
+@click.option('--priority', type=int, default=None)
+def enqueue_command(name, payload, priority):
+    """Queue the background job NAME."""
+    job = enqueue(name, json.loads(payload), priority=priority)
     db.session.commit()
-    print("Resource categories added.")
-    
-    # Add resources
-    for res_data in resources_data:
-        category = ResourceCategory.query.filter_by(name=res_data["category"]).first()
-        if category:
-            resource = Resource(
-                title=res_data["title"],
-                url=res_data["url"],
-                description=res_data["description"],
-                resource_type=res_data["resource_type"],
-                category_id=category.id,
-                is_free=res_data["is_free"]
-            )
-            db.session.add(resource)
-    
-    # Add job skills
-    for skill_data in skills:
-        skill = JobSkill(
-            name=skill_data["name"],
-            category=skill_data["category"],
-            description=skill_data["description"],
-            importance_level=skill_data["importance_level"]
-        )
-        db.session.add(skill)
+    print(f"Queued job {job.id} ({name}).")
+
+# CLI command to dump learner data without loading it into memory
+@app.cli.command('export-progress')
+@click.argument('table', type=click.Choice(sorted(EXPORTS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(FORMATS)), default='csv', show_default=True)
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='File to write (default: stdout).')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output.')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Rows fetched per round trip.')
+def export_progress_command(table, fmt, output, compress, batch_size):
+    """Stream TABLE (users, progress, projects or notes) as CSV or NDJSON."""
+    chunks = export_chunks(table, fmt, batch_size=batch_size)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    for chunk in chunks:
+        output.write(chunk)
+
+# CLI command to verify the per-user queries are served by indexes
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if a per-user query plan does not use its index."""
+    failures = 0
+    for description, ok, plan in check_query_plans():
+        print(f"{'OK  ' if ok else 'FAIL'} {description}")
+        if not ok:
+            failures += 1
+            print(plan)
     
-    db.session.commit()
-    print("Database initialized with sample data.")
+    if failures:
+        raise SystemExit(1)
+
+# CLI command to recompute progress summaries for existing users
+@app.cli.command('rebuild-progress-summaries')
+def rebuild_progress_summaries_command():
+    """Rebuild UserProgressSummary rows from progress and project records."""
+    count = rebuild_summaries()
+    print(f"Rebuilt progress summaries for {count} users.")
+
+# CLI command to precompute every user's recommendations
+@app.cli.command('rebuild-recommendations')
+@click.option('--batch-size', default=BATCH_SIZE, show_default=True, help='Users scored per batch.')
+@click.option('--top', 'k', default=TOP_K, show_default=True, help='Topics and skills kept per user.')
+@click.option('--background', is_flag=True, help='Queue the rebuild for `flask worker` instead.')
+def rebuild_recommendations_command(batch_size, k, background):
+    """Score all users against topics and job skills and store the best matches."""
+    if background:
+        enqueue('rebuild_recommendations', {'batch_size': batch_size, 'k': k})
+        db.session.commit()
+        print("Queued a recommendations rebuild.")
+        return
+    count = rebuild_recommendations(batch_size=batch_size, k=k)
+    print(f"Rebuilt recommendations for {count} users.")
+
+# CLI command to prepare the database and caches before taking traffic
+@app.cli.command('warmup')
+def warmup_command():
+    """Apply pending migrations, then compile templates and build indexes."""
+    ensure_schema(app, mode='upgrade', force=True)
+    print("Database schema is at the latest migration.")
+    preload(app)
+    print("Static assets built, templates compiled and content indexes built.")
+
+# CLI command to precompile templates into the shared bytecode cache
+@app.cli.command('compile-templates')
+def compile_templates_command():
+    """Compile every template into TEMPLATE_CACHE_DIR."""
+    names = compile_templates(app)
+    print(f"Compiled {len(names)} templates into {app.config['TEMPLATE_CACHE_DIR']}.")
+
+# CLI command to fingerprint and precompress static files
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Write content-hashed copies of static files with .gz/.br siblings."""
+    if not app.has_static_folder:
+        print(f"No static folder at {app.static_folder}.")
+        return
+    manifest = build_assets(app.static_folder)
+    for name, entry in sorted(manifest.items()):
+        print(f"{name} -> {entry['file']} ({', '.join(entry['encodings']) or 'uncompressed'})")
+    print(f"Built {len(manifest)} assets.")
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
@@ -0,0 +1,214 @@
+# Fingerprinted, precompressed static assets.
+#
+# build_assets() copies every file under the static folder to
+# static/dist/<name>.<content hash>.<ext>, writes .gz and .br siblings for
+# text files, records the mapping in static/dist/manifest.json and deletes
+# the build output no longer in it. Once init_assets() has run,
+# url_for('static', filename='css/style.css') emits the fingerprinted URL,
+# and those files are served with a one-year immutable Cache-Control from
+# the precompressed variant the client accepts, so workers never compress
+# assets per request. Every process checks the manifest against the source
+# files' hashes when it first loads it, however it was started; files whose
+# entry is missing or stale are served by Flask's default static handler as
+# before.
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+BUILD_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+_manifest = None
+_served = None
+_lock = threading.Lock()
+
+
+def _write_if_missing(path, data):
+    # Fingerprinted names are content-addressed, so an existing file is current
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as output:
+        output.write(data)
+    os.replace(temporary, path)
+
+
+def _compressible(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or ''
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _source_files(static_folder):
+    # (manifest name, path) of every source file, skipping the build output
+    for directory, subdirectories, filenames in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(static_folder):
+            subdirectories[:] = [name for name in subdirectories if name != BUILD_DIR]
+        for filename in sorted(filenames):
+            source = os.path.join(directory, filename)
+            yield os.path.relpath(source, static_folder).replace(os.sep, '/'), source
+
+
+def _digest(path):
+    with open(path, 'rb') as asset:
+        return hashlib.sha256(asset.read()).hexdigest()
+
+
+def _prune(build_root, manifest):
+    # Remove fingerprinted files (and their .gz/.br) that the manifest no longer lists
+    current = {MANIFEST_NAME}
+    for entry in manifest.values():
+        built = os.path.relpath(entry['file'], BUILD_DIR)
+        current.update(os.path.normpath(built + suffix) for suffix in ('', '.gz', '.br'))
+    for directory, _, filenames in os.walk(build_root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if os.path.normpath(os.path.relpath(path, build_root)) not in current and not filename.endswith('.tmp'):
+                os.remove(path)
+
+
+def build_assets(static_folder):
+    """Fingerprint and precompress the files in `static_folder`; returns the manifest."""
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    manifest = {}
+    for name, source in _source_files(static_folder):
+        with open(source, 'rb') as asset:
+            data = asset.read()
+
+        digest = hashlib.sha256(data).hexdigest()
+        stem, extension = os.path.splitext(name)
+        hashed = f'{stem}.{digest[:HASH_LENGTH]}{extension}'
+        target = os.path.join(build_root, hashed)
+        _write_if_missing(target, data)
+
+        encodings = []
+        if _compressible(name):
+            # Only keep variants that are actually smaller
+            variants = [('gzip', '.gz', lambda raw: gzip.compress(raw, 9, mtime=0))]
+            if brotli is not None:
+                variants.insert(0, ('br', '.br', lambda raw: brotli.compress(raw, quality=11)))
+            for encoding, suffix, compress in variants:
+                compressed = compress(data)
+                if len(compressed) < len(data):
+                    _write_if_missing(target + suffix, compressed)
+                    encodings.append(encoding)
+        manifest[name] = {'file': f'{BUILD_DIR}/{hashed}', 'hash': digest, 'encodings': encodings}
+
+    if manifest:
+        os.makedirs(build_root, exist_ok=True)
+        temporary = os.path.join(build_root, f'{MANIFEST_NAME}.{os.getpid()}.tmp')
+        with open(temporary, 'w') as output:
+            json.dump(manifest, output, indent=2, sort_keys=True)
+        os.replace(temporary, os.path.join(build_root, MANIFEST_NAME))
+    if os.path.isdir(build_root):
+        _prune(build_root, manifest)
+    reset_manifest()
+    return manifest
+
+
+def current_entries(static_folder, manifest):
+    """The entries of `manifest` whose source file still has the recorded hash."""
+    current = {}
+    for name, source in _source_files(static_folder):
+        entry = manifest.get(name)
+        if entry is not None and entry.get('hash') == _digest(source):
+            current[name] = entry
+    stale = len(manifest) - len(current)
+    if stale:
+        logger.warning('%d static assets changed since the last build; run `flask build-assets`', stale)
+    return current
+
+
+def reset_manifest():
+    """Forget the loaded manifest so the next lookup rereads it."""
+    global _manifest, _served
+    with _lock:
+        _manifest = _served = None
+
+
+def _load_manifest(static_folder):
+    global _manifest, _served
+    if _manifest is None:
+        with _lock:
+            if _manifest is None:
+                try:
+                    with open(os.path.join(static_folder, BUILD_DIR, MANIFEST_NAME)) as manifest_file:
+                        manifest = current_entries(static_folder, json.load(manifest_file))
+                except (OSError, ValueError):
+                    manifest = {}
+                _served = {entry['file']: entry['encodings'] for entry in manifest.values()}
+                _manifest = manifest
+    return _manifest, _served
+
+
+def _fingerprint_static_urls(endpoint, values):
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    manifest, _ = _load_manifest(current_app.static_folder)
+    entry = manifest.get(values['filename'])
+    if entry is not None:
+        values['filename'] = entry['file']
+
+
+def send_static(filename):
+    """Static view: fingerprinted files are immutable and served precompressed."""
+    app = current_app._get_current_object()
+    _, served = _load_manifest(app.static_folder)
+    encodings = served.get(filename)
+    if encodings is None:
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = next((name for name in encodings if request.accept_encodings[name]), None)
+    suffix = {'br': '.br', 'gzip': '.gz'}.get(encoding, '')
+    response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype,
+                                   max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.content_encoding = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Make url_for('static', ...) emit fingerprinted URLs and serve them immutable."""
+    app.url_defaults(_fingerprint_static_urls)
+    if app.has_static_folder:
+        app.view_functions['static'] = send_static
+
+
+def load_app_manifest(app):
+    """Load and verify `app`'s manifest now rather than on the first request."""
+    if not app.has_static_folder:
+        return {}
+    return _load_manifest(app.static_folder)[0]
+
+
+def build_app_assets(app):
+    """build_assets() for `app`'s static folder; a read-only folder is logged, not fatal."""
+    if not app.has_static_folder:
+        return {}
+    try:
+        return build_assets(app.static_folder)
+    except OSError as error:
+        logger.warning('Could not build static assets in %s: %s', app.static_folder, error)
+        return {}
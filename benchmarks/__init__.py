@@ -0,0 +1,13 @@
+# Standalone benchmark scripts; run them from the repository root, e.g.
+#   python -m benchmarks.search
+import os
+
+
+def database_url(directory, name='bench.db'):
+    """Return the database a benchmark may fill with synthetic data.
+
+    That is BENCHMARK_DATABASE_URL when set, else a new SQLite file in
+    `directory`. DATABASE_URL is deliberately ignored so a shell configured
+    for a real database never has learners seeded into it.
+    """
+    return os.environ.get('BENCHMARK_DATABASE_URL') or f'sqlite:///{directory}/{name}'
@@ -0,0 +1,66 @@
+"""Worker cold-start cost of the schema step against a high-latency database.
+
+    python -m benchmarks.cold_start [--latency-ms 20] [--runs 5]
+
+Each run starts a fresh interpreter, imports the app and performs the
+schema step a worker used to run on import (db.create_all()) or the one it
+runs now (ensure_schema in 'check' mode). Every statement sent to the
+database sleeps for `--latency-ms` first, to stand in for a remote server.
+Uses a throwaway SQLite database brought to the latest migration first.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUN = r'''
+import json, sys, time
+started = time.perf_counter()
+from sqlalchemy import event
+from app import app, db
+from startup import ensure_schema
+
+latency = float(sys.argv[2]) / 1000
+statements = 0
+with app.app_context():
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def delay(*args):
+        global statements
+        statements += 1
+        time.sleep(latency)
+
+    if sys.argv[1] == 'create_all':
+        db.create_all()
+    else:
+        ensure_schema(app, mode='check')
+print(json.dumps({'seconds': time.perf_counter() - started, 'statements': statements}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{directory}/cold_start.db', FLASK_APP='app')
+        subprocess.run([sys.executable, '-m', 'flask', 'db', 'upgrade'], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        for mode in ('create_all', 'check'):
+            results = []
+            for _ in range(args.runs):
+                output = subprocess.run([sys.executable, '-c', RUN, mode, str(args.latency_ms)],
+                                        env=env, check=True, capture_output=True, text=True).stdout
+                results.append(json.loads(output.strip().splitlines()[-1]))
+            seconds = statistics.median(result['seconds'] for result in results)
+            print(f'{mode:<11} median cold start {seconds * 1000:8.1f} ms   '
+                  f'{results[0]["statements"]} statements at {args.latency_ms:g} ms each')
+
+
+if __name__ == '__main__':
+    main()
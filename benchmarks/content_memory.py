@@ -0,0 +1,75 @@
+"""Memory held by the static content: raw learning_content lists vs ContentRegistry.
+
+    python -m benchmarks.content_memory [--scale 1 --scale 100]
+
+Content is replicated `--scale` times with distinct strings, as it would
+be if the catalogue grew, and the retained size of each representation
+is measured with tracemalloc. Every gunicorn worker without preload_app
+holds its own copy, so multiply by the worker count for the per-box cost.
+"""
+import argparse
+import gc
+import tracemalloc
+
+import learning_content
+from content_registry import ContentRegistry
+
+
+def _vary(value, copy):
+    if isinstance(value, str):
+        # Build a new string object so copies do not share storage
+        return ''.join([value, f' #{copy}']) if copy else ''.join([value, ''])
+    if isinstance(value, dict):
+        return {key: _vary(item, copy) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_vary(item, copy) for item in value]
+    return value
+
+
+def raw_content(scale):
+    # Keys and enum-like values (levels, difficulties) repeat across copies
+    learning_paths, projects, exercises = [], [], []
+    for copy in range(scale):
+        for path in learning_content.learning_paths:
+            path = _vary(path, copy)
+            path['level'] = path['level'].split(' #')[0]
+            learning_paths.append(path)
+        for project in learning_content.projects:
+            project = _vary(project, copy)
+            project['difficulty'] = project['difficulty'].split(' #')[0]
+            projects.append(project)
+        for exercise in learning_content.exercises:
+            exercise = _vary(exercise, copy)
+            exercise['difficulty'] = exercise['difficulty'].split(' #')[0]
+            exercise['topic'] = exercise['topic'].split(' #')[0]
+            exercises.append(exercise)
+    return learning_paths, projects, exercises
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, action='append')
+    args = parser.parse_args()
+
+    for scale in args.scale or [1, 100]:
+        raw, raw_size = retained(lambda: raw_content(scale))
+        # Build the registry from a fresh copy so it owns none of `raw`
+        registry, registry_size = retained(lambda: ContentRegistry(*raw_content(scale)))
+        print(f'scale {scale:>4}: raw lists {raw_size / 1024:10.1f} KiB   '
+              f'registry {registry_size / 1024:10.1f} KiB   '
+              f'({registry_size / raw_size:.0%} of raw)')
+        del raw, registry
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Submissions per second through the sandboxed grading pool.
+
+    python -m benchmarks.grading [--workers 1 --workers 2 --workers 4] [--submissions 200]
+
+Grades correct reference solutions for every exercise in learning_content.py,
+round-robin, at each pool size. The producer backs off whenever the pool
+reports GradingQueueFull, as the web app would, so the numbers include
+queueing under backpressure. Latency is measured from submit() to result.
+"""
+import argparse
+import os
+import time
+from collections import Counter
+
+from grading import GradingPool, GradingQueueFull
+from learning_content import exercise_tests
+
+SOLUTIONS = {
+    'ex-basics-1': '''
+def check_guess(secret, guess):
+    if guess < secret:
+        return 'too low'
+    if guess > secret:
+        return 'too high'
+    return 'correct'
+''',
+    'ex-basics-2': '''
+def find_max(numbers):
+    return max(numbers)
+
+def find_min(numbers):
+    return min(numbers)
+
+def filter_even(numbers):
+    return [n for n in numbers if n % 2 == 0]
+
+def filter_odd(numbers):
+    return [n for n in numbers if n % 2]
+''',
+    'ex-oop-1': '''
+class BankAccount:
+    def __init__(self, balance=0):
+        self.balance = balance
+
+    def deposit(self, amount):
+        self.balance += amount
+
+    def withdraw(self, amount):
+        if amount > self.balance:
+            raise ValueError('insufficient funds')
+        self.balance -= amount
+
+class SavingsAccount(BankAccount):
+    def __init__(self, balance, rate):
+        super().__init__(balance)
+        self.rate = rate
+
+    def add_interest(self):
+        self.balance += self.balance * self.rate
+''',
+    'ex-oop-2': '''
+class Library:
+    def __init__(self):
+        self.books = {}
+
+    def add_book(self, title):
+        self.books[title] = None
+
+    def borrow(self, title, member):
+        if title not in self.books or self.books[title] is not None:
+            raise ValueError(f'{title} is not available')
+        self.books[title] = member
+
+    def return_book(self, title):
+        self.books[title] = None
+
+    def available_books(self):
+        return [title for title, member in self.books.items() if member is None]
+''',
+    'ex-errors-1': '''
+def parse_age(text):
+    age = int(text.strip())
+    if age < 0:
+        raise ValueError('age cannot be negative')
+    return age
+''',
+    'ex-adv-1': '''
+class Fibonacci:
+    def __init__(self, n):
+        self.remaining = n
+        self.a, self.b = 0, 1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.remaining <= 0:
+            raise StopIteration
+        self.remaining -= 1
+        value = self.a
+        self.a, self.b = self.b, self.a + self.b
+        return value
+''',
+    'ex-adv-2': '''
+import functools
+import time
+
+def timed(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wrapper.last_duration = time.perf_counter() - started
+    return wrapper
+''',
+}
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(workers, submissions, queue_size):
+    pool = GradingPool(workers=workers, queue_size=queue_size)
+    exercise_ids = sorted(SOLUTIONS)
+    try:
+        # Let every worker process finish starting before timing
+        for future in [pool.submit(SOLUTIONS[exercise_ids[0]], exercise_tests[exercise_ids[0]]['tests'])
+                       for _ in range(workers)]:
+            future.result()
+
+        pending, latencies, statuses, rejected = [], [], Counter(), 0
+        started = time.perf_counter()
+        for index in range(submissions):
+            exercise_id = exercise_ids[index % len(exercise_ids)]
+            while True:
+                try:
+                    submitted = time.perf_counter()
+                    future = pool.submit(SOLUTIONS[exercise_id], exercise_tests[exercise_id]['tests'])
+                    break
+                except GradingQueueFull:
+                    rejected += 1
+                    time.sleep(0.005)
+            future.add_done_callback(
+                lambda done, submitted=submitted: latencies.append(time.perf_counter() - submitted))
+            pending.append(future)
+        for future in pending:
+            statuses[future.result()['status']] += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+
+    print(f'{workers:>7} {submissions / elapsed:>10.1f} {percentile(latencies, 0.50) * 1000:>9.1f} '
+          f'{percentile(latencies, 0.95) * 1000:>9.1f} {rejected:>9} {dict(statuses)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, action='append')
+    parser.add_argument('--submissions', type=int, default=200)
+    parser.add_argument('--queue-size', type=int, default=64)
+    args = parser.parse_args()
+    pool_sizes = args.workers or sorted({1, 2, os.cpu_count() or 1})
+
+    print(f'{"workers":>7} {"subs/s":>10} {"p50 ms":>9} {"p95 ms":>9} {"backoffs":>9} statuses')
+    for workers in pool_sizes:
+        run(workers, args.submissions, args.queue_size)
+
+
+if __name__ == '__main__':
+    main()
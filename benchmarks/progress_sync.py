@@ -0,0 +1,107 @@
+"""Rows per second: per-row ORM progress writes vs the batched upsert sync.
+
+    python -m benchmarks.progress_sync [--rows 200 --rows 1000] [--repeat 3]
+
+Uses a throwaway SQLite database (or BENCHMARK_DATABASE_URL, if set; never
+DATABASE_URL) with a single synthetic learner. For every batch size each
+path writes fresh topics (inserts) and then completes the same topics
+again, later (updates; the sync only replaces a completion with a newer
+one):
+
+  per-row   one SELECT + ORM insert/update + COMMIT per row, which is what
+            recording progress one row at a time costs today
+  batch     progress_sync.sync_progress(), called in process
+  endpoint  POST /api/progress/batch through the Flask test client
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import database_url
+from seed import SYNTHETIC_PASSWORD
+
+
+def make_items(count, tag):
+    now = datetime.utcnow().isoformat()
+    return [{'path_id': 'beginner', 'topic_id': f'bench-{tag}-{index}', 'completed': True, 'completed_at': now}
+            for index in range(count)]
+
+
+def per_row(user_id, items):
+    from models import db, UserProgress
+
+    for item in items:
+        row = UserProgress.query.filter_by(user_id=user_id, path_id=item['path_id'],
+                                           topic_id=item['topic_id']).first()
+        if row is None:
+            row = UserProgress(user_id=user_id, path_id=item['path_id'], topic_id=item['topic_id'])
+            db.session.add(row)
+        row.completed = item['completed']
+        row.completed_at = datetime.fromisoformat(item['completed_at'])
+        db.session.commit()
+
+
+def batch(user_id, items):
+    from progress_sync import sync_progress
+
+    sync_progress(user_id, items)
+
+
+def endpoint(client, items, max_rows):
+    for start in range(0, len(items), max_rows):
+        response = client.post('/api/progress/batch', json=items[start:start + max_rows])
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, action='append')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = database_url(directory)
+        os.environ.setdefault('SECRET_KEY', 'benchmark')
+        os.environ.setdefault('SESSION_FILE', f'{directory}/sessions.db')
+        from app import app
+        from seed import seed_scale
+        from startup import ensure_schema
+
+        ensure_schema(app, mode='upgrade')
+        with app.app_context():
+            user_id, _ = seed_scale(1, progress_per_user=0, projects_per_user=0, notes_per_user=0)
+        client = app.test_client()
+        client.post('/login', data={'username': f'learner{user_id}', 'password': SYNTHETIC_PASSWORD})
+        max_rows = app.config['PROGRESS_BATCH_MAX_ROWS']
+
+        print(f'{"rows":>6} {"path":>9} {"insert rows/s":>14} {"update rows/s":>14}')
+        run = 0
+        for rows in args.rows or [200, 1000]:
+            for name in ('per-row', 'batch', 'endpoint'):
+                inserts, updates = [], []
+                for _ in range(args.repeat):
+                    run += 1
+                    fresh = make_items(rows, run)
+                    with app.app_context():
+                        if name == 'per-row':
+                            inserts.append(timed(per_row, user_id, fresh))
+                            updates.append(timed(per_row, user_id, make_items(rows, run)))
+                        elif name == 'batch':
+                            inserts.append(timed(batch, user_id, fresh))
+                            updates.append(timed(batch, user_id, make_items(rows, run)))
+                    if name == 'endpoint':
+                        inserts.append(timed(endpoint, client, fresh, max_rows))
+                        updates.append(timed(endpoint, client, make_items(rows, run), max_rows))
+                print(f'{rows:>6} {name:>9} {rows / min(inserts):>14.0f} {rows / min(updates):>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Users per second through the batched recommendation scorer.
+
+    python -m benchmarks.recommendations [--users 10000 --users 100000 --users 1000000] [--batch-size 20000]
+
+Scores synthetic learners against the real topics and the sample job skills
+the way rebuild_recommendations() does, batch by batch, without a database,
+so the figures isolate encoding, the matrix products and the top-k
+selection. Each learner has completed a random prefix of the topics in path
+order, has the next couple in progress and has finished a few projects.
+Peak memory is the process high-water mark after each run.
+"""
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from recommendations import RecommendationModel, top_k, ranked_rows, TOP_K, BATCH_SIZE
+from seed import SAMPLE_JOB_SKILLS
+
+
+def synthetic_batch(model, users, rng):
+    completed, in_progress, projects = model.empty_batch(users)
+    topics = completed.shape[1]
+    done = rng.integers(0, topics + 1, size=users)
+    columns = np.arange(topics)
+    completed[columns < done[:, None]] = 1.0
+    in_progress[(columns >= done[:, None]) & (columns < done[:, None] + 2)] = 1.0
+    projects[rng.random(projects.shape) < 0.2] = 1.0
+    return completed, in_progress, projects
+
+
+def run(model, users, batch_size, k, rng):
+    encode = score = select = ranked = 0.0
+    for start in range(0, users, batch_size):
+        size = min(batch_size, users - start)
+        started = time.perf_counter()
+        batch = synthetic_batch(model, size, rng)
+        encoded = time.perf_counter()
+        topic_scores, skill_scores = model.score(*batch)
+        scored = time.perf_counter()
+        best_topics = top_k(topic_scores, k)
+        best_skills = top_k(skill_scores, k)
+        selected = time.perf_counter()
+        # Building the stored [[name, score], ...] lists is the Python part of a rebuild
+        ranked_rows(best_topics, topic_scores, model.topic_routes)
+        ranked_rows(best_skills, skill_scores, model.skill_names)
+        finished = time.perf_counter()
+
+        encode += encoded - started
+        score += scored - encoded
+        select += selected - scored
+        ranked += finished - selected
+
+    total = encode + score + select + ranked
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'{users:>9} {users / total:>11.0f} {encode:>8.2f} {score:>8.2f} {select:>8.2f} '
+          f'{ranked:>8.2f} {total:>8.2f} {peak_mb:>8.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, action='append')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--top', type=int, default=TOP_K)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = RecommendationModel([(skill['name'], skill['importance_level']) for skill in SAMPLE_JOB_SKILLS])
+    rng = np.random.default_rng(args.seed)
+    print(f'{len(model.topic_routes)} topics, {len(model.skill_names)} skills, '
+          f'{len(model.project_index)} projects, batches of {args.batch_size}')
+    print(f'{"users":>9} {"users/s":>11} {"encode s":>8} {"score s":>8} {"top-k s":>8} '
+          f'{"rows s":>8} {"total s":>8} {"peak MB":>8}')
+    for users in args.users or [10000, 100000, 1000000]:
+        run(model, users, args.batch_size, args.top, rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""Latency, throughput and SQL-per-request benchmark for every GET route in app.py.
+
+    python -m benchmarks.routes [--users 1000] [--requests 200] [--mode client --mode gunicorn]
+    python -m benchmarks.routes --save-baseline      # record benchmarks/baseline.json
+    python -m benchmarks.routes --check-baseline     # exit 1 on regressions
+
+Seeds a throwaway SQLite database (or BENCHMARK_DATABASE_URL, if set; never
+DATABASE_URL) at the requested scale, then drives each route anonymously
+and as a logged-in user, through the Flask test client and/or a local
+gunicorn started with gunicorn_config.py. SQL queries per request are only counted in client
+mode, where the benchmark shares a process with the app.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import database_url
+from seed import SYNTHETIC_PASSWORD
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Query strings for routes that do nothing useful without one
+ROUTE_QUERIES = {
+    '/search': '?q=python',
+    '/notes/search': '?q=python',
+}
+
+# Routes that change the session or are not meant to be load-tested
+SKIPPED_ROUTES = {'/logout'}
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def summarize(latencies, elapsed, errors, queries=None):
+    return {
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'errors': errors,
+        'queries': queries,
+    }
+
+
+def benchmark_routes(app):
+    """Return the GET routes without URL arguments, with their query strings."""
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static' or rule.arguments or 'GET' not in rule.methods:
+            continue
+        if rule.rule in SKIPPED_ROUTES:
+            continue
+        routes.append(rule.rule + ROUTE_QUERIES.get(rule.rule, ''))
+    return sorted(set(routes))
+
+
+def seed(app, users, progress_per_user, notes_per_user):
+    """Fill the database with sample content and `users` synthetic learners.
+
+    Returns the id of the first synthetic learner.
+    """
+    from models import User
+    from seed import seed_sample_data, seed_scale
+    from startup import ensure_schema
+
+    ensure_schema(app, mode='upgrade')
+    with app.app_context():
+        seed_sample_data()
+        learners = User.query.filter(User.username.like('learner%'))
+        existing = learners.count()
+        if existing < users:
+            seed_scale(users - existing, progress_per_user=progress_per_user,
+                       projects_per_user=1, notes_per_user=notes_per_user)
+        return learners.order_by(User.id).first().id
+
+
+def run_client(app, routes, requests, user_id):
+    """Drive every route through the Flask test client."""
+    from sqlalchemy import event
+    from models import db
+
+    counter = {'queries': 0}
+
+    def count(*args):
+        counter['queries'] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+
+    results = {}
+    try:
+        for variant in ('anonymous', 'logged_in'):
+            client = app.test_client()
+            if variant == 'logged_in':
+                with client.session_transaction() as session:
+                    session['user_id'] = user_id
+                    session['username'] = f'learner{user_id}'
+            for route in routes:
+                for _ in range(min(5, requests)):
+                    client.get(route)
+                latencies, errors = [], 0
+                counter['queries'] = 0
+                started = time.perf_counter()
+                for _ in range(requests):
+                    request_started = time.perf_counter()
+                    response = client.get(route)
+                    latencies.append(time.perf_counter() - request_started)
+                    errors += response.status_code >= 500
+                elapsed = time.perf_counter() - started
+                results[f'client {variant} {route}'] = summarize(
+                    latencies, elapsed, errors, round(counter['queries'] / requests, 2))
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _opener(base_url, user_id):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    if user_id is not None:
+        form = urllib.parse.urlencode({'username': f'learner{user_id}', 'password': SYNTHETIC_PASSWORD}).encode()
+        # The session cookie is set on the login redirect even if the page after it fails
+        _fetch(opener, base_url + '/login', data=form)
+    return opener
+
+
+def _fetch(opener, url, data=None):
+    started = time.perf_counter()
+    try:
+        with opener.open(url, data=data, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return time.perf_counter() - started, status
+
+
+def run_gunicorn(routes, requests, concurrency, env, user_id):
+    """Drive every route against a local gunicorn using gunicorn_config.py."""
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '--bind', f'127.0.0.1:{port}', 'app:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    results = {}
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                urllib.request.urlopen(base_url + '/search?q=x', timeout=5).read()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.1)
+
+        for variant in ('anonymous', 'logged_in'):
+            opener = _opener(base_url, user_id if variant == 'logged_in' else None)
+            for route in routes:
+                url = base_url + route
+                for _ in range(min(5, requests)):
+                    _fetch(opener, url)
+                lock = threading.Lock()
+                latencies, statuses = [], []
+
+                def worker(count):
+                    for _ in range(count):
+                        latency, status = _fetch(opener, url)
+                        with lock:
+                            latencies.append(latency)
+                            statuses.append(status)
+
+                per_thread = max(1, requests // concurrency)
+                started = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    list(pool.map(worker, [per_thread] * concurrency))
+                elapsed = time.perf_counter() - started
+                errors = sum(1 for status in statuses if status >= 500)
+                results[f'gunicorn {variant} {route}'] = summarize(latencies, elapsed, errors)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Return human-readable regressions of `results` against `baseline`."""
+    regressions = []
+    for key, result in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        slower = result['p95_ms'] - previous['p95_ms']
+        if result['p95_ms'] > previous['p95_ms'] * (1 + tolerance) and slower > min_delta_ms:
+            regressions.append(f'{key}: p95 {previous["p95_ms"]} -> {result["p95_ms"]} ms')
+        if result['queries'] is not None and previous.get('queries') is not None \
+                and result['queries'] > previous['queries']:
+            regressions.append(f'{key}: queries/request {previous["queries"]} -> {result["queries"]}')
+        if result['errors'] > previous.get('errors', 0):
+            regressions.append(f'{key}: errors {previous.get("errors", 0)} -> {result["errors"]}')
+    return regressions
+
+
+def print_results(results):
+    print(f'{"route":<52} {"rps":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"sql/req":>8} {"5xx":>5}')
+    for key, result in sorted(results.items()):
+        queries = '-' if result['queries'] is None else f'{result["queries"]:g}'
+        print(f'{key:<52} {result["rps"]:>9} {result["p50_ms"]:>9} {result["p95_ms"]:>9} '
+              f'{result["p99_ms"]:>9} {queries:>8} {result["errors"]:>5}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--progress-per-user', type=int, default=20)
+    parser.add_argument('--notes-per-user', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=200, help='requests per route and variant')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in gunicorn mode')
+    parser.add_argument('--mode', action='append', choices=['client', 'gunicorn'])
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check-baseline', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative p95 slowdown')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore p95 changes below this')
+    args = parser.parse_args()
+    modes = args.mode or ['client']
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = database_url(directory)
+        os.environ.setdefault('SECRET_KEY', 'benchmark')
+        from app import app
+
+        user_id = seed(app, args.users, args.progress_per_user, args.notes_per_user)
+        routes = benchmark_routes(app)
+
+        results = {}
+        if 'client' in modes:
+            results.update(run_client(app, routes, args.requests, user_id))
+        if 'gunicorn' in modes:
+            env = dict(os.environ, SCHEMA_STARTUP='skip')
+            results.update(run_gunicorn(routes, args.requests, args.concurrency, env, user_id))
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}')
+
+    if args.check_baseline:
+        if not os.path.exists(args.baseline):
+            sys.exit(f'No baseline at {args.baseline}; record one with --save-baseline first')
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        if regressions:
+            sys.exit(1)
+        print('No regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Query latency of the content search index at scaled-up content volume.
+
+    python -m benchmarks.search [--scale 100] [--queries 2000]
+
+Replicates every document in learning_content.py `--scale` times (with a
+per-copy suffix so the vocabulary grows too) and compares the inverted
+index against a linear scan over the documents.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from search import SearchIndex, content_documents, tokenize
+
+QUERIES = ['python', 'deco', 'flask api', 'data analysis', 'sql', 'oop inherit',
+           'error handling', 'pandas', 'gener', 'web development', 'algorithms', 'git']
+
+
+def scaled_documents(scale):
+    base = content_documents()
+    documents = []
+    for copy in range(scale):
+        for kind, key, title, url, fields in base:
+            fields = dict(fields, title=f"{fields['title']} v{copy}")
+            documents.append((kind, f'{key}-{copy}', f'{title} v{copy}', url, fields))
+    return documents
+
+
+def linear_scan(documents, query, limit=10):
+    # What a search without an index would have to do for every request
+    tokens = tokenize(query)
+    scored = []
+    for doc in documents:
+        words = tokenize(' '.join(doc[4].values()))
+        score = sum(1 for token in tokens for word in words if word.startswith(token))
+        if score:
+            scored.append((score, doc))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:limit]
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def report(label, samples):
+    print(f'{label:<14} p50 {percentile(samples, 0.50) * 1e6:10.1f} us   '
+          f'p99 {percentile(samples, 0.99) * 1e6:10.1f} us   '
+          f'mean {statistics.mean(samples) * 1e6:10.1f} us')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--scan-queries', type=int, default=50)
+    args = parser.parse_args()
+
+    documents = scaled_documents(args.scale)
+    started = time.perf_counter()
+    index = SearchIndex(documents)
+    print(f'{len(documents)} documents, index built in {time.perf_counter() - started:.3f} s')
+
+    rng = random.Random(0)
+    samples = []
+    for _ in range(args.queries):
+        query = rng.choice(QUERIES)
+        started = time.perf_counter()
+        index.search(query)
+        samples.append(time.perf_counter() - started)
+    report('index', samples)
+
+    samples = []
+    for _ in range(args.scan_queries):
+        query = rng.choice(QUERIES)
+        started = time.perf_counter()
+        linear_scan(documents, query)
+        samples.append(time.perf_counter() - started)
+    report('linear scan', samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Concurrent read/write throughput of the SQLite fallback in each journal mode.
+
+    python -m benchmarks.sqlite_concurrency [--readers 4] [--writers 2] [--seconds 5] [--users 2000]
+
+Seeds a throwaway database once, then for each mode starts `--readers`
+and `--writers` processes, standing in for gunicorn workers, against a
+fresh copy of it. Readers run the dashboard's per-user queries and
+writers upsert one progress row per transaction, as fast as they can for
+`--seconds`:
+
+  default     SQLite's defaults: rollback journal, synchronous=FULL
+  wal-full    WAL and busy_timeout, but synchronous=FULL
+  concurrent  database.SQLITE_PRAGMAS (WAL, synchronous=NORMAL,
+              busy_timeout, mmap), the app's default SQLITE_MODE
+
+"locked" counts operations that failed with "database is locked".
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from database import SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+MODES = {
+    'default': (),
+    'wal-full': (('journal_mode', 'WAL'), ('synchronous', 'FULL'), ('busy_timeout', 5000)),
+    'concurrent': SQLITE_PRAGMAS,
+}
+
+READ_SQL = (
+    'SELECT topic_id, completed_at FROM user_progress WHERE user_id = ? AND completed = 1 '
+    'ORDER BY completed_at DESC LIMIT 5',
+    'SELECT completed_topics, completed_by_level FROM user_progress_summaries WHERE user_id = ?',
+)
+WRITE_SQL = (
+    'INSERT INTO user_progress (user_id, path_id, topic_id, completed, completed_at) VALUES (?, ?, ?, 1, ?) '
+    'ON CONFLICT (user_id, path_id, topic_id) DO UPDATE SET completed = excluded.completed, '
+    'completed_at = excluded.completed_at'
+)
+
+
+def seed(path, users):
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['SQLITE_MODE'] = 'default'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('SESSION_FILE', f'{os.path.dirname(path)}/sessions.db')
+    from app import app
+    from seed import seed_scale
+    from startup import ensure_schema
+
+    ensure_schema(app, mode='upgrade')
+    with app.app_context():
+        first_id, _ = seed_scale(users, progress_per_user=20, projects_per_user=1, notes_per_user=0)
+    return first_id
+
+
+def work(role, path, pragmas, seconds, first_id, users, results):
+    # Python's default 5 s busy wait applies in every mode, as it does in the app
+    connection = sqlite3.connect(path)
+    apply_sqlite_pragmas(connection, pragmas)
+    rng = random.Random(os.getpid())
+    latencies, locked = [], 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        user_id = first_id + rng.randrange(users)
+        started = time.perf_counter()
+        try:
+            if role == 'read':
+                for statement in READ_SQL:
+                    connection.execute(statement, (user_id,)).fetchall()
+            else:
+                connection.execute(WRITE_SQL, (user_id, 'beginner', f'bench-{rng.randrange(50)}',
+                                               datetime.utcnow().isoformat(' ')))
+                connection.commit()
+        except sqlite3.OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            connection.rollback()
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    results.put((role, latencies, locked))
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(mode, pragmas, template, directory, args, first_id):
+    path = f'{directory}/{mode}.db'
+    shutil.copyfile(template, path)
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    roles = ['read'] * args.readers + ['write'] * args.writers
+    processes = [context.Process(target=work, args=(role, path, pragmas, args.seconds, first_id, args.users,
+                                                    results))
+                 for role in roles]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    figures = {}
+    for role in ('read', 'write'):
+        latencies = [value for kind, samples, _ in collected if kind == role for value in samples]
+        locked = sum(count for kind, _, count in collected if kind == role)
+        figures[role] = (len(latencies) / args.seconds, percentile(latencies, 0.99) * 1000, locked)
+    print(f'{mode:<11} {figures["read"][0]:>9.0f} {figures["read"][1]:>9.2f} '
+          f'{figures["write"][0]:>9.0f} {figures["write"][1]:>9.2f} '
+          f'{figures["read"][2] + figures["write"][2]:>7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--mode', action='append', choices=list(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        template = f'{directory}/template.db'
+        first_id = seed(template, args.users)
+        print(f'{args.readers} readers, {args.writers} writers, {args.seconds:g} s per mode, {args.users} users')
+        print(f'{"mode":<11} {"reads/s":>9} {"read p99":>9} {"writes/s":>9} {"write p99":>9} {"locked":>7}')
+        for mode in args.mode or list(MODES):
+            run(mode, MODES[mode], template, directory, args, first_id)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Gunicorn startup time and per-worker memory with and without preload_app.
+
+    python -m benchmarks.startup [--workers 4] [--path /] [--mode preload --mode no-preload]
+
+Starts gunicorn with gunicorn_config.py on a free local port, measures the
+time until the first request to `--path` succeeds, then reports each
+worker's RSS and PSS (proportional set size, which splits copy-on-write
+pages shared with the master between the processes using them).
+Linux only: memory figures come from /proc.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def memory_kib(pid):
+    """Return (rss, pss) in KiB for a process."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0]] = int(parts[1])
+    return values.get('Rss:', 0), values.get('Pss:', 0)
+
+
+def wait_for_first_response(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f'No response from {url} within {timeout} s')
+
+
+def run(mode, workers, path, timeout):
+    port = free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if mode == 'preload' else '0')
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'app:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        status = wait_for_first_response(f'http://127.0.0.1:{port}{path}', timeout)
+        first_request = time.monotonic() - started
+
+        # Give every worker time to boot before measuring
+        deadline = time.monotonic() + timeout
+        while len(child_pids(server.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(1.0)
+
+        master = memory_kib(server.pid)
+        worker_memory = [memory_kib(pid) for pid in child_pids(server.pid)]
+        print(f'{mode:<11} first request {first_request * 1000:8.0f} ms (HTTP {status})   '
+              f'master RSS {master[0] / 1024:6.1f} MiB')
+        for index, (rss, pss) in enumerate(worker_memory):
+            print(f'{"":11} worker {index}: RSS {rss / 1024:6.1f} MiB   PSS {pss / 1024:6.1f} MiB')
+        total_pss = sum(pss for rss, pss in worker_memory) + master[1]
+        print(f'{"":11} total PSS {total_pss / 1024:6.1f} MiB')
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--mode', action='append', choices=['preload', 'no-preload'])
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    for mode in args.mode or ['no-preload', 'preload']:
+        run(mode, args.workers, args.path, args.timeout)
+
+
+if __name__ == '__main__':
+    main()
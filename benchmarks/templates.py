@@ -0,0 +1,109 @@
+"""First-request latency of each lesson route, with and without precompiled templates.
+
+    python -m benchmarks.templates [--runs 5] [--templates path/to/templates]
+
+Every run starts a fresh interpreter, imports the app and times the first
+GET of each lesson route through the test client, as the first visitor to
+a newly started worker would see it:
+
+  lazy      empty bytecode cache: each template is parsed and compiled on
+            first use (the behaviour before the shared cache)
+  bytecode  cache filled by `flask compile-templates`: first use only loads
+            the cached code
+  eager     filled cache and compile_templates() at startup, as gunicorn
+            workers now do: the time moves from the first request to boot
+  eager-cold  compile_templates() at startup with an empty cache, i.e. what
+            boot would cost without the shared cache
+
+Startup is the import plus eager loading, of which "compile" is the
+compile_templates() call. First requests to the cached lesson pages also
+include rendering the page for the page cache. Lesson routes are the topic
+routes from learning_content.py and /technical_interviews. Pass
+--templates when the templates are not in the app's default folder.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUN = r'''
+import json, sys, time
+started = time.perf_counter()
+from app import app
+from content_registry import registry
+from startup import compile_templates
+
+if sys.argv[2]:
+    app.template_folder = sys.argv[2]
+compiling = time.perf_counter()
+if sys.argv[1].startswith('eager'):
+    compile_templates(app)
+compile_seconds = time.perf_counter() - compiling
+startup = time.perf_counter() - started
+
+routes = ['/' + topic.route for path in registry.learning_paths for topic in path.topics]
+routes.append('/technical_interviews')
+client = app.test_client()
+first = {}
+for route in routes:
+    requested = time.perf_counter()
+    status = client.get(route).status_code
+    first[route] = (time.perf_counter() - requested, status)
+print(json.dumps({'startup': startup, 'compile': compile_seconds, 'first': first}))
+'''
+
+MODES = ('lazy', 'bytecode', 'eager', 'eager-cold')
+
+
+def run(mode, env, templates):
+    output = subprocess.run([sys.executable, '-c', RUN, mode, templates or ''],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--templates', help='template folder to use instead of the app default')
+    args = parser.parse_args()
+    templates = os.path.abspath(args.templates) if args.templates else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        base_env = dict(os.environ, DATABASE_URL=f'sqlite:///{directory}/templates.db',
+                        SESSION_FILE=f'{directory}/sessions.db', SECRET_KEY='benchmark', FLASK_APP='app')
+        subprocess.run([sys.executable, '-m', 'flask', 'db', 'upgrade'], env=base_env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        results = {mode: [] for mode in MODES}
+        for index in range(args.runs):
+            for mode in MODES:
+                # Cold modes get a new, empty cache every run; the others share a filled one
+                cold = mode in ('lazy', 'eager-cold')
+                cache = f'{directory}/{mode}-{index}' if cold else f'{directory}/shared'
+                env = dict(base_env, TEMPLATE_CACHE_DIR=cache)
+                if mode == 'bytecode' and index == 0:
+                    # Fill the shared cache, as `flask compile-templates` would
+                    run('eager', env, templates)
+                results[mode].append(run(mode, env, templates))
+
+    routes = list(results['lazy'][0]['first'])
+    width = max(len(route) for route in routes)
+    print(f'{"route":<{width}} {"status":>6} ' + ' '.join(f'{mode + " ms":>13}' for mode in MODES))
+    for route in routes:
+        status = results['lazy'][0]['first'][route][1]
+        medians = [statistics.median(result['first'][route][0] for result in results[mode]) * 1000
+                   for mode in MODES]
+        print(f'{route:<{width}} {status:>6} ' + ' '.join(f'{value:>13.1f}' for value in medians))
+    totals = [statistics.median(sum(seconds for seconds, status in result['first'].values())
+                                for result in results[mode]) * 1000 for mode in MODES]
+    print(f'{"all routes":<{width}} {"":>6} ' + ' '.join(f'{value:>13.1f}' for value in totals))
+    for label in ('startup', 'compile'):
+        values = [statistics.median(result[label] for result in results[mode]) * 1000 for mode in MODES]
+        print(f'{label:<{width}} {"":>6} ' + ' '.join(f'{value:>13.1f}' for value in values))
+
+
+if __name__ == '__main__':
+    main()
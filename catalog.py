@@ -0,0 +1,135 @@
+# Per-process caches for catalog data that is read on every request but
+# only changes when an admin edits it.
+import hashlib
+import json
+import threading
+import time
+from itertools import groupby
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+
+from models import db, JobSkill, Resource, ResourceCategory
+
+# Cached values are also dropped after this many seconds, so edits made by
+# another process (a CLI command, another gunicorn worker) show up eventually.
+CACHE_TTL = 300
+
+_cache = {}
+# Reentrant, since one cached loader may read another
+_cache_lock = threading.RLock()
+
+# Model class -> cache keys that must be dropped when a row of it changes
+_dependencies = {}
+
+
+def catalog_cache(key, models):
+    """Cache the decorated loader under `key` until one of `models` is written."""
+    for model in models:
+        _dependencies.setdefault(model, set()).add(key)
+
+    def decorator(loader):
+        def wrapper():
+            entry = _cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+                return entry[1]
+            with _cache_lock:
+                entry = _cache.get(key)
+                if entry is None or time.monotonic() - entry[0] >= CACHE_TTL:
+                    entry = (time.monotonic(), loader())
+                    _cache[key] = entry
+            return entry[1]
+
+        wrapper.__name__ = loader.__name__
+        wrapper.__doc__ = loader.__doc__
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*keys):
+    """Drop the given cache keys, or every cached value if none are given."""
+    with _cache_lock:
+        if not keys:
+            _cache.clear()
+        for key in keys:
+            _cache.pop(key, None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stale_keys(session, flush_context):
+    # Remember which caches this transaction touched; they are dropped on commit
+    stale = session.info.setdefault('stale_catalog_keys', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        stale.update(_dependencies.get(type(obj), ()))
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_keys(session):
+    stale = session.info.pop('stale_catalog_keys', None)
+    if stale:
+        invalidate(*stale)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_stale_keys(session):
+    session.info.pop('stale_catalog_keys', None)
+
+
+@catalog_cache('resources', [Resource, ResourceCategory])
+def get_resource_catalog():
+    """Return (resources_by_category, categories) for the /resources page."""
+    # One joined query loads every category together with its resources
+    categories = (ResourceCategory.query
+                  .options(joinedload(ResourceCategory.resources))
+                  .order_by(ResourceCategory.id)
+                  .all())
+
+    resources_by_category = {}
+    category_list = []
+    for category in categories:
+        category_list.append({
+            'id': category.id,
+            'name': category.name,
+            'description': category.description
+        })
+        resources_by_category[category.name] = [
+            {
+                'title': resource.title,
+                'url': resource.url,
+                'description': resource.description,
+                'type': resource.resource_type,
+                'is_free': resource.is_free
+            }
+            for resource in sorted(category.resources, key=lambda r: r.id)
+        ]
+
+    return resources_by_category, category_list
+
+
+@catalog_cache('job_skills', [JobSkill])
+def get_job_skill_catalog():
+    """Return (skills_by_category, categories) for the /job_skills page."""
+    # The database sorts; grouping consecutive rows needs no lookups
+    rows = db.session.execute(
+        db.select(JobSkill.category, JobSkill.name, JobSkill.description, JobSkill.importance_level)
+        .order_by(JobSkill.category, JobSkill.importance_level.desc(), JobSkill.name)
+    ).all()
+
+    skills_by_category = {
+        category: [
+            {'name': row.name, 'description': row.description, 'importance': row.importance_level}
+            for row in skills
+        ]
+        for category, skills in groupby(rows, key=lambda row: row.category)
+    }
+    return skills_by_category, list(skills_by_category)
+
+
+@catalog_cache('job_skills_json', [JobSkill])
+def get_job_skills_json():
+    """Return (body, etag) for /api/job_skills, serialized once per cache lifetime."""
+    skills_by_category, categories = get_job_skill_catalog()
+    body = json.dumps({'categories': categories, 'job_skills': skills_by_category},
+                      separators=(',', ':')).encode()
+    return body, hashlib.sha256(body).hexdigest()[:32]
@@ -0,0 +1,160 @@
+# Immutable, indexed view of the static content in learning_content.py.
+#
+# The nested lists of dicts are converted once into frozen, slotted records
+# (no per-object __dict__) with lookup tables by route, id, level, difficulty
+# and topic, so views and templates never walk the raw lists.
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import learning_content
+
+
+def _label(value):
+    # Labels repeated across records (levels, difficulties, topics) share storage
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True, slots=True)
+class Topic:
+    level: str
+    title: str
+    description: str
+    subtopics: tuple
+    time_estimate: str
+    route: str
+
+
+@dataclass(frozen=True, slots=True)
+class LearningPath:
+    level: str
+    description: str
+    topics: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    id: str
+    title: str
+    description: str
+    difficulty: str
+    estimated_hours: int
+    skills_practiced: tuple
+    instructions: tuple
+    extension_ideas: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Exercise:
+    id: str
+    title: str
+    difficulty: str
+    topic: str
+    description: str
+
+
+def _group(records, key):
+    groups = {}
+    for record in records:
+        groups.setdefault(getattr(record, key), []).append(record)
+    return MappingProxyType({name: tuple(items) for name, items in groups.items()})
+
+
+class ContentRegistry:
+    """Learning paths, projects and exercises with O(1) lookups."""
+
+    __slots__ = ('learning_paths', 'projects', 'exercises', '_topics_by_route',
+                 '_topics_by_level', '_subtopics', '_projects_by_id', '_projects_by_difficulty',
+                 '_exercises_by_id', '_exercises_by_difficulty', '_exercises_by_topic')
+
+    def __init__(self, learning_paths, projects, exercises):
+        paths = []
+        for path in learning_paths:
+            level = _label(path['level'])
+            topics = tuple(
+                Topic(
+                    level=level,
+                    title=topic['title'],
+                    description=topic['description'],
+                    subtopics=tuple(topic['subtopics']),
+                    time_estimate=_label(topic['time_estimate']),
+                    route=topic['route']
+                )
+                for topic in path['topics']
+            )
+            paths.append(LearningPath(level=level, description=path['description'], topics=topics))
+
+        self.learning_paths = tuple(paths)
+        self.projects = tuple(
+            Project(
+                id=project['id'],
+                title=project['title'],
+                description=project['description'],
+                difficulty=_label(project['difficulty']),
+                estimated_hours=project['estimated_hours'],
+                skills_practiced=tuple(project['skills_practiced']),
+                instructions=tuple(project['instructions']),
+                extension_ideas=tuple(project['extension_ideas'])
+            )
+            for project in projects
+        )
+        self.exercises = tuple(
+            Exercise(
+                id=exercise['id'],
+                title=exercise['title'],
+                difficulty=_label(exercise['difficulty']),
+                topic=_label(exercise['topic']),
+                description=exercise['description']
+            )
+            for exercise in exercises
+        )
+
+        topics = [topic for path in self.learning_paths for topic in path.topics]
+        self._topics_by_route = MappingProxyType({topic.route: topic for topic in topics})
+        self._topics_by_level = MappingProxyType({path.level: path.topics for path in self.learning_paths})
+        # Subtopics are reachable by topic title as well as by route
+        subtopics = {topic.title: topic.subtopics for topic in topics}
+        subtopics.update({topic.route: topic.subtopics for topic in topics})
+        self._subtopics = MappingProxyType(subtopics)
+
+        self._projects_by_id = MappingProxyType({project.id: project for project in self.projects})
+        self._projects_by_difficulty = _group(self.projects, 'difficulty')
+        self._exercises_by_id = MappingProxyType({exercise.id: exercise for exercise in self.exercises})
+        self._exercises_by_difficulty = _group(self.exercises, 'difficulty')
+        self._exercises_by_topic = _group(self.exercises, 'topic')
+
+    def topic(self, route):
+        """Return the Topic served at `route`, or None."""
+        return self._topics_by_route.get(route)
+
+    def topics_for_level(self, level):
+        return self._topics_by_level.get(level, ())
+
+    def subtopics(self, topic):
+        """Return the subtopics of a topic given its title or route."""
+        return self._subtopics.get(topic, ())
+
+    def levels(self):
+        return tuple(self._topics_by_level)
+
+    def project(self, project_id):
+        return self._projects_by_id.get(project_id)
+
+    def projects_for_difficulty(self, difficulty):
+        return self._projects_by_difficulty.get(difficulty, ())
+
+    def exercise(self, exercise_id):
+        return self._exercises_by_id.get(exercise_id)
+
+    def exercises_for_difficulty(self, difficulty):
+        return self._exercises_by_difficulty.get(difficulty, ())
+
+    def exercises_for_topic(self, topic):
+        return self._exercises_by_topic.get(topic, ())
+
+
+registry = ContentRegistry(
+    learning_content.learning_paths,
+    learning_content.projects,
+    learning_content.exercises
+)
@@ -0,0 +1,161 @@
+# Engine configuration and connection-pool instrumentation.
+#
+# Every gunicorn worker serves at most `threads` requests at once, so its
+# pool keeps that many connections, plus a little overflow for the grading
+# callbacks, capped so workers x (pool + overflow) stays within
+# DB_MAX_CONNECTIONS. Connections are not pinged on checkout. Instead they
+# are recycled before server idle timeouts, and a connection that fails is
+# invalidated with the rest of the pool by SQLAlchemy. SQLite databases run
+# in "concurrent" mode by default: WAL journal, synchronous=NORMAL, a busy
+# timeout and memory-mapped reads, set on every new connection.
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from metrics import register_collector
+from models import db
+
+# Seconds a request waits for a free connection before failing
+POOL_TIMEOUT = 10
+# Reconnect before typical server/proxy idle timeouts close the socket
+POOL_RECYCLE = 300
+# PostgreSQL's default max_connections
+DEFAULT_MAX_CONNECTIONS = 100
+
+SQLITE_MODES = ('concurrent', 'default')
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),
+    ('mmap_size', 256 * 1024 * 1024),
+)
+
+_stats = Counter()
+_max_wait = 0.0
+_stats_lock = threading.Lock()
+_engines = []
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how often they time out."""
+
+    def _do_get(self):
+        global _max_wait
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with _stats_lock:
+                _stats['timeouts'] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with _stats_lock:
+                _stats['waits'] += 1
+                _stats['wait_seconds'] += waited
+                _max_wait = max(_max_wait, waited)
+
+
+def is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(url, workers, threads, max_connections=DEFAULT_MAX_CONNECTIONS, pre_ping=False):
+    """SQLALCHEMY_ENGINE_OPTIONS for `url` in a server of `workers` processes x `threads` threads."""
+    if is_memory_sqlite(url):
+        # Flask-SQLAlchemy shares one connection for in-memory databases
+        return {}
+    pool_size = max(1, threads)
+    per_worker = max(pool_size, max_connections // max(1, workers))
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': min(pool_size, per_worker - pool_size),
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_recycle': POOL_RECYCLE,
+        'pool_pre_ping': pre_ping,
+        # Reuse the most recent connection so surplus ones idle out and get recycled
+        'pool_use_lifo': True,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=SQLITE_PRAGMAS):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection)
+
+
+def _on_connect(dbapi_connection, connection_record):
+    with _stats_lock:
+        _stats['connects'] += 1
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info['checked_out_at'] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop('checked_out_at', None)
+    if started is not None:
+        with _stats_lock:
+            _stats['checkins'] += 1
+            _stats['held_seconds'] += time.perf_counter() - started
+
+
+def init_database(app):
+    """Attach SQLite pragmas (per SQLITE_MODE) and pool instrumentation to `app`'s engine."""
+    mode = app.config.setdefault('SQLITE_MODE', 'concurrent')
+    if mode not in SQLITE_MODES:
+        raise ValueError(f'SQLITE_MODE must be one of {SQLITE_MODES}, not {mode!r}')
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite' and mode == 'concurrent':
+        event.listen(engine, 'connect', _on_sqlite_connect)
+    event.listen(engine, 'connect', _on_connect)
+    event.listen(engine, 'checkout', _on_checkout)
+    event.listen(engine, 'checkin', _on_checkin)
+    _engines.append(engine)
+    return engine
+
+
+@register_collector
+def _pool_metrics():
+    with _stats_lock:
+        stats = dict(_stats)
+        max_wait = _max_wait
+    # engine.pool is looked up each time; dispose() replaces it after a fork
+    pools = [engine.pool for engine in _engines if isinstance(engine.pool, QueuePool)]
+    return {
+        'app_db_pool_size': ('gauge', 'Connections the pool keeps open',
+                             [({}, sum(pool.size() for pool in pools))]),
+        'app_db_pool_checked_out': ('gauge', 'Connections currently checked out',
+                                    [({}, sum(pool.checkedout() for pool in pools))]),
+        'app_db_pool_overflow': ('gauge', 'Connections open beyond pool_size (negative while the pool fills)',
+                                 [({}, sum(pool.overflow() for pool in pools))]),
+        'app_db_pool_checkouts_total': ('counter', 'Connection checkouts',
+                                        [({}, stats.get('waits', 0))]),
+        'app_db_pool_checkout_wait_seconds_total': ('counter', 'Time spent waiting for a connection',
+                                                    [({}, stats.get('wait_seconds', 0.0))]),
+        'app_db_pool_checkout_wait_seconds_max': ('gauge', 'Longest wait for a connection in this process',
+                                                  [({}, max_wait)]),
+        'app_db_pool_checkout_timeouts_total': ('counter', 'Checkouts that gave up after pool_timeout',
+                                                [({}, stats.get('timeouts', 0))]),
+        'app_db_pool_checked_out_seconds_total': ('counter', 'Time connections spent checked out',
+                                                  [({}, stats.get('held_seconds', 0.0))]),
+        'app_db_pool_connects_total': ('counter', 'New database connections opened',
+                                       [({}, stats.get('connects', 0))]),
+    }
@@ -0,0 +1,87 @@
+# Streaming CSV / NDJSON exports of learner data.
+#
+# Rows are read with yield_per, which makes SQLAlchemy use a server-side
+# cursor on PostgreSQL (stream_results) and fetch BATCH_SIZE rows at a time
+# everywhere else, and are encoded one batch per chunk. Memory therefore
+# stays bounded by a single batch whatever the table size, and the header
+# (or first batch) goes out before the query has finished. Password hashes
+# are never exported.
+import csv
+import io
+import zlib
+from datetime import datetime
+
+from api import dumps
+from models import db, User, UserProgress, UserProject, UserNote
+
+BATCH_SIZE = 5000
+GZIP_LEVEL = 6
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+EXPORTS = {
+    'users': (User.id, User.username, User.email, User.created_at),
+    'progress': (UserProgress.id, UserProgress.user_id, UserProgress.path_id, UserProgress.topic_id,
+                 UserProgress.completed, UserProgress.completed_at),
+    'projects': (UserProject.id, UserProject.user_id, UserProject.project_id, UserProject.github_url,
+                 UserProject.completed_at),
+    'notes': (UserNote.id, UserNote.user_id, UserNote.content_type, UserNote.content_id, UserNote.notes,
+              UserNote.created_at, UserNote.updated_at),
+}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _batches(table, batch_size):
+    columns = EXPORTS[table]
+    result = db.session.execute(
+        db.select(*columns).order_by(columns[0]).execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        # Release the cursor if the client goes away mid-download
+        result.close()
+
+
+def _csv_chunks(table, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORTS[table]])
+    yield buffer.getvalue().encode()
+    for rows in _batches(table, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(table, batch_size):
+    names = [column.key for column in EXPORTS[table]]
+    for rows in _batches(table, batch_size):
+        yield b''.join(dumps(dict(zip(names, map(_plain, row)))) + b'\n' for row in rows)
+
+
+def export_chunks(table, fmt='csv', batch_size=BATCH_SIZE):
+    """Yield the export of `table` ('users', 'progress', ...) as `fmt` bytes, one batch at a time."""
+    if table not in EXPORTS:
+        raise KeyError(f'Unknown export {table!r}')
+    if fmt == 'csv':
+        return _csv_chunks(table, batch_size)
+    if fmt == 'ndjson':
+        return _ndjson_chunks(table, batch_size)
+    raise ValueError(f'Unknown export format {fmt!r}')
+
+
+def gzip_chunks(chunks, level=GZIP_LEVEL):
+    """Gzip a stream of byte chunks, flushing after each so output is not held back."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,210 @@
+# Content-addressed cache of grading verdicts.
+#
+# Submissions are keyed by sha256(exercise id, test suite version, normalized
+# AST). Normalizing through the AST means formatting, comments and
+# docstrings do not matter, and the suite version is a hash of the
+# exercise's tests, so editing the tests in learning_content.py retires every
+# cached verdict for that exercise without a manual flush. Lookups go to an
+# in-process LRU first and then to the grading_results table, which is
+# pruned back to MAX_STORED_RESULTS least recently used rows by a background
+# job. Hits served from memory are counted in-process and written to their
+# rows in one batch, so the rows the LRU keeps hot are not the ones pruned.
+# Captured output is not cached: it is whatever the submission chose to
+# print, and cached verdicts are handed to other learners.
+import ast
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from jobs import enqueue, task
+from learning_content import exercise_tests
+from metrics import register_collector
+from models import db, GradingResult
+from seed import upsert
+
+MAX_MEMORY_ENTRIES = 2048
+MAX_STORED_RESULTS = 50000
+
+# Stores between checks of the table size
+PRUNE_EVERY = 100
+
+# Memory hits are written to grading_results after this many, or this many
+# seconds after the last write, whichever comes first
+FLUSH_HITS_EVERY = 200
+FLUSH_HITS_INTERVAL = 60
+
+# Only verdicts that depend on the code alone; time and memory limits can
+# trip differently on a busy host
+CACHEABLE_STATUSES = frozenset({'passed', 'failed', 'error'})
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_stats = Counter()
+_stores_since_prune = 0
+_pending_hits = Counter()
+_pending_last_hit = {}
+_last_flush = time.monotonic()
+
+
+def suite_version(exercise_id):
+    """Hash of an exercise's interface and tests."""
+    suite = exercise_tests[exercise_id]
+    return hashlib.sha256(json.dumps(suite, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def normalize(code):
+    """Return a canonical form of `code` that ignores layout, comments and docstrings."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        # Unparseable code is still deterministic; key it on its text
+        return 'source:' + code.strip()
+    return 'ast:' + ast.dump(_strip_docstrings(tree), annotate_fields=False, include_attributes=False)
+
+
+def cache_key(exercise_id, code):
+    raw = '\0'.join((exercise_id, suite_version(exercise_id), normalize(code)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _remember(key, result):
+    with _lock:
+        _memory[key] = result
+        _memory.move_to_end(key)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+            _stats['memory_evictions'] += 1
+
+
+def flush_hits():
+    """Write the hits served from memory since the last flush; returns how many rows."""
+    global _last_flush
+    with _lock:
+        hits = dict(_pending_hits)
+        last_hit = dict(_pending_last_hit)
+        _pending_hits.clear()
+        _pending_last_hit.clear()
+        _last_flush = time.monotonic()
+    if not hits:
+        return 0
+
+    table = GradingResult.__table__
+    db.session.execute(
+        db.update(table).where(table.c.key == db.bindparam('row_key'))
+        .values(hits=table.c.hits + db.bindparam('new_hits'), last_hit_at=db.bindparam('hit_at')),
+        [{'row_key': key, 'new_hits': count, 'hit_at': last_hit[key]} for key, count in hits.items()],
+    )
+    db.session.commit()
+    return len(hits)
+
+
+def get_cached_result(key):
+    """Return the cached verdict for `key`, or None. Never runs any code."""
+    with _lock:
+        result = _memory.get(key)
+        if result is not None:
+            _memory.move_to_end(key)
+            _stats['memory_hits'] += 1
+            _pending_hits[key] += 1
+            _pending_last_hit[key] = datetime.utcnow()
+            due = len(_pending_hits) >= FLUSH_HITS_EVERY or time.monotonic() - _last_flush >= FLUSH_HITS_INTERVAL
+    if result is not None:
+        if due:
+            flush_hits()
+        return result
+
+    row = db.session.get(GradingResult, key)
+    if row is None:
+        _stats['misses'] += 1
+        return None
+
+    _stats['db_hits'] += 1
+    row.hits += 1
+    row.last_hit_at = datetime.utcnow()
+    db.session.commit()
+    _remember(key, row.result)
+    return row.result
+
+
+def store_result(key, exercise_id, result):
+    """Cache a fresh verdict; non-deterministic ones are ignored."""
+    global _stores_since_prune
+    if result.get('status') not in CACHEABLE_STATUSES:
+        return False
+
+    with _lock:
+        _stores_since_prune += 1
+        due = _stores_since_prune >= PRUNE_EVERY
+        if due:
+            _stores_since_prune = 0
+
+    result = dict(result, output='')
+    now = datetime.utcnow()
+    upsert(GradingResult, [{'key': key, 'exercise_id': exercise_id, 'result': result,
+                            'hits': 0, 'created_at': now, 'last_hit_at': now}], ['key'])
+    if due:
+        # Counting and trimming the table is left to a background worker;
+        # it should see this process's memory hits first
+        flush_hits()
+        enqueue('prune_grading_results')
+    db.session.commit()
+    _remember(key, result)
+    _stats['stores'] += 1
+    return True
+
+
+@task('prune_grading_results', max_attempts=1)
+def prune(max_rows=None):
+    """Delete the least recently used rows beyond `max_rows`; returns how many."""
+    max_rows = MAX_STORED_RESULTS if max_rows is None else max_rows
+    flush_hits()
+    excess = db.session.execute(db.select(db.func.count()).select_from(GradingResult)).scalar() - max_rows
+    if excess <= 0:
+        return 0
+    oldest = db.select(GradingResult.key).order_by(GradingResult.last_hit_at).limit(excess)
+    removed = db.session.execute(
+        db.delete(GradingResult).where(GradingResult.key.in_(oldest.scalar_subquery()))
+    ).rowcount
+    db.session.commit()
+    _stats['db_evictions'] += removed
+    return removed
+
+
+def clear_memory():
+    with _lock:
+        _memory.clear()
+
+
+@register_collector
+def _grade_cache_metrics():
+    with _lock:
+        stats = dict(_stats)
+        entries = len(_memory)
+    return {
+        'app_grade_cache_lookups_total': ('counter', 'Grading cache lookups, by outcome', [
+            ({'outcome': 'memory_hit'}, stats.get('memory_hits', 0)),
+            ({'outcome': 'db_hit'}, stats.get('db_hits', 0)),
+            ({'outcome': 'miss'}, stats.get('misses', 0)),
+        ]),
+        'app_grade_cache_stores_total': ('counter', 'Verdicts added to the grading cache',
+                                         [({}, stats.get('stores', 0))]),
+        'app_grade_cache_evictions_total': ('counter', 'Verdicts evicted from the grading cache, by tier', [
+            ({'tier': 'memory'}, stats.get('memory_evictions', 0)),
+            ({'tier': 'db'}, stats.get('db_evictions', 0)),
+        ]),
+        'app_grade_cache_memory_entries': ('gauge', 'Verdicts held in this process',
+                                           [({}, entries)]),
+    }
@@ -0,0 +1,376 @@
+# Exercise grading in a pool of sandboxed worker processes.
+#
+# Each pool worker is a small, freshly spawned interpreter (it never imports
+# the app). For every submission it forks a child that drops the environment
+# and inherited file descriptors, moves into an empty directory and an empty
+# network namespace, gives up root for an unprivileged user, lowers its
+# resource limits, installs an audit hook refusing network, process and
+# filesystem changes and any read outside the standard library and
+# site-packages, runs the learner's code and the exercise tests, and writes
+# a JSON result to a pipe. The worker kills children that exceed the wall-clock
+# limit. In the web process, one thread per worker feeds it from a bounded
+# queue; submit() never waits for a free worker and raises GradingQueueFull
+# when the queue is full.
+#
+# The audit hook lives in the submission's own interpreter, so its policy is
+# frozen in a closure and the kernel (namespace, uid, rlimits) enforces the
+# parts that matter most even if the hook is subverted. This is still not a
+# substitute for running the app itself in a container.
+import ctypes
+import io
+import json
+import logging
+import multiprocessing
+import os
+import pwd
+import queue
+import resource
+import select
+import shutil
+import signal
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from contextlib import redirect_stderr, redirect_stdout
+
+logger = logging.getLogger(__name__)
+
+# Captured stdout/stderr kept in a result
+MAX_OUTPUT_CHARS = 4000
+
+# Audit events a submission may not raise (prefix match)
+BLOCKED_EVENTS = (
+    'socket.', 'subprocess.', 'os.system', 'os.exec', 'os.fork', 'os.forkpty', 'os.posix_spawn',
+    'os.spawn', 'os.kill', 'os.remove', 'os.rename', 'os.rmdir', 'os.mkdir', 'os.chmod', 'os.chown',
+    'os.truncate', 'os.link', 'os.symlink', 'os.putenv', 'os.unsetenv', 'shutil.', 'ctypes.',
+    'urllib.', 'ftplib.', 'http.', 'smtplib.', 'webbrowser.', 'pty.',
+    # Walking the heap would reach the audit hook's closure
+    'gc.',
+)
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+
+# Account submissions run as when the grader is started as root
+GRADING_USER = 'nobody'
+NOBODY_ID = 65534
+
+# <sched.h> / <linux/prctl.h>
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+PR_SET_NO_NEW_PRIVS = 38
+
+
+class GradingQueueFull(Exception):
+    """Raised by submit() when the grading queue is at capacity."""
+
+
+class Limits:
+    """Resource limits applied to every submission."""
+
+    def __init__(self, cpu_seconds=2, memory_mb=256, wall_seconds=5):
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_seconds = wall_seconds
+
+
+def _readable_roots(workdir):
+    paths = sysconfig.get_paths()
+    roots = {workdir}
+    roots.update(paths[name] for name in ('stdlib', 'platstdlib', 'purelib', 'platlib') if name in paths)
+    return tuple(os.path.join(os.path.realpath(root), '') for root in roots)
+
+
+def _make_audit(blocked, readable):
+    """Build the audit hook with its policy frozen in closure cells.
+
+    Submissions run in this interpreter and can rebind anything reachable
+    from sys.modules, builtins included, so the hook keeps private
+    references to everything it calls. Nothing but the interpreter's hook
+    list refers to the returned function.
+    """
+    denied, write_flags = PermissionError, _WRITE_FLAGS
+    is_instance, path_types, fsdecode = isinstance, (str, bytes, os.PathLike), os.fsdecode
+    realpath, join = os.path.realpath, os.path.join
+
+    def may_read(path):
+        # Descriptors were closed before the hook went in, so only names are allowed
+        if path is None:
+            return True
+        if not is_instance(path, path_types):
+            return False
+        return join(realpath(fsdecode(path)), '').startswith(readable)
+
+    def audit(event, args):
+        if event.startswith(blocked):
+            raise denied(f'{event} is not allowed in exercise submissions')
+        if event == 'open':
+            path, mode, flags = args
+            writing = ('w' in mode or 'a' in mode or 'x' in mode or '+' in mode) if is_instance(mode, str) \
+                else flags & write_flags
+            if writing:
+                raise denied('writing files is not allowed in exercise submissions')
+            if not may_read(path):
+                raise denied('reading files is not allowed in exercise submissions')
+        elif event in ('os.listdir', 'os.scandir') and not may_read(args[0]):
+            raise denied('listing directories is not allowed in exercise submissions')
+
+    return audit, may_read
+
+
+def _isolate(workdir, keep_fd):
+    # Nothing from the web process (secrets, database URL, open files) reaches the submission
+    os.environ.clear()
+    os.chdir(workdir)
+    os.closerange(3, keep_fd)
+    os.closerange(keep_fd + 1, os.sysconf('SC_OPEN_MAX'))
+
+
+def _confine(drop_user):
+    """Back the audit hook with the kernel: no network, no privileges.
+
+    Moves the child into an empty network namespace (a new user namespace
+    too when not root), forbids gaining privileges through exec, and with
+    `drop_user` switches from root to the unprivileged GRADING_USER.
+    Returns whether the network namespace was created.
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+    isolated = libc.unshare(CLONE_NEWNET) == 0 or libc.unshare(CLONE_NEWUSER | CLONE_NEWNET) == 0
+    libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0)
+    if drop_user and os.geteuid() == 0:
+        try:
+            user = pwd.getpwnam(GRADING_USER)
+            uid, gid = user.pw_uid, user.pw_gid
+        except KeyError:
+            uid = gid = NOBODY_ID
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    return isolated
+
+
+def _probe_isolation():
+    """Return (network namespace works, GRADING_USER can run this interpreter).
+
+    Runs once per worker in a throwaway child, so the answer is known, and
+    any gap logged, before the first submission.
+    """
+    stdlib = os.path.dirname(os.__file__)
+    pid = os.fork()
+    if pid == 0:
+        isolated = _confine(drop_user=True)
+        usable = os.access(stdlib, os.R_OK | os.X_OK)
+        os._exit((0 if isolated else 1) | (0 if usable else 2))
+    _, status = os.waitpid(pid, 0)
+    code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 3
+    return not code & 1, not code & 2
+
+
+def _sandbox(limits, workdir, drop_user):
+    # Resolve the readable roots while the interpreter's files are still visible
+    audit, may_read = _make_audit(tuple(BLOCKED_EVENTS), _readable_roots(workdir))
+    _confine(drop_user)
+    sys.path[:] = [entry for entry in sys.path if entry and may_read(entry)]
+    cpu = limits.cpu_seconds
+    memory = limits.memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    sys.stdin = io.StringIO('')
+    sys.addaudithook(audit)
+
+
+def _run_tests(code, tests):
+    """Run `code` and then each test against a copy of its globals."""
+    output = io.StringIO()
+    results = []
+    status = 'passed'
+    with redirect_stdout(output), redirect_stderr(output):
+        namespace = {'__name__': '__submission__'}
+        try:
+            exec(compile(code, '<submission>', 'exec'), namespace)
+        except MemoryError:
+            return {'status': 'memory', 'tests': [], 'output': output.getvalue()[:MAX_OUTPUT_CHARS],
+                    'error': 'MemoryError'}
+        except BaseException:
+            return {'status': 'error', 'tests': [], 'output': output.getvalue()[:MAX_OUTPUT_CHARS],
+                    'error': traceback.format_exc(limit=-3)[-MAX_OUTPUT_CHARS:]}
+
+        for name, test in tests:
+            try:
+                exec(compile(test, f'<test {name}>', 'exec'), dict(namespace))
+                results.append({'name': name, 'passed': True, 'message': None})
+            except MemoryError:
+                status = 'memory'
+                results.append({'name': name, 'passed': False, 'message': 'MemoryError'})
+            except BaseException as error:
+                if status == 'passed':
+                    status = 'failed'
+                message = f'{type(error).__name__}: {error}' if str(error) else type(error).__name__
+                results.append({'name': name, 'passed': False, 'message': message[:500]})
+
+    return {'status': status, 'tests': results, 'output': output.getvalue()[:MAX_OUTPUT_CHARS], 'error': None}
+
+
+def _grade_in_child(code, tests, limits, drop_user=True):
+    """Fork a sandboxed child to grade one submission; return its result."""
+    workdir = tempfile.mkdtemp(prefix='grading-')
+    read_fd, write_fd = os.pipe()
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            _isolate(workdir, write_fd)
+            _sandbox(limits, workdir, drop_user)
+            payload = json.dumps(_run_tests(code, tests)).encode()
+        except BaseException:
+            payload = json.dumps({'status': 'error', 'tests': [], 'output': '',
+                                  'error': traceback.format_exc(limit=-3)}).encode()
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(write_fd, view):]
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    chunks = []
+    timed_out = False
+    deadline = started + limits.wall_seconds
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        if timed_out:
+            os.kill(pid, signal.SIGKILL)
+        _, wait_status = os.waitpid(pid, 0)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    if timed_out:
+        result = {'status': 'timeout', 'tests': [], 'output': '',
+                  'error': f'Exceeded the {limits.wall_seconds}s time limit'}
+    elif chunks:
+        result = json.loads(b''.join(chunks))
+    elif os.WIFSIGNALED(wait_status) and os.WTERMSIG(wait_status) in (signal.SIGXCPU, signal.SIGKILL):
+        result = {'status': 'timeout', 'tests': [], 'output': '',
+                  'error': f'Exceeded the {limits.cpu_seconds}s CPU time limit'}
+    else:
+        result = {'status': 'error', 'tests': [], 'output': '', 'error': 'The grader exited unexpectedly'}
+    result['duration_ms'] = duration_ms
+    return result
+
+
+def _worker_main(connection, limits):
+    # Runs in a spawned interpreter; the parent going away ends the loop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    isolated, drop_user = _probe_isolation()
+    if not isolated:
+        logger.warning('Grading children cannot get a network namespace; only the audit hook blocks the network')
+    if not drop_user and os.geteuid() == 0:
+        logger.warning('%s cannot read %s; grading children keep running as root', GRADING_USER, sys.prefix)
+    while True:
+        try:
+            code, tests = connection.recv()
+        except (EOFError, OSError):
+            return
+        connection.send(_grade_in_child(code, tests, limits, drop_user))
+
+
+class GradingPool:
+    """Pre-started grading processes fed from a bounded queue."""
+
+    def __init__(self, workers=2, queue_size=64, limits=None):
+        self.limits = limits or Limits()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._context = multiprocessing.get_context('spawn')
+        self._closed = False
+        self._threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._feed, name=f'grading-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _start_process(self):
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child, self.limits), daemon=True)
+        process.start()
+        child.close()
+        return process, parent
+
+    def _feed(self):
+        process, connection = self._start_process()
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            code, tests, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                connection.send((code, tests))
+                future.set_result(connection.recv())
+            except (EOFError, OSError) as error:
+                # The worker died; fail this job and replace the worker
+                logger.warning('Grading worker %s died: %s', process.pid, error)
+                future.set_exception(RuntimeError('grading worker died'))
+                process.kill()
+                process, connection = self._start_process()
+            except BaseException as error:
+                future.set_exception(error)
+        connection.close()
+        process.join(timeout=5)
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    def submit(self, code, tests):
+        """Queue a submission; returns a Future resolving to the result dict."""
+        if self._closed:
+            raise RuntimeError('grading pool is closed')
+        future = Future()
+        try:
+            self._queue.put_nowait((code, [tuple(test) for test in tests], future))
+        except queue.Full:
+            raise GradingQueueFull(f'{self._queue.maxsize} submissions already waiting') from None
+        return future
+
+    def close(self):
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=10)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_grading_pool(workers=2, queue_size=64, limits=None):
+    """Return this process's pool, starting it on first use (and after fork)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = GradingPool(workers, queue_size, limits)
+                _pool_pid = os.getpid()
+    return _pool
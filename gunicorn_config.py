@@ -1,4 +1,41 @@
+import gc
+import os
+
 bind = "0.0.0.0:$PORT"  # Use PORT environment variable
-workers = 4
-threads = 2
+# app.py sizes each worker's database pool from these
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+threads = int(os.environ.get("GUNICORN_THREADS", 2))
 timeout = 120
+
+# Load the app once in the master and fork workers from it, so templates,
+# content and indexes are shared copy-on-write. Set GUNICORN_PRELOAD=0 to
+# import the app separately in every worker instead.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def when_ready(server):
+    if preload_app:
+        from app import app
+        from startup import preload
+        preload(app)
+        # Keep the collector from touching (and so copying) the preloaded objects
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import app, db
+        from startup import after_fork
+        after_fork(app, db)
+
+
+def post_worker_init(worker):
+    # Without preload each worker loads its own templates, from the shared
+    # bytecode cache, and checks the asset manifest against the static files
+    # before it accepts requests
+    if not preload_app:
+        from app import app
+        from assets import load_app_manifest
+        from startup import compile_templates
+        compile_templates(app)
+        load_app_manifest(app)
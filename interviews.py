@@ -0,0 +1,100 @@
+# Spaced-repetition practice for technical interview questions.
+#
+# Each (user, question) pair keeps SM-2 state: an ease factor, the current
+# interval and the next due time. A learner's queue is read from the
+# (user_id, due_at) index as a bounded range scan, topped up with questions
+# they have never seen, so its cost does not grow with review history.
+from datetime import datetime, timedelta
+
+from models import db, InterviewQuestion, InterviewReview
+from seed import insert_missing
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# Review grades run from 0 (blackout) to 5 (perfect); below 3 is a lapse
+MIN_QUALITY = 0
+MAX_QUALITY = 5
+PASSING_QUALITY = 3
+
+
+def schedule(ease, interval_days, repetitions, quality):
+    """Apply one SM-2 review; returns (ease, interval_days, repetitions)."""
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval_days = 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * ease))
+        repetitions += 1
+
+    ease += 0.1 - (MAX_QUALITY - quality) * (0.08 + (MAX_QUALITY - quality) * 0.02)
+    return max(MIN_EASE, ease), interval_days, repetitions
+
+
+def _question_json(question, review=None):
+    return {
+        'id': question.id,
+        'slug': question.slug,
+        'topic': question.topic,
+        'difficulty': question.difficulty,
+        'prompt': question.prompt,
+        'answer': question.answer,
+        'due_at': str(review.due_at) if review else None,
+        'interval_days': review.interval_days if review else 0,
+        'repetitions': review.repetitions if review else 0,
+    }
+
+
+def review_queue(user_id, limit=10, now=None):
+    """Return up to `limit` questions to practise: due reviews first, then new ones."""
+    now = now or datetime.utcnow()
+    due = db.session.execute(
+        db.select(InterviewReview, InterviewQuestion)
+        .join(InterviewQuestion, InterviewReview.question_id == InterviewQuestion.id)
+        .where(InterviewReview.user_id == user_id, InterviewReview.due_at <= now)
+        .order_by(InterviewReview.due_at)
+        .limit(limit)
+    ).all()
+    queue = [_question_json(question, review) for review, question in due]
+
+    if len(queue) < limit:
+        seen = (db.select(InterviewReview.id)
+                .where(InterviewReview.user_id == user_id,
+                       InterviewReview.question_id == InterviewQuestion.id))
+        new = db.session.execute(
+            db.select(InterviewQuestion)
+            .where(~seen.exists())
+            .order_by(InterviewQuestion.id)
+            .limit(limit - len(queue))
+        ).scalars()
+        queue.extend(_question_json(question) for question in new)
+    return queue
+
+
+def record_review(user_id, question_id, quality, now=None):
+    """Grade one review and reschedule the question; returns the review row."""
+    now = now or datetime.utcnow()
+    # Concurrent first reviews both insert; the loser's insert is a no-op and
+    # it waits on the winner's row lock below
+    insert_missing(InterviewReview, [{'user_id': user_id, 'question_id': question_id, 'ease': DEFAULT_EASE,
+                                      'interval_days': 0, 'repetitions': 0, 'lapses': 0, 'due_at': now}],
+                   ['user_id', 'question_id'])
+    review = db.session.execute(
+        db.select(InterviewReview)
+        .where(InterviewReview.user_id == user_id, InterviewReview.question_id == question_id)
+        .with_for_update()
+    ).scalar_one()
+
+    if quality < PASSING_QUALITY and review.repetitions > 0:
+        review.lapses += 1
+    review.ease, review.interval_days, review.repetitions = schedule(
+        review.ease, review.interval_days, review.repetitions, quality)
+    review.due_at = now + timedelta(days=review.interval_days)
+    review.last_reviewed_at = now
+    db.session.commit()
+    return review
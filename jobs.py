@@ -0,0 +1,308 @@
+# Database-backed background jobs.
+#
+# Views call enqueue() to add a row to the jobs table as part of their own
+# transaction and return immediately; `flask worker` claims and runs jobs.
+# A claim is a single UPDATE ... RETURNING over the next queued job, chosen
+# by priority and age. On PostgreSQL the inner SELECT uses FOR UPDATE SKIP
+# LOCKED so concurrent workers never wait on each other; SQLite serializes
+# writers, which gives the same one-worker-per-job guarantee. Failed jobs
+# are retried with exponential backoff up to max_attempts. While a job runs
+# its worker refreshes heartbeat_at every HEARTBEAT_INTERVAL; a running job
+# whose heartbeat is older than STALE_AFTER has lost its worker and is
+# requeued, or marked failed once it has used up its attempts. Done and
+# failed jobs are deleted by the worker once they are older than RETENTION.
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from metrics import register_collector
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# Retry n waits RETRY_BASE_SECONDS * 2**(n - 1)
+RETRY_BASE_SECONDS = 10
+
+# How often a worker records that it is still running a job
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+
+# A running job without a heartbeat for this long has lost its worker
+STALE_AFTER = timedelta(minutes=2)
+
+# Finished jobs are kept this long for inspection, then deleted
+RETENTION = timedelta(days=7)
+
+# How often a worker process purges finished jobs, and how many rows per DELETE
+PURGE_INTERVAL = timedelta(hours=1)
+PURGE_BATCH_SIZE = 1000
+
+# Window for the latency figures on /metrics
+LATENCY_WINDOW = timedelta(minutes=5)
+
+_tasks = {}
+
+
+def task(name, max_attempts=3, priority=0):
+    """Register the decorated function as the job `name`.
+
+    The function is called with the job's payload as keyword arguments,
+    inside an app context.
+    """
+    def decorator(func):
+        _tasks[name] = (func, max_attempts, priority)
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, priority=None, delay=0):
+    """Add a job to the session; it becomes visible when the caller commits."""
+    if name not in _tasks:
+        raise KeyError(f'Unknown job {name!r}')
+    func, max_attempts, default_priority = _tasks[name]
+    job = Job(
+        name=name,
+        payload=payload or {},
+        priority=default_priority if priority is None else priority,
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay)
+    )
+    db.session.add(job)
+    return job
+
+
+def claim(worker_id):
+    """Mark the next runnable job as running and return it, or None."""
+    now = datetime.utcnow()
+    next_job = (db.select(Job.id)
+                .where(Job.status == 'queued', Job.run_at <= now)
+                .order_by(Job.priority.desc(), Job.run_at, Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery())
+    row = db.session.execute(
+        db.update(Job)
+        .where(Job.id == next_job, Job.status == 'queued')
+        .values(status='running', started_at=now, heartbeat_at=now, locked_by=worker_id,
+                attempts=Job.attempts + 1)
+        .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+    ).first()
+    db.session.commit()
+    return row
+
+
+def _finish(job_id, **values):
+    db.session.execute(db.update(Job).where(Job.id == job_id).values(**values))
+    db.session.commit()
+
+
+def _heartbeat(engine, job_id, stop, interval):
+    # Own connection, so the beat commits regardless of the task's transaction
+    while not stop.wait(interval):
+        try:
+            with engine.begin() as connection:
+                connection.execute(db.update(Job).where(Job.id == job_id, Job.status == 'running')
+                                   .values(heartbeat_at=datetime.utcnow()))
+        except Exception:
+            logger.exception('Heartbeat for job %s failed', job_id)
+
+
+def run_job(row, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Run a claimed job, heartbeating while it runs, and record the outcome."""
+    started = time.monotonic()
+    entry = _tasks.get(row.name)
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, name=f'job-heartbeat-{row.id}', daemon=True,
+                            args=(db.engine, row.id, stop, heartbeat_interval.total_seconds()))
+    beat.start()
+    try:
+        if entry is None:
+            raise KeyError(f'Unknown job {row.name!r}')
+        entry[0](**row.payload)
+    except Exception as error:
+        db.session.rollback()
+        message = ''.join(traceback.format_exception(error))[-4000:]
+        if row.attempts < row.max_attempts:
+            delay = RETRY_BASE_SECONDS * 2 ** (row.attempts - 1)
+            logger.warning('Job %s (%s) failed on attempt %d, retrying in %ds: %s',
+                           row.id, row.name, row.attempts, delay, error)
+            _finish(row.id, status='queued', locked_by=None, last_error=message,
+                    run_at=datetime.utcnow() + timedelta(seconds=delay))
+        else:
+            logger.error('Job %s (%s) failed after %d attempts: %s', row.id, row.name, row.attempts, error)
+            _finish(row.id, status='failed', finished_at=datetime.utcnow(), last_error=message)
+        return False
+    finally:
+        stop.set()
+        beat.join()
+
+    _finish(row.id, status='done', finished_at=datetime.utcnow(), last_error=None)
+    logger.info('Job %s (%s) done in %.3fs, waited %.3fs', row.id, row.name,
+                time.monotonic() - started, (datetime.utcnow() - row.run_at).total_seconds())
+    return True
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """Requeue jobs whose worker stopped heartbeating, or fail them when out of attempts.
+
+    Returns how many were requeued.
+    """
+    now = datetime.utcnow()
+    stale = (Job.status == 'running') & (db.func.coalesce(Job.heartbeat_at, Job.started_at) < now - stale_after)
+    failed = db.session.execute(
+        db.update(Job)
+        .where(stale, Job.attempts >= Job.max_attempts)
+        .values(status='failed', locked_by=None, finished_at=now,
+                last_error='The worker stopped heartbeating on the last attempt')
+    ).rowcount
+    if failed:
+        logger.error('Failed %d stale jobs that had used all their attempts', failed)
+    count = db.session.execute(
+        db.update(Job)
+        .where(stale, Job.attempts < Job.max_attempts)
+        .values(status='queued', locked_by=None)
+    ).rowcount
+    db.session.commit()
+    return count
+
+
+def purge_finished(retention=RETENTION, batch_size=PURGE_BATCH_SIZE):
+    """Delete done and failed jobs that finished before `retention` ago; returns how many.
+
+    Deletes in batches of `batch_size` so a large backlog never holds a long write lock.
+    """
+    cutoff = datetime.utcnow() - retention
+    removed = 0
+    while True:
+        batch = (db.select(Job.id)
+                 .where(Job.status.in_(('done', 'failed')), Job.finished_at < cutoff)
+                 .limit(batch_size)
+                 .scalar_subquery())
+        count = db.session.execute(db.delete(Job).where(Job.id.in_(batch))).rowcount
+        db.session.commit()
+        removed += count
+        if count < batch_size:
+            return removed
+
+
+def _work(app, worker_id, stop, poll_interval):
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                row = claim(worker_id)
+                if row is not None:
+                    run_job(row)
+            except Exception:
+                logger.exception('Job worker %s hit an error', worker_id)
+                db.session.rollback()
+                row = None
+        if row is None:
+            stop.wait(poll_interval)
+
+
+def _run_threads(app, threads, poll_interval, stop):
+    base = f'{socket.gethostname()}:{os.getpid()}'
+    workers = [
+        threading.Thread(target=_work, args=(app, f'{base}:{index}', stop, poll_interval),
+                         name=f'job-worker-{index}')
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Only one thread per process looks for stale jobs and purges old ones
+    next_purge = time.monotonic()
+    with app.app_context():
+        while not stop.wait(poll_interval * 30):
+            try:
+                requeued = requeue_stale()
+                if requeued:
+                    logger.warning('Requeued %d stale jobs', requeued)
+            except Exception:
+                logger.exception('Requeueing stale jobs failed')
+                db.session.rollback()
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + PURGE_INTERVAL.total_seconds()
+                try:
+                    purged = purge_finished()
+                    if purged:
+                        logger.info('Deleted %d finished jobs older than %s', purged, RETENTION)
+                except Exception:
+                    logger.exception('Purging finished jobs failed')
+                    db.session.rollback()
+    for worker in workers:
+        worker.join()
+
+
+def run_worker(app, processes=1, threads=4, poll_interval=1.0):
+    """Run jobs until SIGINT/SIGTERM, in `processes` forked processes of `threads` threads."""
+    stop = threading.Event()
+
+    def shutdown(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    if processes <= 1:
+        _run_threads(app, threads, poll_interval, stop)
+        return
+
+    from startup import after_fork
+    with app.app_context():
+        db.engine.dispose()
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            after_fork(app, db)
+            _run_threads(app, threads, poll_interval, stop)
+            os._exit(0)
+        children.append(pid)
+
+    while not stop.wait(1.0):
+        pass
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+@register_collector
+def _job_metrics():
+    # Read from the jobs table so every web worker reports the same figures
+    now = datetime.utcnow()
+    counts = db.session.execute(
+        db.select(Job.name, Job.status, db.func.count(), db.func.min(Job.run_at))
+        .group_by(Job.name, Job.status)
+    ).all()
+    recent = db.session.execute(
+        db.select(Job.name, Job.run_at, Job.started_at, Job.finished_at)
+        .where(Job.status == 'done', Job.finished_at >= now - LATENCY_WINDOW)
+        .order_by(Job.finished_at.desc())
+        .limit(1000)
+    ).all()
+
+    waits, runs = {}, {}
+    for name, run_at, started_at, finished_at in recent:
+        waits.setdefault(name, []).append((started_at - run_at).total_seconds())
+        runs.setdefault(name, []).append((finished_at - started_at).total_seconds())
+
+    return {
+        'app_jobs': ('gauge', 'Jobs in the table, by task and status',
+                     [({'job': name, 'status': status}, count) for name, status, count, _ in counts]),
+        'app_jobs_oldest_queued_seconds': ('gauge', 'Age of the oldest runnable queued job',
+                                           [({'job': name}, max(0.0, (now - oldest).total_seconds()))
+                                            for name, status, _, oldest in counts if status == 'queued']),
+        'app_job_wait_seconds_max': ('gauge', 'Longest queue wait of jobs finished in the last 5 minutes',
+                                     [({'job': name}, max(values)) for name, values in waits.items()]),
+        'app_job_wait_seconds_avg': ('gauge', 'Mean queue wait of jobs finished in the last 5 minutes',
+                                     [({'job': name}, sum(values) / len(values)) for name, values in waits.items()]),
+        'app_job_run_seconds_avg': ('gauge', 'Mean run time of jobs finished in the last 5 minutes',
+                                    [({'job': name}, sum(values) / len(values)) for name, values in runs.items()]),
+    }
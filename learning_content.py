@@ -218,6 +218,226 @@ exercises = [
     }
 ]
 
+# Automated checks for exercise submissions, keyed by exercise id. The
+# interface tells learners which names their code must define; each test is
+# a snippet run against the submission's globals.
+exercise_tests = {
+    "ex-basics-1": {
+        "interface": "check_guess(secret, guess) returning 'too low', 'too high' or 'correct'",
+        "tests": [
+            ("too low", "assert check_guess(50, 10) == 'too low'"),
+            ("too high", "assert check_guess(50, 90) == 'too high'"),
+            ("correct", "assert check_guess(42, 42) == 'correct'")
+        ]
+    },
+    "ex-basics-2": {
+        "interface": "find_max(numbers), find_min(numbers), filter_even(numbers), filter_odd(numbers)",
+        "tests": [
+            ("max", "assert find_max([3, 9, -2, 7]) == 9"),
+            ("min", "assert find_min([3, 9, -2, 7]) == -2"),
+            ("even", "assert list(filter_even([1, 2, 3, 4, 6])) == [2, 4, 6]"),
+            ("odd", "assert list(filter_odd([1, 2, 3, 4, 5])) == [1, 3, 5]")
+        ]
+    },
+    "ex-oop-1": {
+        "interface": "BankAccount(balance=0) with deposit(amount), withdraw(amount) and a balance attribute; "
+                     "SavingsAccount(balance, rate) subclass with add_interest()",
+        "tests": [
+            ("deposit", "account = BankAccount(100)\naccount.deposit(50)\nassert account.balance == 150"),
+            ("withdraw", "account = BankAccount(100)\naccount.withdraw(30)\nassert account.balance == 70"),
+            ("overdraw", "account = BankAccount(10)\ntry:\n    account.withdraw(20)\nexcept ValueError:\n    pass\n"
+                         "else:\n    raise AssertionError('withdrawing too much should raise ValueError')"),
+            ("interest", "account = SavingsAccount(200, 0.05)\naccount.add_interest()\n"
+                         "assert abs(account.balance - 210) < 1e-9\nassert isinstance(account, BankAccount)")
+        ]
+    },
+    "ex-oop-2": {
+        "interface": "Library() with add_book(title), borrow(title, member), return_book(title) "
+                     "and available_books(); borrowing an unavailable book raises ValueError",
+        "tests": [
+            ("add", "library = Library()\nlibrary.add_book('Dune')\nassert 'Dune' in library.available_books()"),
+            ("borrow", "library = Library()\nlibrary.add_book('Dune')\nlibrary.borrow('Dune', 'ada')\n"
+                       "assert 'Dune' not in library.available_books()"),
+            ("unavailable", "library = Library()\ntry:\n    library.borrow('Dune', 'ada')\nexcept ValueError:\n    pass\n"
+                            "else:\n    raise AssertionError('borrowing a missing book should raise ValueError')"),
+            ("return", "library = Library()\nlibrary.add_book('Dune')\nlibrary.borrow('Dune', 'ada')\n"
+                       "library.return_book('Dune')\nassert 'Dune' in library.available_books()")
+        ]
+    },
+    "ex-errors-1": {
+        "interface": "parse_age(text) returning an int; raises ValueError for text that is not a non-negative whole number",
+        "tests": [
+            ("valid", "assert parse_age(' 42 ') == 42"),
+            ("not a number", "try:\n    parse_age('forty')\nexcept ValueError:\n    pass\n"
+                             "else:\n    raise AssertionError('expected ValueError')"),
+            ("negative", "try:\n    parse_age('-1')\nexcept ValueError:\n    pass\n"
+                         "else:\n    raise AssertionError('expected ValueError')")
+        ]
+    },
+    "ex-adv-1": {
+        "interface": "Fibonacci(n), an iterator over the first n Fibonacci numbers starting 0, 1",
+        "tests": [
+            ("first ten", "assert list(Fibonacci(10)) == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]"),
+            ("empty", "assert list(Fibonacci(0)) == []"),
+            ("iterator", "sequence = Fibonacci(3)\nassert iter(sequence) is sequence\nassert next(sequence) == 0")
+        ]
+    },
+    "ex-adv-2": {
+        "interface": "timed, a decorator that keeps the wrapped function's name and stores the duration "
+                     "of the last call in seconds as wrapper.last_duration",
+        "tests": [
+            ("result", "@timed\ndef add(a, b):\n    return a + b\nassert add(2, 3) == 5"),
+            ("duration", "@timed\ndef add(a, b):\n    return a + b\nadd(1, 1)\nassert add.last_duration >= 0"),
+            ("wraps", "@timed\ndef add(a, b):\n    return a + b\nassert add.__name__ == 'add'")
+        ]
+    }
+}
+
+# Technical interview practice questions, reviewed with spaced repetition
+# (see interviews.py). The id is stable; prompts and answers may be edited.
+interview_questions = [
+    {
+        "id": "reverse-string",
+        "topic": "Coding Challenges",
+        "difficulty": "Easy",
+        "prompt": "Write a function that takes a string as input and returns the string reversed.",
+        "answer": "Slice with a negative step: return text[::-1]. ''.join(reversed(text)) also works; both are O(n)."
+    },
+    {
+        "id": "two-sum",
+        "topic": "Coding Challenges",
+        "difficulty": "Easy",
+        "prompt": "Given a list of integers nums and an integer target, return the indices of the two numbers that add up to target.",
+        "answer": "Walk the list once, keeping a dict of value -> index; for each number check whether target - number is already in the dict. O(n) time, O(n) space."
+    },
+    {
+        "id": "valid-parentheses",
+        "topic": "Coding Challenges",
+        "difficulty": "Medium",
+        "prompt": "Given a string of the characters ()[]{}, decide whether every bracket is closed by the same type in the correct order.",
+        "answer": "Push opening brackets on a stack; on a closing bracket the stack top must be its partner. The string is valid if the stack ends empty. O(n)."
+    },
+    {
+        "id": "lru-cache",
+        "topic": "Coding Challenges",
+        "difficulty": "Hard",
+        "prompt": "Design an LRU cache with O(1) get(key) and put(key, value) that evicts the least recently used entry when full.",
+        "answer": "Combine a hash map with a doubly linked list, or use collections.OrderedDict with move_to_end() on access and popitem(last=False) on eviction."
+    },
+    {
+        "id": "list-vs-tuple",
+        "topic": "Data Structures",
+        "difficulty": "Easy",
+        "prompt": "What are the differences between a list and a tuple in Python?",
+        "answer": "Lists are mutable and tuples are immutable. Tuples are hashable when their items are, so they can be dict keys, and they are slightly smaller and faster to create."
+    },
+    {
+        "id": "dict-complexity",
+        "topic": "Data Structures",
+        "difficulty": "Medium",
+        "prompt": "What is the time complexity of dict lookups and why?",
+        "answer": "Average O(1): keys are hashed to a slot in an open-addressing table. The worst case is O(n) when many keys collide."
+    },
+    {
+        "id": "set-use",
+        "topic": "Data Structures",
+        "difficulty": "Easy",
+        "prompt": "When would you use a set instead of a list?",
+        "answer": "For membership tests, de-duplication and set algebra (union, intersection); membership is O(1) on average instead of O(n)."
+    },
+    {
+        "id": "big-o-binary-search",
+        "topic": "Algorithms",
+        "difficulty": "Easy",
+        "prompt": "What is the complexity of binary search and what does it require?",
+        "answer": "O(log n) comparisons on a sorted sequence with random access; the bisect module implements it."
+    },
+    {
+        "id": "recursion-limit",
+        "topic": "Algorithms",
+        "difficulty": "Medium",
+        "prompt": "What happens when a recursive Python function recurses too deeply, and how do you avoid it?",
+        "answer": "RecursionError once sys.getrecursionlimit() frames are used. Rewrite the recursion as a loop with an explicit stack, or memoize to cut the depth."
+    },
+    {
+        "id": "bfs-vs-dfs",
+        "topic": "Algorithms",
+        "difficulty": "Medium",
+        "prompt": "When do you choose breadth-first over depth-first search?",
+        "answer": "BFS (a queue, collections.deque) finds shortest paths in unweighted graphs; DFS (a stack or recursion) uses less memory on wide graphs and suits cycle detection and topological sorts."
+    },
+    {
+        "id": "dynamic-programming",
+        "topic": "Algorithms",
+        "difficulty": "Hard",
+        "prompt": "What makes a problem a good fit for dynamic programming?",
+        "answer": "Overlapping subproblems and optimal substructure; solve each subproblem once with memoization (functools.lru_cache) or a bottom-up table."
+    },
+    {
+        "id": "generators",
+        "topic": "Python Concepts",
+        "difficulty": "Medium",
+        "prompt": "What is a generator and why use one?",
+        "answer": "A function using yield that produces values lazily, keeping its state between calls. It uses constant memory for long or infinite sequences."
+    },
+    {
+        "id": "decorators",
+        "topic": "Python Concepts",
+        "difficulty": "Medium",
+        "prompt": "How does a decorator work?",
+        "answer": "@decorator above def f is f = decorator(f): a callable that takes a function and returns a replacement, usually a wrapper using functools.wraps to keep the name and docstring."
+    },
+    {
+        "id": "context-managers",
+        "topic": "Python Concepts",
+        "difficulty": "Medium",
+        "prompt": "What does the with statement do?",
+        "answer": "It calls __enter__ on entry and __exit__ on exit, even when an exception is raised, so resources are always released; contextlib.contextmanager builds one from a generator."
+    },
+    {
+        "id": "gil",
+        "topic": "Python Concepts",
+        "difficulty": "Hard",
+        "prompt": "Threads or processes for CPU-bound work in CPython?",
+        "answer": "Processes: the GIL lets only one thread run Python bytecode at a time. Threads still help I/O-bound work because the GIL is released while waiting."
+    },
+    {
+        "id": "memory-management",
+        "topic": "Python Concepts",
+        "difficulty": "Hard",
+        "prompt": "How does CPython free memory?",
+        "answer": "Reference counting frees most objects immediately; a generational garbage collector finds reference cycles."
+    },
+    {
+        "id": "mutable-default",
+        "topic": "Python Concepts",
+        "difficulty": "Medium",
+        "prompt": "Why is def f(items=[]) a bug?",
+        "answer": "Defaults are evaluated once at definition time, so every call shares the same list. Use None and create the list inside the function."
+    },
+    {
+        "id": "testing-fixtures",
+        "topic": "Applied Knowledge",
+        "difficulty": "Medium",
+        "prompt": "What is a pytest fixture?",
+        "answer": "A function marked @pytest.fixture whose return (or yield) value is injected into tests that name it as a parameter, with setup and teardown around the test."
+    },
+    {
+        "id": "n-plus-one",
+        "topic": "Applied Knowledge",
+        "difficulty": "Hard",
+        "prompt": "What is the N+1 query problem and how do you fix it in SQLAlchemy?",
+        "answer": "Loading a list and then issuing one query per item for a relationship. Eager-load with joinedload or selectinload, or aggregate in SQL."
+    },
+    {
+        "id": "rest-idempotency",
+        "topic": "Applied Knowledge",
+        "difficulty": "Medium",
+        "prompt": "Which HTTP methods are idempotent and why does it matter for an API?",
+        "answer": "GET, HEAD, PUT, DELETE and OPTIONS are idempotent; POST is not. Idempotent requests can be safely retried after a timeout."
+    }
+]
+
 # External resources organized by type
 resources = {
     "Tutorials": [
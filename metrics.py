@@ -0,0 +1,192 @@
+# Per-request SQL instrumentation exported in Prometheus text format.
+#
+# Cursor events from every SQLAlchemy engine are attributed to the Flask
+# endpoint handling the current request. For each endpoint we keep request,
+# query and DB-time totals, a few slow statement samples, and statements
+# repeated within a single request (the usual signature of an N+1 loop).
+# Figures are per process; with several gunicorn workers each scrape sees
+# the worker that answered it.
+import logging
+import threading
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Slow-statement samples and repeated statements kept per endpoint
+MAX_SAMPLES = 5
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when an endpoint issues more queries than its budget allows."""
+
+
+class _EndpointStats:
+    __slots__ = ('requests', 'queries', 'db_seconds', 'max_queries', 'slow_queries',
+                 'slow_samples', 'repeated')
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.max_queries = 0
+        self.slow_queries = 0
+        self.slow_samples = {}  # statement -> slowest duration seen
+        self.repeated = {}  # statement -> times flagged as repeated
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Callables returning extra series for render_prometheus()
+_collectors = []
+
+
+def _statement_key(statement):
+    return ' '.join(statement.split())[:200]
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if not has_request_context() or 'sql_queries' not in g:
+        return
+    elapsed = time.perf_counter() - started
+    g.sql_queries += 1
+    g.sql_seconds += elapsed
+    g.sql_statements[statement] += 1
+    if elapsed * 1000 >= g.sql_slow_ms:
+        g.sql_slow.append((statement, elapsed))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _cursor_execute_failed(context):
+    # after_cursor_execute does not fire for failed statements
+    connection = context.connection
+    if connection is not None and connection.info.get('query_start_time'):
+        connection.info['query_start_time'].pop()
+
+
+def init_metrics(app):
+    """Attach per-request SQL accounting to `app`.
+
+    Reads SLOW_QUERY_MS (default 100), N_PLUS_ONE_THRESHOLD (how often one
+    statement may repeat in a request before it is flagged, default 5),
+    SQL_QUERY_BUDGETS ({endpoint: max queries per request}) and
+    SQL_QUERY_BUDGET_STRICT (raise instead of logging; defaults to
+    app.testing so budgets fail the test suite).
+    """
+    app.config.setdefault('SLOW_QUERY_MS', 100)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', 5)
+    app.config.setdefault('SQL_QUERY_BUDGETS', {})
+
+    @app.before_request
+    def _start_sql_accounting():
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+        g.sql_statements = Counter()
+        g.sql_slow = []
+        g.sql_slow_ms = app.config['SLOW_QUERY_MS']
+
+    @app.after_request
+    def _finish_sql_accounting(response):
+        if 'sql_queries' not in g:
+            return response
+        endpoint = request.endpoint or 'unknown'
+        threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        repeated = [(statement, count) for statement, count in g.sql_statements.items() if count >= threshold]
+
+        with _stats_lock:
+            stats = _stats.get(endpoint)
+            if stats is None:
+                stats = _stats[endpoint] = _EndpointStats()
+            stats.requests += 1
+            stats.queries += g.sql_queries
+            stats.db_seconds += g.sql_seconds
+            stats.max_queries = max(stats.max_queries, g.sql_queries)
+            stats.slow_queries += len(g.sql_slow)
+            for statement, elapsed in g.sql_slow:
+                key = _statement_key(statement)
+                if key in stats.slow_samples or len(stats.slow_samples) < MAX_SAMPLES:
+                    stats.slow_samples[key] = max(elapsed, stats.slow_samples.get(key, 0.0))
+            for statement, count in repeated:
+                key = _statement_key(statement)
+                if key in stats.repeated or len(stats.repeated) < MAX_SAMPLES:
+                    stats.repeated[key] = stats.repeated.get(key, 0) + 1
+
+        for statement, count in repeated:
+            logger.warning('Possible N+1 in %s: statement ran %d times: %s',
+                           endpoint, count, _statement_key(statement))
+
+        budget = app.config['SQL_QUERY_BUDGETS'].get(endpoint)
+        if budget is not None and g.sql_queries > budget:
+            message = f'{endpoint} issued {g.sql_queries} SQL queries, budget is {budget}'
+            if app.config.get('SQL_QUERY_BUDGET_STRICT', app.testing):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+def register_collector(collector):
+    """Add series from other modules to the /metrics output.
+
+    `collector()` returns {name: (kind, help_text, [(labels, value), ...])}.
+    """
+    _collectors.append(collector)
+    return collector
+
+
+def reset_metrics():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """Return the collected metrics in Prometheus text exposition format."""
+    with _stats_lock:
+        snapshot = sorted(_stats.items())
+        series = {
+            'app_http_requests_total': ('counter', 'Requests handled, by endpoint',
+                                        [({'endpoint': e}, s.requests) for e, s in snapshot]),
+            'app_sql_queries_total': ('counter', 'SQL statements executed, by endpoint',
+                                      [({'endpoint': e}, s.queries) for e, s in snapshot]),
+            'app_sql_duration_seconds_total': ('counter', 'Time spent executing SQL, by endpoint',
+                                               [({'endpoint': e}, s.db_seconds) for e, s in snapshot]),
+            'app_sql_queries_per_request_max': ('gauge', 'Most SQL statements seen in one request',
+                                                [({'endpoint': e}, s.max_queries) for e, s in snapshot]),
+            'app_sql_slow_queries_total': ('counter', 'Statements slower than SLOW_QUERY_MS',
+                                           [({'endpoint': e}, s.slow_queries) for e, s in snapshot]),
+            'app_sql_slow_query_seconds': ('gauge', 'Slowest duration of sampled slow statements',
+                                           [({'endpoint': e, 'statement': statement}, seconds)
+                                            for e, s in snapshot for statement, seconds in s.slow_samples.items()]),
+            'app_sql_repeated_statement_requests_total': ('counter', 'Requests that repeated a statement '
+                                                          'N_PLUS_ONE_THRESHOLD+ times (likely N+1)',
+                                                          [({'endpoint': e, 'statement': statement}, count)
+                                                           for e, s in snapshot
+                                                           for statement, count in s.repeated.items()]),
+        }
+
+    for collector in _collectors:
+        series.update(collector())
+
+    lines = []
+    for name, (kind, help_text, samples) in series.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            rendered = ','.join(f'{key}="{_label(label)}"' for key, label in labels.items())
+            lines.append(f'{name}{{{rendered}}} {value}' if rendered else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
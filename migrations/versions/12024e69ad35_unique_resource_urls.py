@@ -0,0 +1,36 @@
+"""unique resource urls
+
+Makes resources.url unique so `flask init-db` can upsert resources by URL.
+Duplicate URLs are removed first, keeping the most recent row.
+
+Revision ID: 12024e69ad35
+Revises: f3774fafafbe
+Create Date: 2026-10-18 16:47:52.829564
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '12024e69ad35'
+down_revision = 'f3774fafafbe'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('resources')}
+
+
+def upgrade():
+    # Fresh databases built by db.create_all() already have the index
+    if 'uq_resources_url' in _existing_indexes():
+        return
+    op.execute('DELETE FROM resources WHERE id NOT IN (SELECT MAX(id) FROM resources GROUP BY url)')
+    op.create_index('uq_resources_url', 'resources', ['url'], unique=True)
+
+
+def downgrade():
+    if 'uq_resources_url' in _existing_indexes():
+        op.drop_index('uq_resources_url', table_name='resources')
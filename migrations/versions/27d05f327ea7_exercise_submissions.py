@@ -0,0 +1,44 @@
+"""exercise submissions
+
+Revision ID: 27d05f327ea7
+Revises: 12024e69ad35
+Create Date: 2026-10-18 16:57:13.148454
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '27d05f327ea7'
+down_revision = '12024e69ad35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'exercise_submissions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'exercise_submissions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('exercise_id', sa.String(length=50), nullable=False),
+        sa.Column('code', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('tests_passed', sa.Integer(), nullable=True),
+        sa.Column('tests_total', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('graded_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_exercise_submissions_user_exercise', 'exercise_submissions',
+                    ['user_id', 'exercise_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_exercise_submissions_user_exercise', table_name='exercise_submissions')
+    op.drop_table('exercise_submissions')
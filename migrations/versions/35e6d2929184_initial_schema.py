@@ -0,0 +1,123 @@
+"""initial schema
+
+Databases created before migrations existed already have these tables
+(app.py used to run db.create_all() on import), so each table is only
+created when it is missing.
+
+Revision ID: 35e6d2929184
+Revises:
+Create Date: 2026-10-18 16:36:30.254476
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '35e6d2929184'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=256), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+
+    if 'job_skills' not in existing:
+        op.create_table(
+            'job_skills',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('category', sa.String(length=50), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('importance_level', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+
+    if 'resource_categories' not in existing:
+        op.create_table(
+            'resource_categories',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+
+    if 'user_progress' not in existing:
+        op.create_table(
+            'user_progress',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('path_id', sa.String(length=50), nullable=False),
+            sa.Column('topic_id', sa.String(length=50), nullable=False),
+            sa.Column('completed', sa.Boolean(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'user_projects' not in existing:
+        op.create_table(
+            'user_projects',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('project_id', sa.String(length=50), nullable=False),
+            sa.Column('github_url', sa.String(length=255), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'user_notes' not in existing:
+        op.create_table(
+            'user_notes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('content_type', sa.String(length=50), nullable=False),
+            sa.Column('content_id', sa.String(length=50), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'resources' not in existing:
+        op.create_table(
+            'resources',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=100), nullable=False),
+            sa.Column('url', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('resource_type', sa.String(length=20), nullable=False),
+            sa.Column('category_id', sa.Integer(), nullable=False),
+            sa.Column('is_free', sa.Boolean(), nullable=True),
+            sa.Column('added_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['category_id'], ['resource_categories.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('resources')
+    op.drop_table('user_notes')
+    op.drop_table('user_projects')
+    op.drop_table('user_progress')
+    op.drop_table('resource_categories')
+    op.drop_table('job_skills')
+    op.drop_table('users')
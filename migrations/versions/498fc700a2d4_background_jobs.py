@@ -0,0 +1,45 @@
+"""background jobs
+
+Revision ID: 498fc700a2d4
+Revises: 7ce1ed22caaa
+Create Date: 2026-10-18 17:00:12.717478
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '498fc700a2d4'
+down_revision = '7ce1ed22caaa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'jobs' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_priority_run_at', 'jobs', ['status', 'priority', 'run_at'])
+
+
+def downgrade():
+    op.drop_index('ix_jobs_status_priority_run_at', table_name='jobs')
+    op.drop_table('jobs')
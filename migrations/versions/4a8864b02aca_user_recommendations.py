@@ -0,0 +1,37 @@
+"""user recommendations
+
+Run `flask rebuild-recommendations` after upgrading to fill the table.
+
+Revision ID: 4a8864b02aca
+Revises: c213a5cb48b8
+Create Date: 2026-10-18 17:04:32.624388
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8864b02aca'
+down_revision = 'c213a5cb48b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'user_recommendations' not in tables:
+        op.create_table(
+            'user_recommendations',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('topics', sa.JSON(), nullable=False),
+            sa.Column('skills', sa.JSON(), nullable=False),
+            sa.Column('generated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+
+def downgrade():
+    op.drop_table('user_recommendations')
@@ -0,0 +1,32 @@
+"""job heartbeats
+
+Adds jobs.heartbeat_at, which workers refresh while a job runs so that
+stale jobs are detected by a missed heartbeat instead of their age.
+
+Revision ID: 6be731878f50
+Revises: 4a8864b02aca
+Create Date: 2026-10-18 17:28:20.401100
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6be731878f50'
+down_revision = '4a8864b02aca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('jobs')}
+
+    if 'heartbeat_at' not in columns:
+        with op.batch_alter_table('jobs') as batch_op:
+            batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,93 @@
+"""per-user composite indexes
+
+Adds the indexes behind the dashboard's per-user lookups and makes
+(user_id, path_id, topic_id) and (user_id, content_type, content_id)
+unique. Duplicate rows that would violate the new constraints are
+removed first, keeping one row per group:
+
+- user_progress: a completed row over an incomplete one, then the latest
+  completed_at, so no learner loses a completion;
+- user_notes: the most recently updated note, with the text of the
+  discarded duplicates appended to it so no note is lost.
+
+Remaining ties keep the highest id. completed is ordered through a CASE
+because NULL sorts first under DESC on PostgreSQL and last on SQLite.
+
+Revision ID: 6bf14303bde8
+Revises: 35e6d2929184
+Create Date: 2026-10-18 16:38:02.118527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6bf14303bde8'
+down_revision = '35e6d2929184'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (name, table, columns, unique)
+    ('uq_user_progress_user_path_topic', 'user_progress', ['user_id', 'path_id', 'topic_id'], True),
+    ('ix_user_projects_user_project', 'user_projects', ['user_id', 'project_id'], False),
+    ('uq_user_notes_user_content', 'user_notes', ['user_id', 'content_type', 'content_id'], True),
+]
+
+# Row kept among duplicates: the first in this order (NULL timestamps last on every backend)
+KEEP_ORDER = {
+    'user_progress': 'CASE WHEN completed THEN 0 ELSE 1 END, CASE WHEN completed_at IS NULL THEN 1 ELSE 0 END, completed_at DESC, id DESC',
+    'user_notes': 'CASE WHEN updated_at IS NULL THEN 1 ELSE 0 END, updated_at DESC, id DESC',
+}
+
+NOTE_SEPARATOR = '\n\n'
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _merge_duplicate_notes():
+    """Append the text of every duplicate note to the note that survives the DELETE."""
+    bind = op.get_bind()
+    groups = bind.execute(sa.text(
+        'SELECT user_id, content_type, content_id FROM user_notes '
+        'GROUP BY user_id, content_type, content_id HAVING COUNT(*) > 1'
+    )).all()
+    for user_id, content_type, content_id in groups:
+        rows = bind.execute(sa.text(
+            f'SELECT id, notes FROM user_notes WHERE user_id = :user_id AND content_type = :content_type '
+            f'AND content_id = :content_id ORDER BY {KEEP_ORDER["user_notes"]}'
+        ), {'user_id': user_id, 'content_type': content_type, 'content_id': content_id}).all()
+        texts = []
+        for _, text in rows:
+            if text and text.strip() and text not in texts:
+                texts.append(text)
+        bind.execute(sa.text('UPDATE user_notes SET notes = :notes WHERE id = :id'),
+                     {'notes': NOTE_SEPARATOR.join(texts), 'id': rows[0].id})
+
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        # Fresh databases built by db.create_all() already have the index
+        if name in _existing_indexes(table):
+            continue
+
+        if unique:
+            if table == 'user_notes':
+                _merge_duplicate_notes()
+            partition_by = ', '.join(columns)
+            op.execute(
+                f'DELETE FROM {table} WHERE id IN (SELECT id FROM '
+                f'(SELECT id, ROW_NUMBER() OVER (PARTITION BY {partition_by} ORDER BY {KEEP_ORDER[table]}) AS position '
+                f'FROM {table}) ranked WHERE position > 1)'
+            )
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
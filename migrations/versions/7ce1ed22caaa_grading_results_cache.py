@@ -0,0 +1,38 @@
+"""grading results cache
+
+Revision ID: 7ce1ed22caaa
+Revises: 27d05f327ea7
+Create Date: 2026-10-18 16:58:53.373765
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7ce1ed22caaa'
+down_revision = '27d05f327ea7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'grading_results' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'grading_results',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('exercise_id', sa.String(length=50), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_hit_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_grading_results_last_hit_at', 'grading_results', ['last_hit_at'])
+
+
+def downgrade():
+    op.drop_index('ix_grading_results_last_hit_at', table_name='grading_results')
+    op.drop_table('grading_results')
@@ -0,0 +1,38 @@
+"""job scrape and retention indexes
+
+Indexes the jobs table for the /metrics queries, which count jobs by
+(name, status) and read the jobs finished in the last few minutes, and for
+the worker's purge of finished jobs past their retention.
+
+Revision ID: 9d2e51c07a3b
+Revises: 6be731878f50
+Create Date: 2026-10-18 19:12:40.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2e51c07a3b'
+down_revision = '6be731878f50'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_jobs_name_status_run_at', ['name', 'status', 'run_at']),
+    ('ix_jobs_status_finished_at', ['status', 'finished_at']),
+]
+
+
+def upgrade():
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('jobs')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'jobs', columns)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='jobs')
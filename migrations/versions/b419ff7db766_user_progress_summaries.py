@@ -0,0 +1,40 @@
+"""user progress summaries
+
+Run `flask rebuild-progress-summaries` after upgrading to fill the table
+for existing users.
+
+Revision ID: b419ff7db766
+Revises: 6bf14303bde8
+Create Date: 2026-10-18 16:38:10.678093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b419ff7db766'
+down_revision = '6bf14303bde8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'user_progress_summaries' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'user_progress_summaries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('completed_topics', sa.Integer(), nullable=False),
+        sa.Column('completed_by_path', sa.JSON(), nullable=False),
+        sa.Column('completed_by_level', sa.JSON(), nullable=False),
+        sa.Column('completed_projects', sa.Integer(), nullable=False),
+        sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_progress_summaries')
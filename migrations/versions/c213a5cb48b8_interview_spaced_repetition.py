@@ -0,0 +1,62 @@
+"""interview spaced repetition
+
+Run `flask init-db` after upgrading to load the question bank.
+
+Revision ID: c213a5cb48b8
+Revises: 498fc700a2d4
+Create Date: 2026-10-18 17:02:05.686792
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c213a5cb48b8'
+down_revision = '498fc700a2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'interview_questions' not in tables:
+        op.create_table(
+            'interview_questions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('slug', sa.String(length=100), nullable=False),
+            sa.Column('topic', sa.String(length=50), nullable=False),
+            sa.Column('difficulty', sa.String(length=20), nullable=False),
+            sa.Column('prompt', sa.Text(), nullable=False),
+            sa.Column('answer', sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('slug')
+        )
+
+    if 'interview_reviews' not in tables:
+        op.create_table(
+            'interview_reviews',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('ease', sa.Float(), nullable=False),
+            sa.Column('interval_days', sa.Integer(), nullable=False),
+            sa.Column('repetitions', sa.Integer(), nullable=False),
+            sa.Column('lapses', sa.Integer(), nullable=False),
+            sa.Column('due_at', sa.DateTime(), nullable=False),
+            sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['question_id'], ['interview_questions.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('uq_interview_reviews_user_question', 'interview_reviews',
+                        ['user_id', 'question_id'], unique=True)
+        op.create_index('ix_interview_reviews_user_due', 'interview_reviews', ['user_id', 'due_at'])
+
+
+def downgrade():
+    op.drop_index('ix_interview_reviews_user_due', table_name='interview_reviews')
+    op.drop_index('uq_interview_reviews_user_question', table_name='interview_reviews')
+    op.drop_table('interview_reviews')
+    op.drop_table('interview_questions')
@@ -0,0 +1,59 @@
+"""user note full-text search
+
+SQLite: an FTS5 table kept in sync with user_notes by triggers, backfilled
+from existing notes. PostgreSQL: a generated tsvector column with a GIN
+index.
+
+Revision ID: f3774fafafbe
+Revises: b419ff7db766
+Create Date: 2026-10-18 16:39:54.462808
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3774fafafbe'
+down_revision = 'b419ff7db766'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS user_notes_fts
+                      USING fts5(notes, owner, tokenize = 'unicode61')""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS user_notes_fts_insert AFTER INSERT ON user_notes BEGIN
+                          INSERT INTO user_notes_fts (rowid, notes, owner)
+                          VALUES (new.id, new.notes, 'u' || new.user_id);
+                      END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS user_notes_fts_update AFTER UPDATE OF notes, user_id ON user_notes BEGIN
+                          DELETE FROM user_notes_fts WHERE rowid = old.id;
+                          INSERT INTO user_notes_fts (rowid, notes, owner)
+                          VALUES (new.id, new.notes, 'u' || new.user_id);
+                      END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS user_notes_fts_delete AFTER DELETE ON user_notes BEGIN
+                          DELETE FROM user_notes_fts WHERE rowid = old.id;
+                      END""")
+        # Rebuild the index from scratch so it matches user_notes exactly
+        op.execute("DELETE FROM user_notes_fts")
+        op.execute("""INSERT INTO user_notes_fts (rowid, notes, owner)
+                      SELECT id, notes, 'u' || user_id FROM user_notes""")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("""ALTER TABLE user_notes ADD COLUMN IF NOT EXISTS search_vector tsvector
+                      GENERATED ALWAYS AS (to_tsvector('english', notes)) STORED""")
+        op.execute("""CREATE INDEX IF NOT EXISTS ix_user_notes_search_vector
+                      ON user_notes USING GIN (search_vector)""")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS user_notes_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS user_notes_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS user_notes_fts_insert")
+        op.execute("DROP TABLE IF EXISTS user_notes_fts")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_user_notes_search_vector")
+        op.execute("ALTER TABLE user_notes DROP COLUMN IF EXISTS search_vector")
@@ -21,6 +21,12 @@ class User(db.Model):
     progress = db.relationship('UserProgress', back_populates='user', cascade='all, delete-orphan')
     completed_projects = db.relationship('UserProject', back_populates='user', cascade='all, delete-orphan')
     notes = db.relationship('UserNote', back_populates='user', cascade='all, delete-orphan')
+    progress_summary = db.relationship('UserProgressSummary', back_populates='user', uselist=False,
+                                       cascade='all, delete-orphan')
+    submissions = db.relationship('ExerciseSubmission', back_populates='user', cascade='all, delete-orphan')
+    interview_reviews = db.relationship('InterviewReview', back_populates='user', cascade='all, delete-orphan')
+    recommendations = db.relationship('UserRecommendation', back_populates='user', uselist=False,
+                                      cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -39,9 +45,47 @@ class UserProgress(db.Model):
     # Relationship
     user = db.relationship('User', back_populates='progress')
     
+    # One row per topic per user; the leading user_id also serves the dashboard
+    __table_args__ = (
+        db.Index('uq_user_progress_user_path_topic', 'user_id', 'path_id', 'topic_id', unique=True),
+    )
+    
     def __repr__(self):
         return f'<UserProgress {self.user_id} - {self.path_id} - {self.topic_id}>'
 
+# Per-user rollup of progress, kept up to date by progress.py so the
+# dashboard can read a single row instead of every progress record
+class UserProgressSummary(db.Model):
+    __tablename__ = 'user_progress_summaries'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    completed_topics = db.Column(db.Integer, nullable=False, default=0)
+    completed_by_path = db.Column(db.JSON, nullable=False, default=dict)  # path_id -> completed topics
+    completed_by_level = db.Column(db.JSON, nullable=False, default=dict)  # 'Beginner', ... -> completed topics
+    completed_projects = db.Column(db.Integer, nullable=False, default=0)
+    last_activity_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationship
+    user = db.relationship('User', back_populates='progress_summary')
+    
+    def __repr__(self):
+        return f'<UserProgressSummary {self.user_id} - {self.completed_topics} topics>'
+
+# Precomputed next topics and skills, rebuilt in batches by recommendations.py
+class UserRecommendation(db.Model):
+    __tablename__ = 'user_recommendations'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    topics = db.Column(db.JSON, nullable=False, default=list)  # [[route, score], ...] best first
+    skills = db.Column(db.JSON, nullable=False, default=list)  # [[skill name, score], ...] best first
+    generated_at = db.Column(db.DateTime, nullable=False)
+    
+    # Relationship
+    user = db.relationship('User', back_populates='recommendations')
+    
+    def __repr__(self):
+        return f'<UserRecommendation {self.user_id} - {self.generated_at}>'
+
 # Track user completed projects
 class UserProject(db.Model):
     __tablename__ = 'user_projects'
@@ -55,6 +99,10 @@ class UserProject(db.Model):
     # Relationship
     user = db.relationship('User', back_populates='completed_projects')
     
+    __table_args__ = (
+        db.Index('ix_user_projects_user_project', 'user_id', 'project_id'),
+    )
+    
     def __repr__(self):
         return f'<UserProject {self.user_id} - {self.project_id}>'
 
@@ -73,9 +121,130 @@ class UserNote(db.Model):
     # Relationship
     user = db.relationship('User', back_populates='notes')
     
+    # One note per piece of content per user
+    __table_args__ = (
+        db.Index('uq_user_notes_user_content', 'user_id', 'content_type', 'content_id', unique=True),
+    )
+    
     def __repr__(self):
         return f'<UserNote {self.user_id} - {self.content_type} - {self.content_id}>'
 
+# Code submitted for an exercise and its grading result (see grading.py)
+class ExerciseSubmission(db.Model):
+    __tablename__ = 'exercise_submissions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    exercise_id = db.Column(db.String(50), nullable=False)
+    code = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'passed', 'failed', 'error', ...
+    tests_passed = db.Column(db.Integer, nullable=True)
+    tests_total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.JSON, nullable=True)  # Per-test outcomes, captured output and errors
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    graded_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationship
+    user = db.relationship('User', back_populates='submissions')
+    
+    # A learner's attempts at one exercise, newest last
+    __table_args__ = (
+        db.Index('ix_exercise_submissions_user_exercise', 'user_id', 'exercise_id', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f'<ExerciseSubmission {self.user_id} - {self.exercise_id} - {self.status}>'
+
+# Grading verdicts shared by identical submissions (see grade_cache.py)
+class GradingResult(db.Model):
+    __tablename__ = 'grading_results'
+    
+    key = db.Column(db.String(64), primary_key=True)  # Hash of exercise, test suite and normalized code
+    exercise_id = db.Column(db.String(50), nullable=False)
+    result = db.Column(db.JSON, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_hit_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Least recently used rows are evicted first
+    __table_args__ = (
+        db.Index('ix_grading_results_last_hit_at', 'last_hit_at'),
+    )
+    
+    def __repr__(self):
+        return f'<GradingResult {self.exercise_id} - {self.key[:12]}>'
+
+# Background work queued by views and run by `flask worker` (see jobs.py)
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Registered task name
+    payload = db.Column(db.JSON, nullable=False, default=dict)  # Keyword arguments for the task
+    priority = db.Column(db.Integer, nullable=False, default=0)  # Higher runs first
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Not before; pushed back on retry
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(100), nullable=True)  # Worker that claimed the job
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Refreshed by the worker while the job runs
+    last_error = db.Column(db.Text, nullable=True)
+    
+    # The claim query (next queued job by priority, then age), the /metrics
+    # counts by task and status and the recent-latency and retention scans
+    __table_args__ = (
+        db.Index('ix_jobs_status_priority_run_at', 'status', 'priority', 'run_at'),
+        db.Index('ix_jobs_name_status_run_at', 'name', 'status', 'run_at'),
+        db.Index('ix_jobs_status_finished_at', 'status', 'finished_at'),
+    )
+    
+    def __repr__(self):
+        return f'<Job {self.id} - {self.name} - {self.status}>'
+
+# Interview practice questions, seeded from learning_content.interview_questions
+class InterviewQuestion(db.Model):
+    __tablename__ = 'interview_questions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(100), nullable=False, unique=True)  # Stable id from learning_content.py
+    topic = db.Column(db.String(50), nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    prompt = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.Text, nullable=False)
+    
+    def __repr__(self):
+        return f'<InterviewQuestion {self.slug}>'
+
+# A learner's spaced-repetition state for one question (see interviews.py)
+class InterviewReview(db.Model):
+    __tablename__ = 'interview_reviews'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('interview_questions.id'), nullable=False)
+    ease = db.Column(db.Float, nullable=False, default=2.5)  # SM-2 ease factor
+    interval_days = db.Column(db.Integer, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)  # Successful reviews in a row
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    due_at = db.Column(db.DateTime, nullable=False)
+    last_reviewed_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    user = db.relationship('User', back_populates='interview_reviews')
+    question = db.relationship('InterviewQuestion')
+    
+    # The review queue is a range scan on (user_id, due_at)
+    __table_args__ = (
+        db.Index('uq_interview_reviews_user_question', 'user_id', 'question_id', unique=True),
+        db.Index('ix_interview_reviews_user_due', 'user_id', 'due_at'),
+    )
+    
+    def __repr__(self):
+        return f'<InterviewReview {self.user_id} - {self.question_id} - due {self.due_at}>'
+
 # Job skills tracking
 class JobSkill(db.Model):
     __tablename__ = 'job_skills'
@@ -119,5 +288,10 @@ class Resource(db.Model):
     # Relationship
     category = db.relationship('ResourceCategory', back_populates='resources')
     
+    # Resources are identified by URL so seeding can upsert them
+    __table_args__ = (
+        db.Index('uq_resources_url', 'url', unique=True),
+    )
+    
     def __repr__(self):
         return f'<Resource {self.title}>'
@@ -0,0 +1,131 @@
+# Full-text search over UserNote.notes.
+#
+# SQLite keeps a shadow FTS5 table (user_notes_fts) in sync with triggers;
+# PostgreSQL gets a generated tsvector column with a GIN index. Both are
+# created by migrations and queried through search_notes(), which returns
+# highlighted snippets and an opaque cursor for keyset pagination over
+# (rank, id).
+import base64
+import json
+import re
+from html import escape
+
+from sqlalchemy import text
+
+from models import db
+
+# Snippet highlight markers; swapped for <mark> after the text is escaped
+_HIGHLIGHT_START = '\x02'
+_HIGHLIGHT_END = '\x03'
+
+_SQLITE_SEARCH = """
+    SELECT * FROM (
+        SELECT n.id, n.content_type, n.content_id, n.updated_at,
+               snippet(user_notes_fts, 0, :start, :end, '...', 16) AS snippet,
+               bm25(user_notes_fts) AS rank
+        FROM user_notes_fts
+        JOIN user_notes n ON n.id = user_notes_fts.rowid
+        WHERE user_notes_fts MATCH :match
+    ) AS hits
+    WHERE :after_rank IS NULL OR rank > :after_rank OR (rank = :after_rank AND id > :after_id)
+    ORDER BY rank, id
+    LIMIT :limit
+"""
+
+# ts_rank_cd is negated so that, as with SQLite's bm25(), lower is better. It
+# returns float4; widened to float8 the value survives the round trip through
+# a JSON cursor (a Python float) exactly, so keyset comparisons neither skip
+# nor repeat rows at page boundaries
+_POSTGRES_SEARCH = """
+    SELECT hits.id, hits.content_type, hits.content_id, hits.updated_at,
+           ts_headline('english', hits.notes, hits.query,
+                       'StartSel=' || :start || ', StopSel=' || :end || ', MaxWords=32, MinWords=8')
+               AS snippet,
+           hits.rank
+    FROM (
+        SELECT * FROM (
+            SELECT n.id, n.content_type, n.content_id, n.updated_at, n.notes, q.query,
+                   -CAST(ts_rank_cd(n.search_vector, q.query) AS double precision) AS rank
+            FROM user_notes n, to_tsquery('english', :match) AS q(query)
+            WHERE n.user_id = :user_id AND n.search_vector @@ q.query
+        ) AS ranked
+        WHERE CAST(:after_rank AS double precision) IS NULL OR rank > CAST(:after_rank AS double precision)
+              OR (rank = CAST(:after_rank AS double precision) AND id > :after_id)
+        ORDER BY rank, id
+        LIMIT :limit
+    ) AS hits
+    ORDER BY hits.rank, hits.id
+"""
+
+_word_re = re.compile(r'\w+', re.UNICODE)
+
+
+def _sqlite_match(words, user_id):
+    # Every word must match (the last one as a prefix) within the user's notes
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return f'owner : "u{user_id}" AND notes : ({" ".join(terms)})'
+
+
+def _postgres_match(words):
+    return ' & '.join(words[:-1] + [words[-1] + ':*'])
+
+
+def encode_cursor(rank, note_id):
+    raw = json.dumps([rank, note_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (rank, id) from a cursor, or (None, None) if it is missing or invalid."""
+    if not cursor:
+        return None, None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, note_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), int(note_id)
+    except (ValueError, TypeError):
+        return None, None
+
+
+def _highlight(snippet):
+    return (escape(snippet or '')
+            .replace(_HIGHLIGHT_START, '<mark>')
+            .replace(_HIGHLIGHT_END, '</mark>'))
+
+
+def search_notes(user_id, query, limit=20, cursor=None):
+    """Search one user's notes; returns (results, next_cursor)."""
+    words = _word_re.findall(query.lower())
+    if not words:
+        return [], None
+
+    after_rank, after_id = decode_cursor(cursor)
+    params = {
+        'user_id': user_id,
+        'start': _HIGHLIGHT_START,
+        'end': _HIGHLIGHT_END,
+        'after_rank': after_rank,
+        'after_id': after_id,
+        'limit': limit + 1,
+    }
+
+    if db.session.connection().dialect.name == 'postgresql':
+        params['match'] = _postgres_match(words)
+        rows = db.session.execute(text(_POSTGRES_SEARCH), params).all()
+    else:
+        params['match'] = _sqlite_match(words, user_id)
+        rows = db.session.execute(text(_SQLITE_SEARCH), params).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+
+    results = [{
+        'id': row.id,
+        'content_type': row.content_type,
+        'content_id': row.content_id,
+        'updated_at': str(row.updated_at) if row.updated_at is not None else None,
+        'snippet': _highlight(row.snippet),
+    } for row in rows]
+    return results, next_cursor
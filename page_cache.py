@@ -0,0 +1,125 @@
+# Full-page cache for the static lesson routes.
+#
+# The lesson pages only differ between anonymous and logged-in visitors (the
+# navigation bar), so each variant is rendered once per process and kept as
+# raw bytes with a strong ETag per encoding. The gzip and brotli bodies are
+# compressed on the first request that accepts them, at levels that cost a
+# few milliseconds rather than the maximum. Pages that show per-user data are
+# rendered on every request instead of being cached here.
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, session, make_response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Upper bound on cached variants (two per route)
+MAX_ENTRIES = 512
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+class CachedPage:
+    """Rendered page bytes, compressed per encoding when first requested."""
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.bodies = {'identity': body}
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._lock = threading.Lock()
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {'identity': digest}
+        self.etags.update((encoding, f'{digest}-{encoding}') for encoding in self.encodings)
+
+    def choose_encoding(self):
+        accepted = request.accept_encodings
+        for encoding in self.encodings:
+            if accepted[encoding]:
+                return encoding
+        return 'identity'
+
+    def body(self, encoding):
+        body = self.bodies.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self.bodies.get(encoding)
+                if body is None:
+                    raw = self.bodies['identity']
+                    if encoding == 'br':
+                        body = brotli.compress(raw, quality=BROTLI_QUALITY)
+                    else:
+                        body = gzip.compress(raw, GZIP_LEVEL)
+                    self.bodies[encoding] = body
+        return body
+
+
+def _variant_key():
+    return request.path, 'user_id' in session
+
+
+def _get(key):
+    with _lock:
+        page = _entries.get(key)
+        if page is not None:
+            _entries.move_to_end(key)
+        return page
+
+
+def _put(key, page):
+    with _lock:
+        _entries[key] = page
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def clear():
+    """Drop every cached page, e.g. after templates change."""
+    with _lock:
+        _entries.clear()
+
+
+def cached_page():
+    """Serve the decorated view from the page cache, answering 304s without rendering."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = _variant_key()
+            page = _get(key)
+            if page is None:
+                rendered = make_response(view(*args, **kwargs))
+                if rendered.status_code != 200:
+                    return rendered
+                page = CachedPage(rendered.get_data(), rendered.mimetype)
+                _put(key, page)
+
+            encoding = page.choose_encoding()
+            etag = page.etags[encoding]
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(page.body(encoding))
+                response.mimetype = page.mimetype
+                if encoding != 'identity':
+                    response.headers['Content-Encoding'] = encoding
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            response.vary.add('Accept-Encoding')
+            response.vary.add('Cookie')
+            return response
+
+        return wrapper
+
+    return decorator
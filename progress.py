@@ -0,0 +1,243 @@
+# Incremental maintenance of UserProgressSummary.
+#
+# Every flush that adds, changes or deletes UserProgress/UserProject rows
+# applies the corresponding +1/-1 deltas to the owner's summary row in the
+# same transaction, so the dashboard never has to aggregate progress itself.
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from jobs import task
+from learning_content import learning_paths
+from models import db, User, UserProgress, UserProject, UserProgressSummary
+
+# Topic route/title and level name (lower-cased) -> level from learning_paths
+_topic_levels = {}
+for _path in learning_paths:
+    _topic_levels[_path['level'].lower()] = _path['level']
+    for _topic in _path['topics']:
+        _topic_levels[_topic['route'].lower()] = _path['level']
+        _topic_levels[_topic['title'].lower()] = _path['level']
+
+
+def topic_level(path_id, topic_id):
+    """Return the learning_paths level a progress row belongs to, if known."""
+    return (_topic_levels.get((topic_id or '').lower())
+            or _topic_levels.get((path_id or '').lower()))
+
+
+def total_topics_by_level():
+    """Return the number of topics in each level of learning_paths."""
+    return {path['level']: len(path['topics']) for path in learning_paths}
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the replaced value on assignment, even when the row has expired after
+# a commit; otherwise the old owner/path cannot be debited
+for _attribute in (UserProgress.user_id, UserProgress.path_id, UserProgress.topic_id,
+                   UserProgress.completed, UserProject.user_id):
+    event.listen(_attribute, 'set', _keep_old_value, active_history=True, retval=True)
+
+
+def _old_value(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _progress_contribution(completed, path_id, topic_id):
+    # A progress row counts towards its path/level only while it is completed
+    if not completed:
+        return None
+    return path_id, topic_level(path_id, topic_id)
+
+
+class _Delta:
+    def __init__(self):
+        self.topics = 0
+        self.by_path = {}
+        self.by_level = {}
+        self.projects = 0
+        self.last_activity_at = None
+
+    def add_topic(self, contribution, sign):
+        if contribution is None:
+            return
+        path_id, level = contribution
+        self.topics += sign
+        self.by_path[path_id] = self.by_path.get(path_id, 0) + sign
+        if level:
+            self.by_level[level] = self.by_level.get(level, 0) + sign
+
+    def touch(self, when):
+        if when is not None and (self.last_activity_at is None or when > self.last_activity_at):
+            self.last_activity_at = when
+
+
+def _merge_counts(counts, delta):
+    merged = dict(counts or {})
+    for key, change in delta.items():
+        value = merged.get(key, 0) + change
+        if value > 0:
+            merged[key] = value
+        else:
+            merged.pop(key, None)
+    return merged
+
+
+def _collect_deltas(session):
+    deltas = {}
+
+    def delta_for(user_id):
+        if user_id not in deltas:
+            deltas[user_id] = _Delta()
+        return deltas[user_id]
+
+    for obj in session.new:
+        if isinstance(obj, UserProgress):
+            delta = delta_for(obj.user_id)
+            delta.add_topic(_progress_contribution(obj.completed, obj.path_id, obj.topic_id), 1)
+            delta.touch(obj.completed_at)
+        elif isinstance(obj, UserProject):
+            delta = delta_for(obj.user_id)
+            delta.projects += 1
+            delta.touch(obj.completed_at)
+
+    for obj in session.dirty:
+        if not isinstance(obj, (UserProgress, UserProject)) or not session.is_modified(obj):
+            continue
+        state = inspect(obj)
+        old_user_id = _old_value(state, 'user_id')
+        delta = delta_for(obj.user_id)
+        if isinstance(obj, UserProgress):
+            delta_for(old_user_id).add_topic(_progress_contribution(
+                _old_value(state, 'completed'), _old_value(state, 'path_id'), _old_value(state, 'topic_id')), -1)
+            delta.add_topic(_progress_contribution(obj.completed, obj.path_id, obj.topic_id), 1)
+        elif old_user_id != obj.user_id:
+            delta_for(old_user_id).projects -= 1
+            delta.projects += 1
+        delta.touch(obj.completed_at)
+
+    for obj in session.deleted:
+        if isinstance(obj, UserProgress):
+            state = inspect(obj)
+            delta_for(_old_value(state, 'user_id')).add_topic(_progress_contribution(
+                _old_value(state, 'completed'), _old_value(state, 'path_id'), _old_value(state, 'topic_id')), -1)
+        elif isinstance(obj, UserProject):
+            delta_for(_old_value(inspect(obj), 'user_id')).projects -= 1
+
+    return deltas
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_summaries(session, flush_context, instances):
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+
+    # seed imports this module
+    from seed import insert_missing
+
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    with session.no_autoflush:
+        for user_id, delta in deltas.items():
+            if user_id is None or user_id in deleted_users:
+                continue
+            summary = session.get(UserProgressSummary, user_id, with_for_update=True)
+            if summary is None:
+                # Concurrent first writes for a user both get here; the loser's
+                # insert is a no-op and it waits on the winner's row lock
+                insert_missing(UserProgressSummary, [{'user_id': user_id, 'completed_topics': 0,
+                                                      'completed_by_path': {}, 'completed_by_level': {},
+                                                      'completed_projects': 0}], ['user_id'], session=session)
+                summary = session.get(UserProgressSummary, user_id, with_for_update=True, populate_existing=True)
+            elif summary in session.deleted:
+                # The user is being deleted along with their progress
+                continue
+
+            summary.completed_topics = max(0, summary.completed_topics + delta.topics)
+            summary.completed_by_path = _merge_counts(summary.completed_by_path, delta.by_path)
+            summary.completed_by_level = _merge_counts(summary.completed_by_level, delta.by_level)
+            summary.completed_projects = max(0, summary.completed_projects + delta.projects)
+            if delta.last_activity_at is not None and (
+                    summary.last_activity_at is None or delta.last_activity_at > summary.last_activity_at):
+                summary.last_activity_at = delta.last_activity_at
+
+
+def summary_rows(user_ids):
+    """Compute UserProgressSummary column values for `user_ids` from their progress and projects."""
+    summaries = {user_id: {
+        'user_id': user_id,
+        'completed_topics': 0,
+        'completed_by_path': {},
+        'completed_by_level': {},
+        'completed_projects': 0,
+        'last_activity_at': None,
+    } for user_id in user_ids}
+
+    topic_rows = db.session.execute(
+        db.select(UserProgress.user_id, UserProgress.path_id, UserProgress.topic_id,
+                  func.max(UserProgress.completed_at))
+        .where(UserProgress.user_id.in_(user_ids), UserProgress.completed.is_(True))
+        .group_by(UserProgress.user_id, UserProgress.path_id, UserProgress.topic_id)
+    )
+    for user_id, path_id, topic_id, completed_at in topic_rows:
+        summary = summaries[user_id]
+        level = topic_level(path_id, topic_id)
+        summary['completed_topics'] += 1
+        summary['completed_by_path'][path_id] = summary['completed_by_path'].get(path_id, 0) + 1
+        if level:
+            summary['completed_by_level'][level] = summary['completed_by_level'].get(level, 0) + 1
+        if completed_at is not None and (summary['last_activity_at'] is None
+                                         or completed_at > summary['last_activity_at']):
+            summary['last_activity_at'] = completed_at
+
+    project_rows = db.session.execute(
+        db.select(UserProject.user_id, func.count(UserProject.id), func.max(UserProject.completed_at))
+        .where(UserProject.user_id.in_(user_ids))
+        .group_by(UserProject.user_id)
+    )
+    for user_id, count, completed_at in project_rows:
+        summary = summaries[user_id]
+        summary['completed_projects'] = count
+        if completed_at is not None and (summary['last_activity_at'] is None
+                                         or completed_at > summary['last_activity_at']):
+            summary['last_activity_at'] = completed_at
+
+    return list(summaries.values())
+
+
+@task('rebuild_progress_summaries', max_attempts=1)
+def rebuild_summaries(batch_size=1000):
+    """Recompute every user's summary from scratch, `batch_size` users at a time.
+
+    Returns the number of summaries written.
+    """
+    written = 0
+    last_user_id = 0
+
+    while True:
+        # Keyset-paginate over users who have any progress or projects
+        active_users = db.union(
+            db.select(UserProgress.user_id).where(UserProgress.user_id > last_user_id),
+            db.select(UserProject.user_id).where(UserProject.user_id > last_user_id),
+        )
+        user_ids = [row[0] for row in db.session.execute(
+            active_users.order_by(active_users.selected_columns.user_id).limit(batch_size)
+        )]
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        db.session.execute(db.delete(UserProgressSummary)
+                           .where(UserProgressSummary.user_id.in_(user_ids)))
+        db.session.execute(db.insert(UserProgressSummary), summary_rows(user_ids))
+        db.session.commit()
+        written += len(user_ids)
+
+    return written
@@ -0,0 +1,120 @@
+# Batched progress sync for offline and mobile clients.
+#
+# A client posts the (path_id, topic_id, completed, completed_at) rows it
+# recorded while offline, as a JSON array or NDJSON, and they are applied in
+# one transaction: validated, deduplicated on (path_id, topic_id) with the
+# last occurrence winning, and written with INSERT ... ON CONFLICT DO UPDATE
+# on uq_user_progress_user_path_topic, CHUNK_SIZE rows per statement. A
+# stored row is only replaced when it is not completed yet or the incoming
+# completion is newer, so a client syncing an old queue never un-completes
+# a topic or moves its completion back in time. Core upserts bypass the
+# flush hooks in progress.py, so the user's summary row is recomputed from
+# the table in the same transaction instead.
+import json
+from datetime import datetime, timezone
+
+from models import db, UserProgress, UserProgressSummary
+from progress import summary_rows
+from seed import insert_missing, upsert
+
+MAX_ROWS = 1000
+CHUNK_SIZE = 500
+
+# Request bodies larger than this per allowed row are refused unread
+MAX_ROW_BYTES = 512
+
+# Length of the path_id / topic_id columns
+MAX_ID_LENGTH = 50
+
+
+class ProgressSyncError(ValueError):
+    """A sync request that cannot be applied; the message is safe to show the client."""
+
+
+def decode_rows(body, mimetype):
+    """Return the list of row objects in a JSON array or NDJSON request body."""
+    try:
+        text = body.decode()
+        if mimetype == 'application/x-ndjson':
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        items = json.loads(text)
+    except (UnicodeDecodeError, ValueError) as error:
+        raise ProgressSyncError(f'invalid JSON: {error}')
+    if not isinstance(items, list):
+        raise ProgressSyncError('expected a JSON array of progress rows')
+    return items
+
+
+def _timestamp(value, index):
+    if value is None:
+        return None
+    try:
+        when = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ProgressSyncError(f'row {index}: completed_at must be an ISO 8601 timestamp')
+    # Stored timestamps are naive UTC
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when
+
+
+def parse_rows(items, now=None):
+    """Validate `items` and return progress column dicts, one per distinct topic."""
+    now = now or datetime.utcnow()
+    rows = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ProgressSyncError(f'row {index}: expected an object')
+        path_id, topic_id = item.get('path_id'), item.get('topic_id')
+        for name, value in (('path_id', path_id), ('topic_id', topic_id)):
+            if not isinstance(value, str) or not 0 < len(value) <= MAX_ID_LENGTH:
+                raise ProgressSyncError(f'row {index}: {name} must be a string of 1-{MAX_ID_LENGTH} characters')
+        completed = item.get('completed', True)
+        if not isinstance(completed, bool):
+            raise ProgressSyncError(f'row {index}: completed must be true or false')
+        completed_at = _timestamp(item.get('completed_at'), index) if completed else None
+
+        # Later rows for the same topic replace earlier ones
+        rows.pop((path_id, topic_id), None)
+        rows[path_id, topic_id] = {
+            'path_id': path_id,
+            'topic_id': topic_id,
+            'completed': completed,
+            'completed_at': completed_at or (now if completed else None),
+        }
+    return list(rows.values())
+
+
+def _advances(excluded):
+    # Whether an incoming row may replace the stored one
+    return db.or_(UserProgress.completed.is_not(True),
+                  db.and_(excluded.completed.is_(True),
+                          db.or_(UserProgress.completed_at.is_(None),
+                                 excluded.completed_at > UserProgress.completed_at)))
+
+
+def sync_progress(user_id, items, chunk_size=CHUNK_SIZE, now=None):
+    """Upsert the progress rows in `items` for `user_id` and commit.
+
+    Returns (rows inserted or changed, the user's refreshed summary as a dict);
+    rows that would move a completion back are submitted but not counted.
+    """
+    rows = [dict(row, user_id=user_id) for row in parse_rows(items, now)]
+
+    # Serialize syncs for one user, as the per-row path does, so the
+    # recomputed summary sees every committed row. The summary row is created
+    # first if needed, so there is always a row to lock.
+    insert_missing(UserProgressSummary, [{'user_id': user_id, 'completed_topics': 0, 'completed_by_path': {},
+                                          'completed_by_level': {}, 'completed_projects': 0}], ['user_id'])
+    db.session.execute(db.select(UserProgressSummary.user_id)
+                       .where(UserProgressSummary.user_id == user_id)
+                       .with_for_update())
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        written += upsert(UserProgress, rows[start:start + chunk_size], ['user_id', 'path_id', 'topic_id'],
+                          where=_advances, count=True)
+
+    summary = summary_rows([user_id])[0]
+    upsert(UserProgressSummary, [summary], ['user_id'])
+    db.session.commit()
+    return written, summary
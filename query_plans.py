@@ -0,0 +1,72 @@
+# EXPLAIN-based checks that the per-user query paths and the job metrics
+# scrape use their indexes.
+#
+# Run with `flask check-query-plans`; it exits non-zero when a query falls
+# back to a full table scan, so it can gate CI against SQLite and PostgreSQL.
+import json
+
+from sqlalchemy import text
+
+from models import db
+
+# (description, SQL, index the plan must mention)
+CHECKED_QUERIES = [
+    ('dashboard progress',
+     'SELECT * FROM user_progress WHERE user_id = :user_id',
+     'uq_user_progress_user_path_topic'),
+    ('progress lookup',
+     'SELECT * FROM user_progress WHERE user_id = :user_id '
+     "AND path_id = 'beginner' AND topic_id = 'python_basics'",
+     'uq_user_progress_user_path_topic'),
+    ('dashboard projects',
+     'SELECT * FROM user_projects WHERE user_id = :user_id',
+     'ix_user_projects_user_project'),
+    ('dashboard notes',
+     'SELECT * FROM user_notes WHERE user_id = :user_id',
+     'uq_user_notes_user_content'),
+    ('note lookup',
+     'SELECT * FROM user_notes WHERE user_id = :user_id '
+     "AND content_type = 'learning_path' AND content_id = 'python_basics'",
+     'uq_user_notes_user_content'),
+    ('interview review queue',
+     'SELECT * FROM interview_reviews WHERE user_id = :user_id '
+     "AND due_at <= '2100-01-01' ORDER BY due_at LIMIT 10",
+     'ix_interview_reviews_user_due'),
+    ('job counts',
+     'SELECT name, status, count(*), min(run_at) FROM jobs GROUP BY name, status',
+     'ix_jobs_name_status_run_at'),
+    ('recently finished jobs',
+     'SELECT name, run_at, started_at, finished_at FROM jobs '
+     "WHERE status = 'done' AND finished_at >= '2000-01-01' ORDER BY finished_at DESC LIMIT 1000",
+     'ix_jobs_status_finished_at'),
+]
+
+
+def explain(sql, params):
+    """Return the database's query plan for `sql` as a single string."""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    if dialect == 'sqlite':
+        rows = connection.execute(text('EXPLAIN QUERY PLAN ' + sql), params)
+        return '\n'.join(row[-1] for row in rows)
+
+    if dialect == 'postgresql':
+        # Tiny test tables are cheaper to scan; we only care that the index is usable
+        connection.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = connection.execute(text('EXPLAIN (FORMAT JSON) ' + sql), params).scalar()
+        return plan if isinstance(plan, str) else json.dumps(plan)
+
+    raise RuntimeError(f'Query plan checks are not supported on {dialect}')
+
+
+def check_query_plans(user_id=1):
+    """Explain every checked query and return (description, ok, plan) tuples."""
+    results = []
+    try:
+        for description, sql, index_name in CHECKED_QUERIES:
+            plan = explain(sql, {'user_id': user_id})
+            results.append((description, index_name in plan, plan))
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,174 @@
+# Precomputed "what to study next" recommendations.
+#
+# Every learner is encoded as three 0/1 matrices (completed topics, topics in
+# progress, completed projects) and every candidate as a column of a fixed
+# model matrix, so a batch of users is scored against all topics and job
+# skills with a few matrix products. rebuild_recommendations() walks the
+# users in id order, scores them batch by batch and stores the top K of each
+# kind in user_recommendations; the dashboard only reads that row.
+import math
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed to rebuild recommendations
+    np = None
+
+from content_registry import registry
+from jobs import task
+from models import db, User, UserProgress, UserProject, JobSkill, UserRecommendation
+from search import tokenize
+
+TOP_K = 5
+BATCH_SIZE = 20000
+
+# Weight of an in-progress topic over the next unstarted one
+IN_PROGRESS_BOOST = 0.5
+# How much practising a skill in a project lowers its priority
+PRACTISED_DISCOUNT = 0.7
+
+
+class RecommendationModel:
+    """Candidate topics and skills with the matrices used to score them."""
+
+    def __init__(self, skills):
+        if np is None:
+            raise RuntimeError('numpy is required to compute recommendations')
+
+        topics = [topic for path in registry.learning_paths for topic in path.topics]
+        self.topic_routes = [topic.route for topic in topics]
+        self.topic_index = {route: index for index, route in enumerate(self.topic_routes)}
+        self.project_index = {project.id: index for index, project in enumerate(registry.projects)}
+        self.skill_names = [name for name, importance in skills]
+        count = len(topics)
+
+        # prerequisites[t, s] = 1 when topic s comes before topic t in the paths
+        self.prerequisites = np.tril(np.ones((count, count), dtype=np.float32), k=-1)
+        self.prerequisite_counts = np.maximum(self.prerequisites.sum(axis=1), 1.0)
+        self.has_prerequisites = self.prerequisites.sum(axis=1) > 0
+
+        # Topic/project -> skill links from shared words
+        skill_words = [set(tokenize(name)) for name in self.skill_names]
+        topic_words = [set(tokenize(' '.join((topic.title, topic.description) + topic.subtopics)))
+                       for topic in topics]
+        project_words = [set(tokenize(' '.join(project.skills_practiced + (project.title,))))
+                         for project in registry.projects]
+        self.topic_skills = np.array(
+            [[1.0 if words & skill else 0.0 for skill in skill_words] for words in topic_words],
+            dtype=np.float32).reshape(count, len(skill_words))
+        self.project_skills = np.array(
+            [[1.0 if words & skill else 0.0 for skill in skill_words] for words in project_words],
+            dtype=np.float32).reshape(len(project_words), len(skill_words))
+        self.topics_per_skill = self.topic_skills.sum(axis=0)
+        self.importance = np.array([importance for name, importance in skills], dtype=np.float32) / 5.0
+
+    def empty_batch(self, users):
+        """Zeroed (completed, in_progress, projects) matrices for `users` users."""
+        return (np.zeros((users, len(self.topic_routes)), dtype=np.float32),
+                np.zeros((users, len(self.topic_routes)), dtype=np.float32),
+                np.zeros((users, len(self.project_index)), dtype=np.float32))
+
+    def score(self, completed, in_progress, projects):
+        """Return (topic_scores, skill_scores); completed topics score -inf."""
+        # Share of each topic's prerequisites done; topics without any are ready
+        readiness = (completed @ self.prerequisites.T) / self.prerequisite_counts
+        readiness[:, ~self.has_prerequisites] = 1.0
+        topic_scores = readiness + IN_PROGRESS_BOOST * in_progress
+        topic_scores[completed > 0] = -np.inf
+
+        # Important skills related to finished topics, unless already practised
+        related = completed @ self.topic_skills
+        skill_readiness = np.divide(related, self.topics_per_skill, out=np.full_like(related, 0.5),
+                                    where=self.topics_per_skill > 0)
+        practised = np.minimum(projects @ self.project_skills, 1.0)
+        skill_scores = self.importance * (0.5 + 0.5 * skill_readiness) * (1.0 - PRACTISED_DISCOUNT * practised)
+        return topic_scores, skill_scores
+
+
+def top_k(scores, k):
+    """Column indices of the k best finite scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1)
+    return np.take_along_axis(best, order, axis=1)
+
+
+def ranked_rows(best, scores, names):
+    """Per row, [[name, score], ...] for the columns in `best`, skipping -inf scores."""
+    picked = np.round(np.take_along_axis(scores, best, axis=1).astype(np.float64), 4).tolist()
+    return [[[names[index], score] for index, score in zip(indices, row_scores) if score > -math.inf]
+            for indices, row_scores in zip(best.tolist(), picked)]
+
+
+def _load_batch(model, user_ids):
+    lo, hi = int(user_ids[0]), int(user_ids[-1])
+    completed, in_progress, projects = model.empty_batch(len(user_ids))
+
+    progress = db.session.execute(
+        db.select(UserProgress.user_id, UserProgress.topic_id, UserProgress.completed)
+        .where(UserProgress.user_id.between(lo, hi))
+    ).all()
+    rows, columns, done = [], [], []
+    for user_id, topic_id, is_completed in progress:
+        column = model.topic_index.get(topic_id)
+        if column is not None:
+            rows.append(user_id)
+            columns.append(column)
+            done.append(bool(is_completed))
+    if rows:
+        rows = np.searchsorted(user_ids, np.array(rows))
+        columns = np.array(columns)
+        done = np.array(done)
+        completed[rows[done], columns[done]] = 1.0
+        in_progress[rows[~done], columns[~done]] = 1.0
+
+    finished = db.session.execute(
+        db.select(UserProject.user_id, UserProject.project_id)
+        .where(UserProject.user_id.between(lo, hi))
+    ).all()
+    pairs = [(user_id, model.project_index[project_id]) for user_id, project_id in finished
+             if project_id in model.project_index]
+    if pairs:
+        rows, columns = zip(*pairs)
+        projects[np.searchsorted(user_ids, np.array(rows)), np.array(columns)] = 1.0
+
+    return completed, in_progress, projects
+
+
+@task('rebuild_recommendations', max_attempts=1)
+def rebuild_recommendations(batch_size=BATCH_SIZE, k=TOP_K):
+    """Recompute and store every user's top-k topics and skills; returns the user count."""
+    skills = db.session.execute(
+        db.select(JobSkill.name, JobSkill.importance_level).order_by(JobSkill.id)).all()
+    model = RecommendationModel(skills)
+    generated_at = datetime.utcnow()
+    last_id = 0
+    total = 0
+
+    while True:
+        user_ids = np.array(db.session.execute(
+            db.select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).scalars().all(), dtype=np.int64)
+        if not len(user_ids):
+            break
+
+        topic_scores, skill_scores = model.score(*_load_batch(model, user_ids))
+        best_topics = top_k(topic_scores, k)
+        best_skills = top_k(skill_scores, k)
+
+        db.session.execute(db.delete(UserRecommendation).where(
+            UserRecommendation.user_id.between(int(user_ids[0]), int(user_ids[-1]))))
+        db.session.execute(db.insert(UserRecommendation), [
+            {'user_id': user_id, 'topics': topics, 'skills': skills, 'generated_at': generated_at}
+            for user_id, topics, skills in zip(
+                user_ids.tolist(),
+                ranked_rows(best_topics, topic_scores, model.topic_routes),
+                ranked_rows(best_skills, skill_scores, model.skill_names))
+        ])
+        db.session.commit()
+
+        total += len(user_ids)
+        last_id = int(user_ids[-1])
+    return total
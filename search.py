@@ -0,0 +1,172 @@
+# In-memory inverted index over the static content in learning_content.py.
+#
+# Documents are split into weighted fields (titles count more than
+# descriptions) and ranked with BM25. Every query word also matches longer
+# indexed words it is a prefix of, so "deco" finds "decorators".
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+
+from learning_content import learning_paths, projects, exercises, resources, job_skills
+
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'subtopics': 1.5,
+    'skills': 1.5,
+    'topic': 1.0,
+    'description': 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Prefix expansions score less than an exact word match
+PREFIX_WEIGHT = 0.7
+MAX_PREFIX_EXPANSIONS = 64
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from in into is it of on or the to with your you'.split()
+)
+
+_token_re = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return [token for token in _token_re.findall(text.lower()) if token not in STOPWORDS]
+
+
+def content_documents():
+    """Flatten learning_content.py into (kind, id, title, url, fields) documents."""
+    documents = []
+
+    for path in learning_paths:
+        for topic in path['topics']:
+            documents.append(('topic', topic['route'], topic['title'], '/' + topic['route'], {
+                'title': topic['title'],
+                'description': topic['description'],
+                'subtopics': ' '.join(topic['subtopics']),
+                'topic': path['level'],
+            }))
+
+    for project in projects:
+        documents.append(('project', project['id'], project['title'], '/projects', {
+            'title': project['title'],
+            'description': project['description'],
+            'skills': ' '.join(project['skills_practiced']),
+        }))
+
+    for exercise in exercises:
+        documents.append(('exercise', exercise['id'], exercise['title'], '/exercises', {
+            'title': exercise['title'],
+            'description': exercise['description'],
+            'topic': exercise['topic'],
+        }))
+
+    for category, items in resources.items():
+        for item in items:
+            documents.append(('resource', item['url'], item['title'], item['url'], {
+                'title': item['title'],
+                'description': item['description'],
+                'topic': category,
+            }))
+
+    for category, skills in job_skills.items():
+        for skill in skills:
+            documents.append(('job_skill', skill['name'], skill['name'], '/job_skills', {
+                'title': skill['name'],
+                'description': skill['description'],
+                'skills': category,
+            }))
+
+    return documents
+
+
+class SearchIndex:
+    """BM25-ranked inverted index with prefix matching."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        postings = {}
+        lengths = []
+
+        for doc_id, (kind, key, title, url, fields) in enumerate(documents):
+            term_freqs = {}
+            length = 0.0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS.get(field, 1.0)
+                for token in tokenize(text):
+                    term_freqs[token] = term_freqs.get(token, 0.0) + weight
+                    length += weight
+            for term, freq in term_freqs.items():
+                postings.setdefault(term, []).append((doc_id, freq))
+            lengths.append(length)
+
+        average = (sum(lengths) / len(lengths)) if lengths else 1.0
+        count = len(documents)
+
+        # Per-document length normalisation and per-term IDF are query independent
+        self._norms = [K1 * (1 - B + B * length / average) for length in lengths]
+        self._postings = {
+            term: (math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5)), tuple(docs))
+            for term, docs in postings.items()
+        }
+        self._terms = sorted(self._postings)
+
+    def _expand(self, token):
+        # Sorted term list turns prefix lookup into a binary search
+        start = bisect_left(self._terms, token)
+        for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            yield term, 1.0 if term == token else PREFIX_WEIGHT
+
+    def search(self, query, limit=10, kind=None):
+        """Return up to `limit` result dicts for `query`, best first."""
+        scores = {}
+        norms = self._norms
+
+        for token in set(tokenize(query)):
+            best = {}
+            for term, weight in self._expand(token):
+                idf, docs = self._postings[term]
+                for doc_id, freq in docs:
+                    score = weight * idf * freq * (K1 + 1) / (freq + norms[doc_id])
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        if kind is not None:
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if self.documents[doc_id][0] == kind}
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in ranked:
+            doc_kind, key, title, url, fields = self.documents[doc_id]
+            results.append({
+                'type': doc_kind,
+                'id': key,
+                'title': title,
+                'url': url,
+                'description': fields.get('description', ''),
+                'score': round(score, 4),
+            })
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide content index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex(content_documents())
+    return _index
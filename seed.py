@@ -0,0 +1,355 @@
+# Database seeding: the sample catalogue behind `flask init-db` and the
+# synthetic learner data behind `flask seed-scale`.
+#
+# Sample data is written with batched upserts (INSERT ... ON CONFLICT DO
+# UPDATE on PostgreSQL and SQLite), so init-db can be re-run safely.
+# Synthetic data is generated lazily and written in bounded batches with
+# executemany, or COPY on PostgreSQL/psycopg2, so memory use does not grow
+# with the number of rows.
+import csv
+import hashlib
+import io
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import func
+
+from learning_content import learning_paths, projects, interview_questions
+from models import (db, User, UserProgress, UserProject, UserNote, JobSkill, ResourceCategory, Resource,
+                    InterviewQuestion)
+from progress import rebuild_summaries
+
+# Password for every synthetic learner created by seed_scale()
+SYNTHETIC_PASSWORD = 'learner'
+
+SAMPLE_JOB_SKILLS = [
+    # Programming Fundamentals
+    {"name": "Python Syntax", "category": "Programming Fundamentals", "importance_level": 5, 
+     "description": "Core Python syntax including variables, data types, control flow, and functions."},
+    {"name": "Object-Oriented Programming", "category": "Programming Fundamentals", "importance_level": 4, 
+     "description": "Understanding classes, inheritance, encapsulation, and polymorphism in Python."},
+    {"name": "Data Structures", "category": "Programming Fundamentals", "importance_level": 5, 
+     "description": "Working with lists, dictionaries, sets, tuples and understanding their performance characteristics."},
+    {"name": "Algorithms", "category": "Programming Fundamentals", "importance_level": 4, 
+     "description": "Implementing and analyzing common algorithms for searching, sorting, and problem-solving."},
+
+    # Web Development  
+    {"name": "Flask", "category": "Web Development", "importance_level": 4, 
+     "description": "Building web applications with Flask framework."},
+    {"name": "Django", "category": "Web Development", "importance_level": 4, 
+     "description": "Developing robust web applications with Django framework."},
+    {"name": "REST APIs", "category": "Web Development", "importance_level": 5, 
+     "description": "Designing and implementing RESTful APIs for web services."},
+    {"name": "HTML/CSS/JavaScript", "category": "Web Development", "importance_level": 3, 
+     "description": "Frontend web development basics to complement Python backend skills."},
+
+    # Data Analysis
+    {"name": "Pandas", "category": "Data Analysis", "importance_level": 5, 
+     "description": "Data manipulation and analysis with Pandas library."},
+    {"name": "NumPy", "category": "Data Analysis", "importance_level": 4, 
+     "description": "Numerical computing with NumPy arrays and functions."},
+    {"name": "Data Visualization", "category": "Data Analysis", "importance_level": 4, 
+     "description": "Creating visualizations with Matplotlib, Seaborn, or Plotly."},
+    {"name": "SQL", "category": "Data Analysis", "importance_level": 5, 
+     "description": "Writing efficient SQL queries for data extraction and analysis."},
+
+    # Machine Learning
+    {"name": "Scikit-learn", "category": "Machine Learning", "importance_level": 4, 
+     "description": "Implementing machine learning algorithms with Scikit-learn."},
+    {"name": "TensorFlow/PyTorch", "category": "Machine Learning", "importance_level": 3, 
+     "description": "Building and training deep learning models."},
+    {"name": "Machine Learning Concepts", "category": "Machine Learning", "importance_level": 4, 
+     "description": "Understanding classification, regression, clustering, and model evaluation."},
+
+    # DevOps
+    {"name": "Git Version Control", "category": "DevOps", "importance_level": 5, 
+     "description": "Using Git for source code management and collaboration."},
+    {"name": "Docker", "category": "DevOps", "importance_level": 3, 
+     "description": "Containerizing applications for consistent deployment."},
+    {"name": "CI/CD", "category": "DevOps", "importance_level": 3, 
+     "description": "Setting up continuous integration and deployment pipelines."},
+
+    # Database
+    {"name": "PostgreSQL", "category": "Database", "importance_level": 4, 
+     "description": "Working with PostgreSQL databases in Python applications."},
+    {"name": "SQLAlchemy", "category": "Database", "importance_level": 4, 
+     "description": "Using SQLAlchemy ORM for database operations in Python."},
+    {"name": "Database Design", "category": "Database", "importance_level": 4, 
+     "description": "Designing efficient database schemas and relationships."}
+]
+
+SAMPLE_RESOURCE_CATEGORIES = [
+    {"name": "Tutorials", "description": "Step-by-step guides for learning Python concepts and tools."},
+    {"name": "Documentation", "description": "Official documentation and reference materials."},
+    {"name": "Online Courses", "description": "Structured learning experiences for developing Python skills."},
+    {"name": "Books", "description": "In-depth resources for comprehensive learning."},
+    {"name": "Community Resources", "description": "Forums, blogs, and discussion boards for Python developers."},
+    {"name": "Practice Sites", "description": "Websites for practicing coding challenges and improving skills."}
+]
+
+SAMPLE_RESOURCES = [
+    {"title": "Python.org Official Documentation", "url": "https://docs.python.org/3/", 
+     "description": "The official Python documentation with tutorials, library references and more.",
+     "resource_type": "documentation", "category": "Documentation", "is_free": True},
+
+    {"title": "Real Python", "url": "https://realpython.com/", 
+     "description": "Tutorials, articles, and courses for all levels of Python developers.",
+     "resource_type": "tutorial", "category": "Tutorials", "is_free": True},
+
+    {"title": "Python Crash Course (Book)", "url": "https://nostarch.com/pythoncrashcourse2e", 
+     "description": "A hands-on, project-based introduction to Python programming.",
+     "resource_type": "book", "category": "Books", "is_free": False},
+
+    {"title": "Automate the Boring Stuff with Python", "url": "https://automatetheboringstuff.com/", 
+     "description": "Practical programming for total beginners, available both as a book and free online.",
+     "resource_type": "book", "category": "Books", "is_free": True},
+
+    {"title": "Codecademy Python Course", "url": "https://www.codecademy.com/learn/learn-python-3", 
+     "description": "Interactive Python course with hands-on exercises.",
+     "resource_type": "course", "category": "Online Courses", "is_free": False},
+
+    {"title": "LeetCode", "url": "https://leetcode.com/", 
+     "description": "Platform to practice coding problems often used in technical interviews.",
+     "resource_type": "practice", "category": "Practice Sites", "is_free": True},
+
+    {"title": "Flask Documentation", "url": "https://flask.palletsprojects.com/", 
+     "description": "Official documentation for the Flask web framework.",
+     "resource_type": "documentation", "category": "Documentation", "is_free": True},
+
+    {"title": "PythonAnywhere", "url": "https://www.pythonanywhere.com/", 
+     "description": "Hosting platform for Python web applications with free tier.",
+     "resource_type": "tool", "category": "Community Resources", "is_free": True},
+
+    {"title": "SQLAlchemy Documentation", "url": "https://docs.sqlalchemy.org/", 
+     "description": "Comprehensive documentation for the SQLAlchemy ORM.",
+     "resource_type": "documentation", "category": "Documentation", "is_free": True},
+
+    {"title": "Stack Overflow Python Tag", "url": "https://stackoverflow.com/questions/tagged/python", 
+     "description": "Community Q&A for Python programming problems.",
+     "resource_type": "community", "category": "Community Resources", "is_free": True}
+]
+
+
+def _insert_for_dialect(session=None):
+    dialect = (session or db.session).connection().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'Upserts are not supported on {dialect}')
+    return insert
+
+
+def upsert(model, rows, key_columns, where=None, count=False):
+    """Insert `rows` into `model`'s table, updating rows whose key already exists.
+
+    `where(excluded)` may return a condition on the existing and incoming
+    (`excluded`) columns; existing rows where it is false are left as they are.
+    With `count`, returns how many rows were inserted or updated, read back
+    with RETURNING since executemany rowcounts are not reliable everywhere.
+    """
+    if not rows:
+        return 0 if count else None
+    insert = _insert_for_dialect()
+    statement = insert(model.__table__)
+    update_columns = {
+        column: statement.excluded[column]
+        for column in rows[0] if column not in key_columns
+    }
+    statement = statement.on_conflict_do_update(index_elements=key_columns, set_=update_columns,
+                                                where=where(statement.excluded) if where else None)
+    if count:
+        return len(db.session.execute(statement.returning(*model.__table__.primary_key.columns), rows).all())
+    db.session.execute(statement, rows)
+
+
+def insert_missing(model, rows, key_columns, session=None):
+    """Insert `rows` into `model`'s table, leaving rows whose key already exists untouched."""
+    if not rows:
+        return
+    session = session or db.session
+    insert = _insert_for_dialect(session)
+    statement = insert(model.__table__).on_conflict_do_nothing(index_elements=key_columns)
+    session.execute(statement, rows)
+
+
+def seed_sample_data():
+    """Upsert the sample resource categories, resources, job skills and interview questions.
+
+    Returns a dict of row counts written per table.
+    """
+    upsert(ResourceCategory, SAMPLE_RESOURCE_CATEGORIES, ['name'])
+
+    # One query maps every category name to its id
+    category_ids = dict(db.session.execute(db.select(ResourceCategory.name, ResourceCategory.id)).all())
+    resource_rows = [
+        {
+            'title': resource['title'],
+            'url': resource['url'],
+            'description': resource['description'],
+            'resource_type': resource['resource_type'],
+            'category_id': category_ids[resource['category']],
+            'is_free': resource['is_free']
+        }
+        for resource in SAMPLE_RESOURCES
+    ]
+    upsert(Resource, resource_rows, ['url'])
+    upsert(JobSkill, SAMPLE_JOB_SKILLS, ['name'])
+    question_rows = [
+        {
+            'slug': question['id'],
+            'topic': question['topic'],
+            'difficulty': question['difficulty'],
+            'prompt': question['prompt'],
+            'answer': question['answer']
+        }
+        for question in interview_questions
+    ]
+    upsert(InterviewQuestion, question_rows, ['slug'])
+    db.session.commit()
+
+    return {
+        'resource_categories': len(SAMPLE_RESOURCE_CATEGORIES),
+        'resources': len(resource_rows),
+        'job_skills': len(SAMPLE_JOB_SKILLS),
+        'interview_questions': len(question_rows),
+    }
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return value
+
+
+def _write_rows(model, columns, rows, batch_size):
+    """Stream `rows` (dicts) into `model`'s table, committing every batch."""
+    table = model.__table__
+    connection = db.session.connection()
+    use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+    written = 0
+
+    for batch in _batches(rows, batch_size):
+        if use_copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow([_copy_value(row[column]) for column in columns])
+            buffer.seek(0)
+            cursor = db.session.connection().connection.cursor()
+            cursor.copy_expert(f'COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+        else:
+            db.session.execute(db.insert(table), batch)
+        db.session.commit()
+        written += len(batch)
+    return written
+
+
+def _topic_ids():
+    return [(path['level'].lower(), topic['route']) for path in learning_paths for topic in path['topics']]
+
+
+def _topic_for(index, topics):
+    # Cycle through the real topics, then suffixed variants of them
+    path_id, route = topics[index % len(topics)]
+    variant = index // len(topics)
+    return path_id, route if variant == 0 else f'{route}-{variant}'
+
+
+def seed_scale(users, progress_per_user=20, projects_per_user=2, notes_per_user=5,
+               batch_size=5000, seed=0):
+    """Append `users` synthetic learners with progress, projects and notes.
+
+    Rows are generated on the fly and written `batch_size` at a time.
+    Returns (first_user_id, row counts per table).
+    """
+    rng = random.Random(seed)
+    first_id = (db.session.execute(db.select(func.max(User.id))).scalar() or 0) + 1
+    user_ids = range(first_id, first_id + users)
+    password_hash = hashlib.sha256(SYNTHETIC_PASSWORD.encode()).hexdigest()
+    now = datetime.utcnow()
+    topics = _topic_ids()
+    project_ids = [project['id'] for project in projects]
+    words = sorted({word.lower() for path in learning_paths for topic in path['topics']
+                    for subtopic in topic['subtopics'] for word in subtopic.split() if len(word) > 3})
+
+    def user_rows():
+        for user_id in user_ids:
+            yield {
+                'id': user_id,
+                'username': f'learner{user_id}',
+                'email': f'learner{user_id}@example.com',
+                'password_hash': password_hash,
+                'created_at': now - timedelta(days=rng.randint(0, 730))
+            }
+
+    def progress_rows():
+        for user_id in user_ids:
+            for index in range(progress_per_user):
+                path_id, topic_id = _topic_for(index, topics)
+                completed = rng.random() < 0.6
+                yield {
+                    'user_id': user_id,
+                    'path_id': path_id,
+                    'topic_id': topic_id,
+                    'completed': completed,
+                    'completed_at': now - timedelta(minutes=rng.randint(0, 500000)) if completed else None
+                }
+
+    def project_rows():
+        for user_id in user_ids:
+            for index in range(projects_per_user):
+                yield {
+                    'user_id': user_id,
+                    'project_id': project_ids[index % len(project_ids)],
+                    'github_url': None,
+                    'completed_at': now - timedelta(minutes=rng.randint(0, 500000))
+                }
+
+    def note_rows():
+        for user_id in user_ids:
+            for index in range(notes_per_user):
+                created = now - timedelta(minutes=rng.randint(0, 500000))
+                yield {
+                    'user_id': user_id,
+                    'content_type': 'learning_path',
+                    'content_id': _topic_for(index, topics)[1],
+                    'notes': ' '.join(rng.choices(words, k=rng.randint(10, 60))),
+                    'created_at': created,
+                    'updated_at': created
+                }
+
+    counts = {
+        'users': _write_rows(User, ['id', 'username', 'email', 'password_hash', 'created_at'],
+                             user_rows(), batch_size),
+        'user_progress': _write_rows(UserProgress, ['user_id', 'path_id', 'topic_id', 'completed', 'completed_at'],
+                                     progress_rows(), batch_size),
+        'user_projects': _write_rows(UserProject, ['user_id', 'project_id', 'github_url', 'completed_at'],
+                                     project_rows(), batch_size),
+        'user_notes': _write_rows(UserNote, ['user_id', 'content_type', 'content_id', 'notes',
+                                             'created_at', 'updated_at'],
+                                  note_rows(), batch_size),
+    }
+
+    if db.session.connection().dialect.name == 'postgresql':
+        # User ids were assigned explicitly; move the sequence past them
+        db.session.execute(db.text(
+            "SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))"))
+        db.session.commit()
+
+    # Bulk inserts bypass the ORM events that maintain progress summaries
+    rebuild_summaries()
+    return first_id, counts
@@ -0,0 +1,256 @@
+# Server-side sessions shared by every gunicorn worker.
+#
+# The cookie only carries a random session id; the data lives in a
+# SessionStore (by default a SQLite file next to the app, so no extra
+# service is needed). Each worker keeps a small LRU of recently read
+# sessions, writes back only sessions that changed (or are due for an
+# expiry refresh), and sweeps expired rows from a background thread.
+import logging
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+logger = logging.getLogger(__name__)
+
+
+def load_secret_key(path):
+    """Return the secret key stored at `path`, creating it on first use."""
+    try:
+        with open(path, 'rb') as key_file:
+            key = key_file.read()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(secrets.token_bytes(32))
+        # link() fails if another process created the key first; theirs wins
+        os.link(temp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(temp_path)
+    with open(path, 'rb') as key_file:
+        return key_file.read()
+
+
+class SessionStore(ABC):
+    """Storage backend for server-side sessions.
+
+    Session data is passed around serialized (a str); expiry times are Unix
+    timestamps.
+    """
+
+    @abstractmethod
+    def load(self, sid):
+        """Return (data, expires_at) for `sid`, or None."""
+
+    @abstractmethod
+    def save(self, sid, data, expires_at):
+        """Store `data` under `sid` until `expires_at`."""
+
+    @abstractmethod
+    def delete(self, sid):
+        """Remove `sid` if it exists."""
+
+    @abstractmethod
+    def sweep(self, now):
+        """Delete sessions that expired before `now`; return how many."""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file, shared by all processes on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, reopened in forked children
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def load(self, sid):
+        return self._connection().execute(
+            'SELECT data, expires_at FROM sessions WHERE id = ?', (sid,)
+        ).fetchone()
+
+    def save(self, sid, data, expires_at):
+        self._connection().execute(
+            'INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at',
+            (sid, data, expires_at)
+        )
+
+    def delete(self, sid):
+        self._connection().execute('DELETE FROM sessions WHERE id = ?', (sid,))
+
+    def sweep(self, now):
+        return self._connection().execute('DELETE FROM sessions WHERE expires_at < ?', (now,)).rowcount
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = sid is None
+        self.modified = False
+        self.replaced_sid = None
+
+    def regenerate(self):
+        """Move the data to a fresh session id (call on login)."""
+        if self.sid is not None:
+            self.replaced_sid = self.sid
+            self.sid = None
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface backed by a SessionStore.
+
+    `cache_ttl` bounds how long a worker may serve a session from its own
+    cache after another worker changed it (e.g. logged it out).
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store, cache_size=1024, cache_ttl=2.0, sweep_interval=300):
+        self.store = store
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.sweep_interval = sweep_interval
+        self._cache = OrderedDict()  # sid -> (data, expires_at, cached_at)
+        self._cache_lock = threading.Lock()
+        self._sweeper_pid = None
+
+    def _cache_get(self, sid):
+        with self._cache_lock:
+            entry = self._cache.get(sid)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] >= self.cache_ttl:
+                del self._cache[sid]
+                return None
+            self._cache.move_to_end(sid)
+            return entry
+
+    def _cache_put(self, sid, data, expires_at):
+        with self._cache_lock:
+            self._cache[sid] = (data, expires_at, time.monotonic())
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, sid):
+        with self._cache_lock:
+            self._cache.pop(sid, None)
+
+    def _ensure_sweeper(self):
+        # Threads do not survive fork, so every worker starts its own
+        if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+            return
+        self._sweeper_pid = os.getpid()
+        threading.Thread(target=self._sweep_forever, name='session-sweeper', daemon=True).start()
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                removed = self.store.sweep(time.time())
+                if removed:
+                    logger.info('Removed %d expired sessions', removed)
+            except Exception:
+                logger.exception('Session sweep failed')
+
+    def _load(self, sid):
+        entry = self._cache_get(sid)
+        if entry is None:
+            row = self.store.load(sid)
+            if row is None:
+                return None
+            entry = (row[0], row[1])
+            self._cache_put(sid, *entry)
+        data, expires_at = entry[0], entry[1]
+        if expires_at <= time.time():
+            return None
+        return data, expires_at
+
+    def open_session(self, app, request):
+        self._ensure_sweeper()
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            loaded = self._load(sid)
+            if loaded is not None:
+                data, expires_at = loaded
+                return ServerSideSession(self.serializer.loads(data), sid=sid, expires_at=expires_at)
+        # Anonymous visitors get no row until something is stored for them
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.replaced_sid is not None:
+            self.store.delete(session.replaced_sid)
+            self._cache_drop(session.replaced_sid)
+
+        if not session:
+            if session.sid is not None and session.modified:
+                self.store.delete(session.sid)
+                self._cache_drop(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        # Untouched sessions are only rewritten to push back their expiry,
+        # and then only once half their lifetime has passed
+        refresh_due = session.expires_at is not None and session.expires_at - now < lifetime / 2
+        if not (session.sid is None or session.modified or refresh_due):
+            return
+
+        sid = session.sid or secrets.token_urlsafe(32)
+        expires_at = now + lifetime
+        data = self.serializer.dumps(dict(session))
+        self.store.save(sid, data, expires_at)
+        self._cache_put(sid, data, expires_at)
+
+        response.set_cookie(
+            name,
+            sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
@@ -0,0 +1,103 @@
+# Work done once per process before serving traffic.
+#
+# Under gunicorn's preload_app this runs in the master, so every forked
+# worker inherits the loaded templates, indexes and schema check
+# copy-on-write instead of repeating them on first request.
+import logging
+import os
+import threading
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask_migrate import upgrade
+from jinja2 import FileSystemBytecodeCache
+
+from assets import build_app_assets
+from models import db
+from search import get_search_index
+
+logger = logging.getLogger(__name__)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def head_revisions(app):
+    """Return the head revision(s) of the migration scripts."""
+    with app.app_context():
+        config = app.extensions['migrate'].migrate.get_config()
+        return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def current_revisions():
+    """Return the revision(s) the database is stamped with (one cheap SELECT)."""
+    with db.engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def ensure_schema(app, mode=None, force=False):
+    """Make sure the database schema matches the migrations, once per process.
+
+    `mode` defaults to app.config['SCHEMA_STARTUP']: 'upgrade' applies
+    pending migrations, 'check' only logs a warning when the database is
+    behind and 'skip' does nothing. Only 'upgrade' ever issues DDL. After the
+    first call this is a no-op whatever the mode, unless `force` is set, as
+    the CLI commands do.
+    """
+    global _schema_ready
+    mode = mode or app.config.get('SCHEMA_STARTUP', 'check')
+    if _schema_ready and not force:
+        return
+
+    with _schema_lock:
+        if _schema_ready and not force:
+            return
+        if mode != 'skip':
+            with app.app_context():
+                heads = head_revisions(app)
+                current = current_revisions()
+                if current != heads:
+                    if mode == 'upgrade':
+                        logger.info('Upgrading database schema from %s to %s', current or 'empty', heads)
+                        upgrade()
+                    else:
+                        logger.warning('Database schema is at %s but migrations are at %s; '
+                                       'run "flask warmup" or "flask db upgrade"',
+                                       current or 'no revision', heads)
+        _schema_ready = True
+
+
+def template_bytecode_cache(directory):
+    """A Jinja bytecode cache in `directory`, which every worker and restart can share.
+
+    Entries are keyed by template name and checked against the source, and
+    Jinja writes them atomically, so concurrent workers and edited templates
+    are both safe.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
+def compile_templates(app):
+    """Load every template, filling the bytecode cache; returns the template names."""
+    with app.app_context():
+        names = app.jinja_env.list_templates()
+        for name in names:
+            app.jinja_env.get_template(name)
+    return names
+
+
+def preload(app):
+    """Check the schema, build static assets, compile every template and build the content indexes."""
+    ensure_schema(app)
+    build_app_assets(app)
+    compile_templates(app)
+    get_search_index()
+
+
+def after_fork(app, db):
+    """Make a freshly forked worker safe to use the database."""
+    with app.app_context():
+        # Connections opened in the master must not be shared with workers;
+        # close=False leaves them for the master instead of closing its sockets
+        db.engine.dispose(close=False)
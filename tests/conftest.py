@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The app on a throwaway database: TEST_DATABASE_URL (e.g. PostgreSQL) or a temporary SQLite file."""
+    directory = tmp_path_factory.mktemp('app')
+    os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or f'sqlite:///{directory}/app.db'
+    os.environ['SESSION_FILE'] = f'{directory}/sessions.db'
+    os.environ.setdefault('SECRET_KEY', 'test')
+    from app import app
+    from startup import ensure_schema
+
+    ensure_schema(app, mode='upgrade', force=True)
+    with app.app_context():
+        yield app
@@ -0,0 +1,20 @@
+"""Verdicts served from memory still count as use when the table is pruned."""
+import grade_cache
+from models import db, GradingResult
+
+
+def test_memory_hits_keep_a_verdict_from_being_pruned(app, monkeypatch):
+    monkeypatch.setattr(grade_cache, 'PRUNE_EVERY', 10 ** 6)
+    db.session.execute(db.delete(GradingResult))
+    keys = [grade_cache.cache_key('ex-basics-1', f'print({number})') for number in range(3)]
+    for key in keys:
+        grade_cache.store_result(key, 'ex-basics-1', {'status': 'passed'})
+
+    # The first verdict is the oldest row but the only one in use, and only from memory
+    for _ in range(5):
+        assert grade_cache.get_cached_result(keys[0]) == {'status': 'passed', 'output': ''}
+    assert db.session.get(GradingResult, keys[0]).hits == 0
+
+    assert grade_cache.prune(max_rows=1) == 2
+    row = db.session.get(GradingResult, keys[0], populate_existing=True)
+    assert row is not None and row.hits == 5
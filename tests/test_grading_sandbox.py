@@ -0,0 +1,77 @@
+"""Submissions must not be able to switch the grading sandbox off from inside."""
+import os
+import socket
+
+import pytest
+
+from grading import GradingPool, _confine, _probe_isolation
+
+TESTS = [('runs', 'assert True')]
+
+# Rebinds the policy the audit hook used to read from module globals
+DISABLE_POLICY = '''
+import sys
+grading = sys.modules['grading']
+grading.BLOCKED_EVENTS = ()
+grading._readable = ('/',)
+'''
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = GradingPool(workers=1)
+    yield pool
+    pool.close()
+
+
+def grade(pool, code):
+    return pool.submit(code, TESTS).result(timeout=30)
+
+
+def test_rebinding_the_policy_does_not_allow_reading_files(pool):
+    result = grade(pool, DISABLE_POLICY + "print(open('/etc/hostname').read())")
+    assert result['status'] == 'error'
+    assert 'reading files is not allowed' in result['error']
+
+
+def test_rebinding_the_policy_does_not_allow_sockets(pool):
+    result = grade(pool, DISABLE_POLICY + 'import socket\nsocket.socket()')
+    assert result['status'] == 'error'
+    assert 'socket.__new__ is not allowed' in result['error']
+
+
+def test_rebinding_helpers_does_not_allow_reading_files(pool):
+    code = ("import builtins, os\n"
+            "os.path.realpath = lambda path: os.__file__\n"
+            "builtins.isinstance = lambda *args: True\n"
+            "print(open('/etc/hostname').read())")
+    result = grade(pool, code)
+    assert result['status'] == 'error'
+    assert result['output'] == ''
+
+
+def test_the_heap_cannot_be_walked_to_the_hook(pool):
+    result = grade(pool, 'import gc\ngc.get_objects()')
+    assert result['status'] == 'error'
+    assert 'gc.get_objects is not allowed' in result['error']
+
+
+def test_environment_is_empty(pool):
+    result = grade(pool, 'import os\nprint(dict(os.environ))')
+    assert result['status'] == 'passed'
+    assert result['output'] == '{}\n'
+
+
+def test_children_have_no_network_even_without_the_hook():
+    if not _probe_isolation()[0]:
+        pytest.skip('network namespaces are not available here')
+    pid = os.fork()
+    if pid == 0:
+        _confine(drop_user=False)
+        try:
+            socket.create_connection(('127.0.0.1', 9), timeout=1)
+        except OSError:
+            os._exit(0)
+        os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
@@ -0,0 +1,23 @@
+"""Finished jobs are purged after their retention; everything else stays."""
+from datetime import datetime, timedelta
+
+import jobs
+from models import db, Job
+
+
+def test_purge_finished_keeps_recent_and_unfinished_jobs(app):
+    db.session.execute(db.delete(Job))
+    old = datetime.utcnow() - jobs.RETENTION - timedelta(hours=1)
+    recent = datetime.utcnow() - timedelta(hours=1)
+    db.session.add_all(
+        [Job(name='old-done', status='done', finished_at=old) for _ in range(5)]
+        + [Job(name='old-failed', status='failed', finished_at=old),
+           Job(name='recent-done', status='done', finished_at=recent),
+           Job(name='queued', status='queued', run_at=old),
+           Job(name='running', status='running', started_at=old)]
+    )
+    db.session.commit()
+
+    assert jobs.purge_finished(batch_size=2) == 6
+    remaining = db.session.execute(db.select(Job.name).order_by(Job.name)).scalars().all()
+    assert remaining == ['queued', 'recent-done', 'running']
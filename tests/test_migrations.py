@@ -0,0 +1,57 @@
+"""The migrations build the models' schema, and autogenerate leaves search alone."""
+import os
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def flask(*args, env):
+    return subprocess.run([sys.executable, '-m', 'flask', *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+
+
+def flask_env(tmp_path):
+    return dict(os.environ, FLASK_APP='app', SECRET_KEY='test', DATABASE_URL=f'sqlite:///{tmp_path}/app.db',
+                SESSION_FILE=f'{tmp_path}/sessions.db')
+
+
+def test_migrated_database_matches_the_models(tmp_path):
+    env = flask_env(tmp_path)
+    upgrade = flask('db', 'upgrade', env=env)
+    assert upgrade.returncode == 0, upgrade.stderr
+    check = flask('db', 'check', env=env)
+    assert check.returncode == 0, check.stderr
+    assert 'No new upgrade operations detected' in check.stdout + check.stderr
+
+
+def test_unique_index_migration_keeps_completions_and_merges_notes(tmp_path):
+    env = flask_env(tmp_path)
+    assert flask('db', 'upgrade', '35e6d2929184', env=env).returncode == 0
+    with sqlite3.connect(tmp_path / 'app.db') as connection:
+        connection.executemany(
+            'INSERT INTO user_progress (id, user_id, path_id, topic_id, completed, completed_at) VALUES (?, 1, ?, ?, ?, ?)',
+            [(1, 'python', 'a', 1, '2026-01-01 00:00:00'), (2, 'python', 'a', None, None),
+             (3, 'python', 'a', 0, None), (4, 'python', 'b', None, None), (5, 'python', 'b', 0, None)])
+        connection.executemany(
+            'INSERT INTO user_notes (id, user_id, content_type, content_id, notes, updated_at) VALUES (?, 1, ?, ?, ?, ?)',
+            [(1, 'topic', 'a', 'older', '2026-01-01 00:00:00'), (2, 'topic', 'a', 'newer', '2026-02-01 00:00:00'),
+             (3, 'topic', 'a', 'newer', None), (4, 'topic', 'b', 'only', None)])
+
+    upgrade = flask('db', 'upgrade', '6bf14303bde8', env=env)
+    assert upgrade.returncode == 0, upgrade.stderr
+    with sqlite3.connect(tmp_path / 'app.db') as connection:
+        progress = connection.execute('SELECT id, completed FROM user_progress ORDER BY id').fetchall()
+        notes = connection.execute('SELECT id, notes FROM user_notes ORDER BY id').fetchall()
+    # The completion wins over NULL and false; a NULL completed never outranks an explicit row
+    assert progress == [(1, 1), (5, 0)]
+    assert notes == [(2, 'newer\n\nolder'), (4, 'only')]
+
+
+def test_check_query_plans_passes(tmp_path):
+    env = flask_env(tmp_path)
+    assert flask('db', 'upgrade', env=env).returncode == 0
+    check = flask('check-query-plans', env=env)
+    assert check.returncode == 0, check.stdout + check.stderr
+    assert 'FAIL' not in check.stdout
@@ -0,0 +1,50 @@
+"""Keyset pagination of note search returns every hit exactly once."""
+import pytest
+
+from models import db, UserNote
+from note_search import decode_cursor, search_notes
+from seed import seed_scale
+
+
+@pytest.fixture(scope='module')
+def user_id(app):
+    user_id, _ = seed_scale(1, progress_per_user=0, projects_per_user=0, notes_per_user=0)
+    # Ranks that are not exact binary fractions, with ties between identical notes
+    texts = ['decorators ' * repeat + 'filler words ' * (index % 3) for index, repeat in
+             enumerate([1, 1, 2, 2, 3, 5, 7, 1, 2, 11, 13, 1])]
+    db.session.add_all(UserNote(user_id=user_id, content_type='topic', content_id=f'note-{index}', notes=text)
+                       for index, text in enumerate(texts))
+    db.session.commit()
+    return user_id
+
+
+def collect(user_id, limit):
+    seen, cursor = [], None
+    while True:
+        results, cursor = search_notes(user_id, 'decorators', limit=limit, cursor=cursor)
+        seen.extend(result['id'] for result in results)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('limit', [1, 2, 5])
+def test_pages_cover_every_hit_once(user_id, limit):
+    everything, _ = search_notes(user_id, 'decorators', limit=100)
+    assert collect(user_id, limit) == [result['id'] for result in everything]
+    assert len(everything) == 12
+
+
+def test_cursor_rank_round_trips_exactly(user_id):
+    _, cursor = search_notes(user_id, 'decorators', limit=3)
+    rank, note_id = decode_cursor(cursor)
+    assert isinstance(rank, float) and rank < 0 and note_id > 0
+
+
+@pytest.mark.skipif("db.session.connection().dialect.name != 'postgresql'",
+                    reason='set TEST_DATABASE_URL to a PostgreSQL database')
+def test_postgres_rank_is_float8(user_id):
+    # float4 ranks lose digits through the JSON cursor and the next page skips or repeats rows
+    kind = db.session.execute(db.text(
+        "SELECT pg_typeof(-CAST(ts_rank_cd(search_vector, to_tsquery('english', 'decorators')) "
+        "AS double precision)) FROM user_notes LIMIT 1")).scalar()
+    assert kind == 'double precision'
@@ -0,0 +1,34 @@
+"""POST /api/progress/batch reports the rows it changed, within its query budget."""
+import pytest
+
+from seed import seed_scale
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'SQL_QUERY_BUDGET_STRICT', True)
+    user_id, _ = seed_scale(1, progress_per_user=0, projects_per_user=0, notes_per_user=0)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    return client
+
+
+def post(client, rows):
+    response = client.post('/api/progress/batch', json=rows)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_written_counts_only_rows_that_changed(client):
+    rows = [{'path_id': 'sync', 'topic_id': f'topic-{index}', 'completed': True,
+             'completed_at': '2026-01-02T00:00:00Z'} for index in range(1000)]
+    first = post(client, rows)
+    assert (first['received'], first['written']) == (1000, 1000)
+
+    # An older completion never replaces a newer one; a newer one does
+    stale = [dict(row, completed_at='2026-01-01T00:00:00Z') for row in rows[:10]]
+    newer = [dict(row, completed_at='2026-01-03T00:00:00Z') for row in rows[10:13]]
+    second = post(client, stale + newer)
+    assert (second['received'], second['written']) == (13, 3)
+    assert second['summary']['completed_topics'] == 1000